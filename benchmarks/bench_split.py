@@ -0,0 +1,65 @@
+"""Throughput of split_markdown against fixed-width slicing on ~1 MB outputs.
+
+    uv run python benchmarks/bench_split.py [--size-mb 1] [--max-chars 3900]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from takopi_slack_plugin.text_split import split_markdown
+
+
+def _agent_output(size: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        kind = rng.random()
+        if kind < 0.4:
+            part = " ".join(
+                "".join(rng.choices("abcdefghij", k=rng.randint(2, 9)))
+                for _ in range(rng.randint(20, 80))
+            )
+            part += "\n\n"
+        elif kind < 0.8:
+            lines = [
+                f"2026-01-01T00:00:{index % 60:02d} INFO step {index} ok"
+                for index in range(rng.randint(20, 200))
+            ]
+            part = "```log\n" + "\n".join(lines) + "\n```\n"
+        else:
+            part = "".join(rng.choices("0123456789abcdef", k=rng.randint(500, 8000)))
+            part += "\n"
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)[:size]
+
+
+def _slice(text: str, max_chars: int) -> list[str]:
+    return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+def _time(fn, text: str, max_chars: int, rounds: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        chunks = fn(text, max_chars)
+    return (time.perf_counter() - start) / rounds, len(chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=1.0)
+    parser.add_argument("--max-chars", type=int, default=3900)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    text = _agent_output(int(args.size_mb * 1024 * 1024))
+    for name, fn in (("slice", _slice), ("split_markdown", split_markdown)):
+        elapsed, count = _time(fn, text, args.max_chars, args.rounds)
+        print(f"{name:>15}: {elapsed * 1000:8.2f} ms  {count} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Read latency of SlackThreadSessionStore with and without the hot cache.
+
+    uv run python benchmarks/bench_thread_sessions.py [--sizes 100,10000,100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import anyio
+import msgspec
+
+from takopi_slack_plugin.thread_sessions import (
+    STATE_VERSION,
+    SlackThreadSessionStore,
+    resolve_shards_dir,
+)
+
+CHANNEL_ID = "C0BENCH"
+
+
+def _write_shard(path: Path, threads: int) -> None:
+    state = {
+        "version": STATE_VERSION,
+        "channel_id": CHANNEL_ID,
+        "threads": {
+            f"{index}.000100": {
+                "resumes": {"codex": f"resume-{index}"},
+                "context": {"project": "bench", "branch": f"feat-{index}"},
+                "last_activity_at": 1_700_000_000.0 + index,
+            }
+            for index in range(threads)
+        },
+    }
+    shard = resolve_shards_dir(path) / f"{CHANNEL_ID}.json"
+    shard.parent.mkdir(parents=True, exist_ok=True)
+    shard.write_bytes(msgspec.json.encode(state))
+
+
+async def _time_reads(
+    store: SlackThreadSessionStore, thread_ids: list[str]
+) -> float:
+    start = time.perf_counter()
+    for thread_id in thread_ids:
+        await store.get_resume(
+            channel_id=CHANNEL_ID, thread_id=thread_id, engine="codex"
+        )
+        await store.get_context(channel_id=CHANNEL_ID, thread_id=thread_id)
+    return (time.perf_counter() - start) / (len(thread_ids) * 2)
+
+
+async def _bench(threads: int, reads: int, hot: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "slack_thread_sessions_state.json"
+        _write_shard(path, threads)
+        rng = random.Random(threads)
+        hot_ids = [f"{rng.randrange(threads)}.000100" for _ in range(hot)]
+        workload = [rng.choice(hot_ids) for _ in range(reads)]
+
+        cold = SlackThreadSessionStore(path, cache_max_entries=0)
+        load_start = time.perf_counter()
+        await cold.get_resume(
+            channel_id=CHANNEL_ID, thread_id=hot_ids[0], engine="codex"
+        )
+        load_s = time.perf_counter() - load_start
+        uncached = await _time_reads(cold, workload)
+
+        cached_store = SlackThreadSessionStore(path)
+        await _time_reads(cached_store, hot_ids)
+        cached = await _time_reads(cached_store, workload)
+
+    print(
+        f"{threads:>8} threads  load {load_s * 1000:8.2f} ms  "
+        f"uncached {uncached * 1e6:8.2f} us/read  "
+        f"cached {cached * 1e6:8.2f} us/read"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,10000,100000")
+    parser.add_argument("--reads", type=int, default=20_000)
+    parser.add_argument("--hot", type=int, default=200)
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",")):
+        anyio.run(_bench, size, args.reads, min(args.hot, size))
+
+
+if __name__ == "__main__":
+    main()
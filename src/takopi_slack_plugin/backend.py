@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import os
+import re
 import shutil
+from dataclasses import replace
 from pathlib import Path
 
 import anyio
@@ -21,8 +23,15 @@ from takopi.api import (
 
 from .bridge import SlackBridgeConfig, SlackPresenter, SlackTransport, run_main_loop
 from .client import SlackClient
-from .config import SlackTransportSettings
+from .cluster import ClusterCoordinator, ClusterStore, default_worker_id
+from .config import SlackChannelSettings, SlackTransportSettings
+from .disk_usage import DiskUsageScanner
+from .engine import RunLimits, RunScheduler
+from .event_dedupe import EventDedupeCache, resolve_dedupe_path
+from .git_runner import GitRunner
+from .repo_locks import RepoLockManager
 from .onboarding import interactive_setup
+from .reminders import StaleWorktreeScheduler
 from .thread_sessions import SlackThreadSessionStore, resolve_sessions_path
 
 _CREATE_CONFIG_TITLE = "create a config"
@@ -92,6 +101,40 @@ def check_setup(
     return SetupResult(issues=issues, config_path=config_path)
 
 
+def _worker_path(path: Path, worker_id: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", worker_id)
+    return path.with_name(f"{path.stem}.{safe}{path.suffix}")
+
+
+def _resolve_channels(
+    settings: SlackTransportSettings,
+    runtime: TransportRuntime,
+    *,
+    config_path: Path,
+) -> tuple[SlackChannelSettings, ...]:
+    engines = {engine.lower(): engine for engine in runtime.engine_ids}
+    channels: list[SlackChannelSettings] = []
+    for idx, channel in enumerate(settings.channels, start=1):
+        project = channel.project
+        if project is not None:
+            project = runtime.normalize_project_key(project)
+            if project is None:
+                raise ConfigError(
+                    f"Invalid `transports.slack.channels[{idx}].project` in "
+                    f"{config_path}; unknown project {channel.project!r}."
+                )
+        engine = channel.engine
+        if engine is not None:
+            engine = engines.get(engine.lower())
+            if engine is None:
+                raise ConfigError(
+                    f"Invalid `transports.slack.channels[{idx}].engine` in "
+                    f"{config_path}; unknown engine {channel.engine!r}."
+                )
+        channels.append(replace(channel, project=project, engine=engine))
+    return tuple(channels)
+
+
 class SlackBackend(TransportBackend):
     id = "slack"
     description = "Slack bot"
@@ -127,18 +170,64 @@ class SlackBackend(TransportBackend):
         )
         startup_msg = _build_startup_message(runtime, startup_pwd=os.getcwd())
         client = SlackClient(settings.bot_token)
+        channels = _resolve_channels(settings, runtime, config_path=config_path)
         transport = SlackTransport(
             client,
             action_blocks=settings.action_blocks,
+            channel_intervals={
+                channel.channel_id: channel.outbox_interval_s
+                for channel in channels
+                if channel.outbox_interval_s is not None
+            },
+        )
+        presenter = SlackPresenter(
+            message_overflow=settings.message_overflow,
+            overflow_file_threshold=settings.message_overflow_file_threshold,
         )
-        presenter = SlackPresenter(message_overflow=settings.message_overflow)
         exec_cfg = ExecBridgeConfig(
             transport=transport,
             presenter=presenter,
             final_notify=final_notify,
         )
+        sessions_path = resolve_sessions_path(config_path)
+        cluster = None
+        dedupe_path = resolve_dedupe_path(config_path)
+        if settings.cluster_state_path is not None:
+            worker_id = settings.cluster_worker_id or default_worker_id(config_path)
+            cluster = ClusterCoordinator(
+                ClusterStore(settings.cluster_state_path),
+                worker_id=worker_id,
+                lease_s=settings.cluster_lease_s,
+                heartbeat_s=settings.cluster_heartbeat_s,
+            )
+            # Threads are owned by one worker, so each keeps its own state
+            # files (settings are also kept in the cluster store); workers
+            # may share a config directory.
+            sessions_path = _worker_path(sessions_path, worker_id)
+            dedupe_path = _worker_path(dedupe_path, worker_id)
         thread_store = SlackThreadSessionStore(
-            resolve_sessions_path(config_path)
+            sessions_path,
+            state_format=settings.thread_state_format,
+        )
+        stale_worktree_scheduler = None
+        if settings.stale_worktree_reminder:
+            stale_worktree_scheduler = StaleWorktreeScheduler(
+                stale_hours=settings.stale_worktree_hours,
+                project_hours=settings.stale_worktree_project_hours,
+            )
+            thread_store.subscribe(stale_worktree_scheduler.track)
+        if cluster is not None:
+            thread_store.subscribe_settings(cluster.stage_settings)
+        event_dedupe = EventDedupeCache(
+            ttl_s=settings.event_dedupe_ttl_s,
+            path=dedupe_path if settings.event_dedupe_persist else None,
+        )
+        event_dedupe.load()
+        run_limits = RunLimits(
+            max_concurrent=settings.max_concurrent_runs,
+            per_user=settings.max_runs_per_user,
+            per_project=settings.max_runs_per_project,
+            batch=settings.max_batch_runs,
         )
         cfg = SlackBridgeConfig(
             client=client,
@@ -154,6 +243,27 @@ class SlackBackend(TransportBackend):
             stale_worktree_reminder=settings.stale_worktree_reminder,
             stale_worktree_hours=settings.stale_worktree_hours,
             stale_worktree_check_interval_s=settings.stale_worktree_check_interval_s,
+            stale_worktree_scheduler=stale_worktree_scheduler,
+            thread_retention_days=settings.thread_retention_days,
+            thread_prune_interval_s=settings.thread_prune_interval_s,
+            thread_message_policy=settings.thread_message_policy,
+            run_scheduler=RunScheduler(run_limits) if run_limits.enabled else None,
+            git_runner=GitRunner(
+                max_concurrent=settings.git_max_concurrent,
+                timeout_s=settings.git_timeout_s,
+            ),
+            bulk_archive_concurrency=settings.bulk_archive_concurrency,
+            repo_locks=RepoLockManager(fail_fast=settings.git_lock_fail_fast),
+            disk_usage=DiskUsageScanner() if settings.worktree_disk_usage else None,
+            disk_scan_interval_s=settings.worktree_disk_scan_interval_s,
+            disk_pressure_free_bytes=None
+            if settings.disk_pressure_free_gb is None
+            else int(settings.disk_pressure_free_gb * 1024**3),
+            disk_pressure_reminders=settings.disk_pressure_reminders,
+            socket_connections=settings.socket_connections,
+            event_dedupe=event_dedupe,
+            channels=channels,
+            cluster=cluster,
         )
 
         async def run_loop() -> None:
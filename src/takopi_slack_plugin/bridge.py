@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-import copy
+import functools
+import hashlib
 import json
 import re
-import subprocess
+import shutil
 import time
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Awaitable, Callable
+from typing import Any, Awaitable, Callable, Collection, Sequence
 from urllib.parse import parse_qs
 
 import anyio
-import websockets
-from websockets.exceptions import WebSocketException
+import msgspec
 
 from takopi.api import (
     ConfigError,
@@ -26,24 +28,42 @@ from takopi.api import (
     TransportRuntime,
     get_logger,
 )
+from takopi.config_watch import ConfigReload, watch_config as watch_config_changes
 from takopi.directives import parse_directives
-from takopi.ids import RESERVED_COMMAND_IDS
-from takopi.plugins import COMMAND_GROUP, list_ids
 from takopi.runners.run_options import EngineRunOptions
+from takopi.telegram.files import format_bytes
 
-from .client import SlackApiError, SlackClient, SlackMessage, open_socket_url
+from .client import SlackApiError, SlackClient, SlackMessage, SocketUrlOpener
+from .cluster import MAX_FORWARD_HOPS, ClusterCoordinator, thread_key
 from .commands import dispatch_command, split_command_args
-from .config import SlackActionHandler, SlackFilesSettings
-from .engine import run_engine, send_plain
+from .commands.registry import CommandRegistry
+from .config import SlackActionHandler, SlackChannelSettings, SlackFilesSettings
+from .disk_usage import DiskUsageScanner
+from .engine import RunScheduler, run_engine, send_plain
+from .git_runner import GitRunner, WorktreeStatus
 from .commands.file_transfer import (
     extract_files,
     handle_file_command,
     handle_file_uploads,
 )
-from .outbox import DELETE_PRIORITY, EDIT_PRIORITY, SEND_PRIORITY, OutboxOp, SlackOutbox
+from .outbox import (
+    DEFAULT_CHANNEL_INTERVAL,
+    DELETE_PRIORITY,
+    EDIT_PRIORITY,
+    SEND_PRIORITY,
+    OutboxOp,
+    SlackOutbox,
+)
 from .overrides import REASONING_LEVELS, is_valid_reasoning_level, supports_reasoning
+from .mailbox import MailboxPolicy, ThreadMailbox
+from .reminders import StaleWorktreeScheduler
+from .event_dedupe import EventDedupeCache, event_keys
+from .repo_locks import RepoBusyError, RepoLockManager, existing_run_path, repo_key
+from .socket_mode import SocketModeRunner, socket_budget
+from .text_split import split_markdown
 from .thread_sessions import (
     SlackThreadSessionStore,
+    ThreadPruneResult,
     ThreadSnapshot,
     WorktreeSnapshot,
 )
@@ -51,10 +71,15 @@ from .thread_sessions import (
 logger = get_logger(__name__)
 
 MAX_SLACK_TEXT = 3900
+MAX_TRACKED_MESSAGES = 2048
+OVERFLOW_FILENAME = "answer.md"
+_DIGEST_ENCODER = msgspec.json.Encoder(order="sorted")
 MAX_BLOCK_TEXT = 2800
 CANCEL_ARCHIVE_ACTION_ID = "takopi-slack:archive-cancel"
 ARCHIVE_ACTION_ID = "takopi-slack:archive"
 CONFIRM_ARCHIVE_ACTION_ID = "takopi-slack:archive-confirm"
+DISK_PRESSURE_MIN_IDLE_S = 3600.0
+REPO_BUSY_TEXT = "repository is busy with another git operation; try again shortly."
 CANCEL_ACTION_ID = "takopi-slack:cancel"
 INLINE_COMMAND_RE = re.compile(
     r"(^|\s)(?P<token>/(?P<cmd>[a-z0-9_]{1,32}))",
@@ -68,6 +93,12 @@ THREAD_SEND_ERRORS = {
 }
 
 
+@dataclass(frozen=True, slots=True)
+class OverflowFile:
+    filename: str
+    content: str
+
+
 class SlackPresenter:
     def __init__(
         self,
@@ -75,10 +106,13 @@ class SlackPresenter:
         message_overflow: str = "trim",
         max_chars: int = MAX_SLACK_TEXT,
         max_actions: int = 5,
+        overflow_file_threshold: int = 12000,
     ) -> None:
         self._message_overflow = message_overflow
+        self._overflow_file_threshold = max(1, int(overflow_file_threshold))
         self._max_chars = max(1, int(max_chars))
         self._max_actions = max(0, int(max_actions))
+        self._action_lines = _ActionLineCache()
 
     def render_progress(
         self,
@@ -92,9 +126,13 @@ class SlackPresenter:
             elapsed_s=elapsed_s,
             label=label,
             max_actions=self._max_actions,
+            format_line=self._action_lines.line,
         )
-        rendered = RenderedMessage(text=_trim_text(text, self._max_chars))
+        text = _trim_text(text, self._max_chars)
         show_cancel = not _is_cancelled_label(label)
+        # One presenter serves every run, so it keeps no per-run state; the
+        # runner already skips edits whose render equals the last one.
+        rendered = RenderedMessage(text=text)
         rendered.extra["show_cancel"] = show_cancel
         if not show_cancel:
             rendered.extra["clear_blocks"] = True
@@ -114,7 +152,23 @@ class SlackPresenter:
             status=status,
             answer=answer,
         )
-        if self._message_overflow == "split":
+        if (
+            self._message_overflow == "file"
+            and len(text) > self._max_chars
+            and len(text) > self._overflow_file_threshold
+        ):
+            # One upload instead of dozens of paced followup posts.
+            note = f"\n\n_full answer attached as `{OVERFLOW_FILENAME}`_"
+            summary = _trim_text(text, max(1, self._max_chars - len(note)))
+            message = RenderedMessage(text=f"{summary}{note}")
+            message.extra["clear_blocks"] = True
+            message.extra["show_archive"] = True
+            message.extra["overflow_file"] = OverflowFile(
+                filename=OVERFLOW_FILENAME,
+                content=(answer or "").strip() or text,
+            )
+            return message
+        if self._message_overflow in {"split", "file"}:
             chunks = _split_text(text, self._max_chars)
             message = RenderedMessage(text=chunks[0])
             message.extra["clear_blocks"] = True
@@ -144,7 +198,26 @@ class SlackBridgeConfig:
     thread_store: SlackThreadSessionStore | None = None
     stale_worktree_reminder: bool = False
     stale_worktree_hours: float = 24.0
-    stale_worktree_check_interval_s: float = 600.0
+    stale_worktree_check_interval_s: float = 3600.0
+    stale_worktree_scheduler: StaleWorktreeScheduler | None = None
+    thread_retention_days: float | None = None
+    thread_prune_interval_s: float = 3600.0
+    command_registry: CommandRegistry = field(default_factory=CommandRegistry)
+    thread_message_policy: MailboxPolicy = "queue"
+    run_scheduler: RunScheduler | None = None
+    git_runner: GitRunner = field(default_factory=GitRunner)
+    bulk_archive_concurrency: int = 4
+    repo_locks: RepoLockManager = field(default_factory=RepoLockManager)
+    disk_usage: DiskUsageScanner | None = None
+    disk_scan_interval_s: float = 1800.0
+    disk_pressure_free_bytes: int | None = None
+    disk_pressure_reminders: int = 3
+    socket_connections: int = 1
+    event_dedupe: EventDedupeCache = field(default_factory=EventDedupeCache)
+    channels: tuple[SlackChannelSettings, ...] = ()
+    default_project: str | None = None
+    default_engine: str | None = None
+    cluster: ClusterCoordinator | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -161,11 +234,30 @@ class SlackTransport:
         client: SlackClient,
         *,
         action_blocks: list[dict[str, Any]] | None = None,
+        channel_intervals: dict[str, float] | None = None,
     ) -> None:
         self._client = client
-        self._outbox = SlackOutbox()
+        intervals = dict(channel_intervals or {})
+        self._outbox = SlackOutbox(
+            interval_for_channel=lambda channel_id: intervals.get(
+                channel_id, DEFAULT_CHANNEL_INTERVAL
+            )
+        )
         self._send_counter = 0
         self._action_blocks = action_blocks
+        # Digest of the last text+blocks sent per (channel, ts), so edits that
+        # would not change the message never spend chat.update quota.
+        self._content_digests: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self.suppressed_edits = 0
+
+    @staticmethod
+    def _followup_thread(
+        message: RenderedMessage, thread_ts: str | None
+    ) -> str | None:
+        followup_thread = message.extra.get("followup_thread_id")
+        if followup_thread is not None:
+            return str(followup_thread)
+        return thread_ts
 
     @staticmethod
     def _extract_followups(message: RenderedMessage) -> list[RenderedMessage]:
@@ -186,6 +278,20 @@ class SlackTransport:
     def _delete_key(channel_id: str, ts: str) -> tuple[str, str, str]:
         return ("delete", channel_id, ts)
 
+    def _remember_content(self, channel_id: str, ts: str, digest: bytes) -> None:
+        key = (channel_id, ts)
+        self._content_digests[key] = digest
+        self._content_digests.move_to_end(key)
+        while len(self._content_digests) > MAX_TRACKED_MESSAGES:
+            self._content_digests.popitem(last=False)
+
+    def _forget_content(
+        self, channel_id: str, ts: str, digest: bytes | None = None
+    ) -> None:
+        key = (channel_id, ts)
+        if digest is None or self._content_digests.get(key) == digest:
+            self._content_digests.pop(key, None)
+
     def _prepare_blocks(
         self,
         message: RenderedMessage,
@@ -234,6 +340,7 @@ class SlackTransport:
             blocks=blocks,
             thread_ts=thread_ts,
         )
+        self._remember_content(channel, sent.ts, _content_digest(message.text, blocks))
         ref = MessageRef(
             channel_id=channel,
             message_id=sent.ts,
@@ -248,11 +355,7 @@ class SlackTransport:
                     thread_id=thread_ts,
                 )
             )
-        followup_thread = None
-        if message.extra.get("followup_thread_id") is not None:
-            followup_thread = str(message.extra.get("followup_thread_id"))
-        if followup_thread is None:
-            followup_thread = thread_ts
+        followup_thread = self._followup_thread(message, thread_ts)
         for followup in followups:
             await self._enqueue_send(
                 channel_id=channel,
@@ -260,6 +363,9 @@ class SlackTransport:
                 blocks=None,
                 thread_ts=followup_thread,
             )
+        await self._send_overflow_file(
+            channel_id=channel, message=message, thread_ts=followup_thread
+        )
         return ref
 
     async def edit(
@@ -272,15 +378,35 @@ class SlackTransport:
         blocks = self._prepare_blocks(
             message, allow_clear=True, thread_id=ref.thread_id
         )
+        channel_id = str(ref.channel_id)
+        ts = str(ref.message_id)
+        digest = _content_digest(message.text, blocks)
+        if self._content_digests.get((channel_id, ts)) == digest:
+            self.suppressed_edits += 1
+            logger.debug(
+                "slack.edit.suppressed",
+                channel_id=channel_id,
+                ts=ts,
+                suppressed=self.suppressed_edits,
+            )
+            return ref
+        self._remember_content(channel_id, ts, digest)
         updated = await self._enqueue_edit(
-            channel_id=str(ref.channel_id),
-            ts=str(ref.message_id),
+            channel_id=channel_id,
+            ts=ts,
             text=message.text,
             blocks=blocks,
+            digest=digest,
             wait=wait,
         )
         if updated is None:
             return ref if not wait else None
+        thread_ts = None if ref.thread_id is None else str(ref.thread_id)
+        await self._send_overflow_file(
+            channel_id=channel_id,
+            message=message,
+            thread_ts=self._followup_thread(message, thread_ts),
+        )
         return MessageRef(
             channel_id=ref.channel_id,
             message_id=updated.ts,
@@ -289,11 +415,56 @@ class SlackTransport:
         )
 
     async def delete(self, *, ref: MessageRef) -> bool:
+        self._forget_content(str(ref.channel_id), str(ref.message_id))
         return await self._enqueue_delete(
             channel_id=str(ref.channel_id),
             ts=str(ref.message_id),
         )
 
+    async def _send_overflow_file(
+        self,
+        *,
+        channel_id: str,
+        message: RenderedMessage,
+        thread_ts: str | None,
+    ) -> None:
+        overflow = message.extra.get("overflow_file")
+        if not isinstance(overflow, OverflowFile):
+            return
+
+        async def execute() -> dict[str, Any]:
+            return await self._client.upload_file(
+                channel_id=channel_id,
+                filename=overflow.filename,
+                content=overflow.content.encode("utf-8"),
+                thread_ts=thread_ts,
+            )
+
+        op = OutboxOp(
+            execute=execute,
+            priority=SEND_PRIORITY,
+            queued_at=time.monotonic(),
+            channel_id=channel_id,
+        )
+        uploaded = await self._outbox.enqueue(
+            key=self._next_send_key(channel_id), op=op, wait=True
+        )
+        if uploaded is not None:
+            return
+        logger.warning(
+            "slack.overflow_upload_failed",
+            channel_id=channel_id,
+            size=len(overflow.content),
+        )
+        # Never drop the answer: fall back to split followups.
+        for chunk in _split_text(overflow.content, MAX_SLACK_TEXT):
+            await self._enqueue_send(
+                channel_id=channel_id,
+                text=chunk,
+                blocks=None,
+                thread_ts=thread_ts,
+            )
+
     async def _enqueue_send(
         self,
         *,
@@ -350,16 +521,25 @@ class SlackTransport:
         ts: str,
         text: str,
         blocks: list[dict[str, Any]] | None,
+        digest: bytes | None = None,
         wait: bool,
     ) -> SlackMessage | None:
+        async def execute() -> SlackMessage:
+            try:
+                return await self._client.update_message(
+                    channel_id=channel_id,
+                    ts=ts,
+                    text=text,
+                    blocks=blocks,
+                )
+            except Exception:
+                # A failed update must not make an identical retry look like a no-op.
+                self._forget_content(channel_id, ts, digest)
+                raise
+
         key = self._edit_key(channel_id, ts)
         op = OutboxOp(
-            execute=lambda: self._client.update_message(
-                channel_id=channel_id,
-                ts=ts,
-                text=text,
-                blocks=blocks,
-            ),
+            execute=execute,
             priority=EDIT_PRIORITY,
             queued_at=time.monotonic(),
             channel_id=channel_id,
@@ -383,6 +563,11 @@ class SlackTransport:
         return bool(result)
 
 
+def _content_digest(text: str, blocks: list[dict[str, Any]] | None) -> bytes:
+    payload = _DIGEST_ENCODER.encode([text, blocks])
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
 def _is_cancelled_label(label: str) -> bool:
     stripped = label.strip()
     if stripped.startswith("`") and stripped.endswith("`") and len(stripped) >= 2:
@@ -454,13 +639,39 @@ def _format_action_line(action_state) -> str:
     return f"[{status}] {title}"
 
 
-def _format_actions(actions, *, max_actions: int) -> str | None:
+class _ActionLineCache:
+    # Progress ticks re-render the same few actions; memoize each line by
+    # what it depends on so only changed actions are formatted again.
+    def __init__(self, *, max_entries: int = 512) -> None:
+        self._max_entries = max_entries
+        self._lines: dict[tuple[Any, ...], str] = {}
+
+    def line(self, action_state) -> str:
+        action = action_state.action
+        key = (action.id, action.kind, action.title, _action_status(action_state))
+        cached = self._lines.get(key)
+        if cached is not None:
+            return cached
+        line = _format_action_line(action_state)
+        if len(self._lines) >= self._max_entries:
+            # Dicts keep insertion order; drop the oldest entry.
+            self._lines.pop(next(iter(self._lines)))
+        self._lines[key] = line
+        return line
+
+
+def _format_actions(
+    actions,
+    *,
+    max_actions: int,
+    format_line: Callable[[Any], str] = _format_action_line,
+) -> str | None:
     if not actions:
         return None
     if max_actions <= 0:
         return None
     visible = actions[-max_actions:]
-    return "\n".join(_format_action_line(item) for item in visible)
+    return "\n".join(format_line(item) for item in visible)
 
 
 def _format_footer(state) -> str | None:
@@ -484,10 +695,13 @@ def _render_progress_text(
     elapsed_s: float,
     label: str,
     max_actions: int,
+    format_line: Callable[[Any], str] = _format_action_line,
 ) -> str:
     step = state.action_count or None
     header = _format_header(elapsed_s, step, label=label, engine=state.engine)
-    body = _format_actions(state.actions, max_actions=max_actions)
+    body = _format_actions(
+        state.actions, max_actions=max_actions, format_line=format_line
+    )
     footer = _format_footer(state)
     return _assemble_sections(header, body, footer)
 
@@ -517,16 +731,7 @@ def _trim_text(text: str, max_chars: int) -> str:
 
 
 def _split_text(text: str, max_chars: int) -> list[str]:
-    if max_chars <= 0:
-        return [text]
-    if len(text) <= max_chars:
-        return [text]
-    chunks = []
-    start = 0
-    while start < len(text):
-        chunks.append(text[start : start + max_chars])
-        start += max_chars
-    return chunks
+    return split_markdown(text, max_chars)
 
 
 def _trim_block_text(text: str) -> str:
@@ -538,33 +743,31 @@ def _trim_block_text(text: str) -> str:
 
 
 def _split_block_text(text: str) -> list[str]:
-    if len(text) <= MAX_BLOCK_TEXT:
-        return [text]
-    chunks = []
-    start = 0
-    while start < len(text):
-        chunks.append(text[start : start + MAX_BLOCK_TEXT])
-        start += MAX_BLOCK_TEXT
-    return chunks
+    return split_markdown(text, MAX_BLOCK_TEXT)
 
 
-def _build_cancel_blocks(text: str) -> list[dict[str, Any]]:
-    body = _trim_block_text(text)
-    return [
-        {"type": "section", "text": {"type": "mrkdwn", "text": body}},
+# Static block templates are built once and shared between renders; blocks
+# returned by the builders below must be treated as read-only.
+_CANCEL_ACTIONS_BLOCK: dict[str, Any] = {
+    "type": "actions",
+    "elements": [
         {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "cancel"},
-                    "action_id": CANCEL_ACTION_ID,
-                    "style": "danger",
-                    "value": "cancel",
-                }
-            ],
-        },
-    ]
+            "type": "button",
+            "text": {"type": "plain_text", "text": "cancel"},
+            "action_id": CANCEL_ACTION_ID,
+            "style": "danger",
+            "value": "cancel",
+        }
+    ],
+}
+
+
+def _section_block(text: str) -> dict[str, Any]:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+def _build_cancel_blocks(text: str) -> list[dict[str, Any]]:
+    return [_section_block(_trim_block_text(text)), _CANCEL_ACTIONS_BLOCK]
 
 
 def _format_hours_label(hours: float) -> str:
@@ -580,16 +783,9 @@ def _build_archive_blocks(
     action_blocks: list[dict[str, Any]] | None = None,
     include_actions: bool = True,
 ) -> list[dict[str, Any]]:
-    sections = _split_block_text(text)
-    blocks: list[dict[str, Any]] = [
-        {"type": "section", "text": {"type": "mrkdwn", "text": chunk}}
-        for chunk in sections
-    ]
-    if not include_actions:
-        return blocks
-    if action_blocks is not None:
-        blocks.extend(copy.deepcopy(action_blocks))
-        return blocks
+    blocks = [_section_block(chunk) for chunk in _split_block_text(text)]
+    if include_actions and action_blocks is not None:
+        blocks.extend(action_blocks)
     return blocks
 
 
@@ -598,28 +794,29 @@ def _build_archive_confirm_blocks(
     *,
     thread_id: str | None,
 ) -> list[dict[str, Any]]:
-    value = thread_id or ""
-    return [
-        {"type": "section", "text": {"type": "mrkdwn", "text": text}},
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "confirm archive"},
-                    "action_id": CONFIRM_ARCHIVE_ACTION_ID,
-                    "style": "danger",
-                    "value": value,
-                },
-                {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "cancel"},
-                    "action_id": CANCEL_ARCHIVE_ACTION_ID,
-                    "value": value,
-                },
-            ],
-        },
-    ]
+    return [_section_block(text), _archive_confirm_actions_block(thread_id or "")]
+
+
+@functools.lru_cache(maxsize=256)
+def _archive_confirm_actions_block(value: str) -> dict[str, Any]:
+    return {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "confirm archive"},
+                "action_id": CONFIRM_ARCHIVE_ACTION_ID,
+                "style": "danger",
+                "value": value,
+            },
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "cancel"},
+                "action_id": CANCEL_ARCHIVE_ACTION_ID,
+                "value": value,
+            },
+        ],
+    }
 
 
 def _mention_regex(bot_user_id: str) -> re.Pattern[str]:
@@ -638,20 +835,41 @@ def _normalize_bot_token(token: str) -> str:
     return trimmed.lower()
 
 
-def _strip_bot_name(text: str, *, bot_name: str) -> str:
+def _strip_bot_name(text: str, *, target: str) -> str:
     tokens = text.split()
     if not tokens:
         return text
-    target = bot_name.lower()
-    while tokens:
-        if _normalize_bot_token(tokens[0]) == target:
-            tokens.pop(0)
+    start = 0
+    end = len(tokens)
+    while start < end:
+        if _normalize_bot_token(tokens[start]) == target:
+            start += 1
             continue
-        if _normalize_bot_token(tokens[-1]) == target:
-            tokens.pop()
+        if _normalize_bot_token(tokens[end - 1]) == target:
+            end -= 1
             continue
         break
-    return " ".join(tokens).strip()
+    return " ".join(tokens[start:end]).strip()
+
+
+class _BotMentionStripper:
+    # Built once per bot identity so the socket loop reuses the compiled
+    # mention pattern and lowercased name for every event.
+    __slots__ = ("_mention", "_name")
+
+    def __init__(self, *, bot_user_id: str | None, bot_name: str | None) -> None:
+        self._mention = (
+            _mention_regex(bot_user_id) if bot_user_id is not None else None
+        )
+        self._name = bot_name.lower() if bot_name else None
+
+    def strip(self, text: str) -> str:
+        cleaned = text
+        if self._mention is not None and "<@" in cleaned:
+            cleaned = self._mention.sub("", cleaned)
+        if self._name:
+            cleaned = _strip_bot_name(cleaned, target=self._name)
+        return cleaned.strip()
 
 
 def _strip_bot_mention(
@@ -660,13 +878,9 @@ def _strip_bot_mention(
     bot_user_id: str | None,
     bot_name: str | None,
 ) -> str:
-    cleaned = text
-    if bot_user_id is not None:
-        pattern = _mention_regex(bot_user_id)
-        cleaned = pattern.sub("", text)
-    if bot_name:
-        cleaned = _strip_bot_name(cleaned, bot_name=bot_name)
-    return cleaned.strip()
+    return _BotMentionStripper(bot_user_id=bot_user_id, bot_name=bot_name).strip(
+        text
+    )
 
 
 def _parse_form_payload(raw: str) -> dict[str, str]:
@@ -698,6 +912,74 @@ def _coerce_socket_payload(payload: object) -> dict[str, Any] | None:
     return None
 
 
+def _envelope_thread_key(
+    envelope: dict[str, Any], channel_ids: Collection[str]
+) -> str | None:
+    # The thread an envelope belongs to, for routing to the worker that owns
+    # it; None for anything not tied to a thread in a served channel.
+    msg_type = envelope.get("type")
+    if msg_type == "events_api":
+        payload = envelope.get("payload")
+        event = payload.get("event") if isinstance(payload, dict) else None
+        if not isinstance(event, dict):
+            return None
+        channel_id = event.get("channel")
+        thread_ts = event.get("thread_ts") or event.get("ts")
+    elif msg_type in {"interactive", "slash_commands"}:
+        payload = _coerce_socket_payload(envelope.get("payload"))
+        if payload is None:
+            return None
+        channel = payload.get("channel")
+        channel_id = payload.get("channel_id")
+        if isinstance(channel, dict):
+            channel_id = channel.get("id")
+        message = payload.get("message")
+        container = payload.get("container")
+        thread_ts = None
+        if isinstance(message, dict):
+            thread_ts = message.get("thread_ts") or message.get("ts")
+        elif isinstance(container, dict):
+            thread_ts = container.get("thread_ts") or container.get("message_ts")
+        else:
+            thread_ts = payload.get("thread_ts") or payload.get("message_ts")
+        # A slash command outside a thread acts on the channel's own
+        # settings, so it goes to whoever owns those.
+        if msg_type == "slash_commands" and not thread_ts:
+            thread_ts = channel_id
+    else:
+        return None
+    if not isinstance(channel_id, str) or channel_id not in channel_ids:
+        return None
+    if not isinstance(thread_ts, str) or not thread_ts:
+        return None
+    return thread_key(channel_id, thread_ts)
+
+
+def _is_fleet_command(
+    envelope: dict[str, Any], channel_ids: Collection[str]
+) -> bool:
+    # Maintenance that walks every thread has to run on every worker, since
+    # each one keeps the state of its own threads.
+    if envelope.get("type") != "slash_commands":
+        return False
+    payload = _coerce_socket_payload(envelope.get("payload"))
+    if payload is None or payload.get("channel_id") not in channel_ids:
+        return False
+    text = payload.get("text") or ""
+    if not isinstance(text, str):
+        text = ""
+    tokens = tuple(split_command_args(text))
+    command_id = _extract_slash_payload_command(payload.get("command"))
+    if command_id:
+        tokens = (command_id, *tokens)
+    if not tokens:
+        return False
+    head = tokens[0].lstrip("/").lower()
+    if head == "prune":
+        return True
+    return head == "archive" and len(tokens) >= 2 and tokens[1].lower() == "stale"
+
+
 def _should_skip_message(message: SlackMessage, bot_user_id: str | None) -> bool:
     if not message.ts:
         return True
@@ -789,6 +1071,11 @@ async def _handle_slack_message(
                     thread_id=thread_id,
                 )
 
+    if context is None and directives.project is None and cfg.default_project:
+        context = RunContext(project=cfg.default_project, branch=directives.branch)
+    if engine_override is None:
+        engine_override = cfg.default_engine
+
     if thread_store is not None and thread_id is not None:
         worktree = None
         if context is not None and context.project and context.branch:
@@ -823,15 +1110,11 @@ async def _handle_slack_message(
 
     inline_command = None
     if "/" in prompt:
-        allowed_commands = set(
-            list_ids(
-                COMMAND_GROUP,
-                allowlist=cfg.runtime.allowlist,
-                reserved_ids=RESERVED_COMMAND_IDS,
-            )
-        )
+        inline_commands = cfg.command_registry.resolve(cfg.runtime.allowlist)
         inline_command = _extract_inline_command(
-            prompt, allowed_commands=allowed_commands
+            prompt,
+            allowed_commands=inline_commands.ids,
+            pattern=inline_commands.pattern,
         )
     if inline_command:
         command_id, args_text, command_text = inline_command
@@ -877,6 +1160,7 @@ async def _handle_slack_message(
             engine_overrides_resolver=command_context.engine_overrides_resolver
             if command_context is not None
             else None,
+            user_id=message.user,
         )
         if handled:
             return
@@ -925,6 +1209,9 @@ async def _handle_slack_message(
         thread_id=thread_id,
         on_thread_known=on_thread_known,
         run_options=run_options,
+        scheduler=cfg.run_scheduler,
+        user_id=message.user,
+        repo_locks=cfg.repo_locks,
     )
 
 
@@ -989,6 +1276,26 @@ async def _safe_handle_slack_message(
         )
 
 
+def _coalesce_thread_messages(
+    queued: tuple[SlackMessage, str], incoming: tuple[SlackMessage, str]
+) -> tuple[SlackMessage, str] | None:
+    queued_msg, queued_text = queued
+    incoming_msg, incoming_text = incoming
+    # The merged run is attributed to one sender, so only one person's
+    # consecutive messages are merged.
+    if queued_msg.user != incoming_msg.user:
+        return None
+    text = "\n\n".join(part for part in (queued_text, incoming_text) if part.strip())
+    message = replace(
+        incoming_msg,
+        text="\n\n".join(
+            part for part in (queued_msg.text, incoming_msg.text) if part
+        ),
+        files=[*queued_msg.files, *incoming_msg.files],
+    )
+    return message, text
+
+
 def _session_thread_id(channel_id: str, thread_ts: str | None) -> str:
     return thread_ts if thread_ts else channel_id
 
@@ -1030,11 +1337,19 @@ def _format_context_directive(context: RunContext | None) -> str | None:
 
 
 def _extract_inline_command(
-    prompt: str, *, allowed_commands: set[str]
+    prompt: str,
+    *,
+    allowed_commands: Collection[str],
+    pattern: re.Pattern[str] | None = INLINE_COMMAND_RE,
 ) -> tuple[str, str, str] | None:
-    if not prompt.strip() or not allowed_commands or "/" not in prompt:
+    if (
+        pattern is None
+        or not allowed_commands
+        or "/" not in prompt
+        or not prompt.strip()
+    ):
         return None
-    for match in INLINE_COMMAND_RE.finditer(prompt):
+    for match in pattern.finditer(prompt):
         command_id = match.group("cmd").lower()
         if command_id not in allowed_commands:
             continue
@@ -1127,10 +1442,14 @@ async def _resolve_command_context(
         channel_id=channel_id,
         thread_id=thread_id,
     )
+    if default_context is None and cfg.default_project:
+        default_context = RunContext(project=cfg.default_project)
     default_engine_override = await thread_store.get_default_engine(
         channel_id=channel_id,
         thread_id=thread_id,
     )
+    if default_engine_override is None:
+        default_engine_override = cfg.default_engine
 
     async def engine_overrides_resolver(
         engine_id: str,
@@ -1158,7 +1477,11 @@ async def _handle_slash_command(
     cfg: SlackBridgeConfig,
     payload: dict[str, Any],
     running_tasks: RunningTasks,
+    *,
+    relayed: bool = False,
 ) -> None:
+    # `relayed` marks another worker's copy of a fleet-wide command: it only
+    # answers when it did something, and never repeats usage errors.
     channel_id = payload.get("channel_id")
     if not isinstance(channel_id, str) or channel_id != cfg.channel_id:
         return
@@ -1230,11 +1553,31 @@ async def _handle_slash_command(
             channel_id=channel_id,
             thread_id=thread_id,
         )
+        worktree_status = None
+        worktree_size = None
+        context = state.get("context") if state else None
+        if isinstance(context, dict) and context.get("project") and context.get(
+            "branch"
+        ):
+            worktree = WorktreeSnapshot(
+                project=str(context["project"]),
+                branch=str(context["branch"]),
+            )
+            worktree_status = await _inspect_worktree(
+                cfg,
+                project=worktree.project,
+                branch=worktree.branch,
+            )
+            worktree_size = _worktree_size(cfg, worktree)
         await _respond_ephemeral(
             cfg,
             response_url=response_url,
             channel_id=channel_id,
-            text=_format_status(state),
+            text=_format_status(
+                state,
+                worktree_status=worktree_status,
+                worktree_size=worktree_size,
+            ),
         )
         return
 
@@ -1382,6 +1725,80 @@ async def _handle_slash_command(
         )
         return
 
+    if command_id == "prune":
+        retention_days = cfg.thread_retention_days
+        if len(tokens) >= 2:
+            retention_days = _parse_retention_days(tokens[1])
+            if retention_days is None:
+                if not relayed:
+                    await _respond_ephemeral(
+                        cfg,
+                        response_url=response_url,
+                        channel_id=channel_id,
+                        text="usage: /takopi prune [days]",
+                    )
+                return
+        if retention_days is None:
+            if not relayed:
+                await _respond_ephemeral(
+                    cfg,
+                    response_url=response_url,
+                    channel_id=channel_id,
+                    text="thread retention is not configured; use /takopi prune <days>.",
+                )
+            return
+        result = await _prune_threads(cfg, retention_days=retention_days)
+        if relayed and not result.removed:
+            return
+        await _respond_ephemeral(
+            cfg,
+            response_url=response_url,
+            channel_id=channel_id,
+            text=_worker_label(
+                cfg, _format_prune_result(result, retention_days=retention_days)
+            ),
+        )
+        return
+
+    if command_id == "archive" and len(tokens) >= 2 and tokens[1].lower() == "stale":
+        filters = _parse_bulk_archive_filters(tokens[2:])
+        if filters is None:
+            if relayed:
+                return
+            await _respond_ephemeral(
+                cfg,
+                response_url=response_url,
+                channel_id=channel_id,
+                text="usage: /takopi archive stale [project=<name>] [owner=<@user>]",
+            )
+            return
+        project, owner = filters
+        snapshots = _select_stale_worktrees(
+            cfg,
+            await thread_store.list_thread_snapshots(),
+            now=time.time(),
+            project=project,
+            owner_user_id=owner,
+        )
+        if relayed and not snapshots:
+            return
+        if snapshots:
+            await _respond_ephemeral(
+                cfg,
+                response_url=response_url,
+                channel_id=channel_id,
+                text=_worker_label(
+                    cfg, f"archiving {len(snapshots)} stale worktree(s)…"
+                ),
+            )
+        result = await _bulk_archive_worktrees(cfg, snapshots)
+        await cfg.client.post_message(
+            channel_id=channel_id,
+            text=_worker_label(cfg, _format_bulk_archive_result(result)),
+            thread_ts=thread_ts,
+        )
+        return
+
     if command_id == "session" and len(tokens) >= 2 and tokens[1].lower() == "clear":
         await thread_store.clear_resumes(
             channel_id=channel_id,
@@ -1422,6 +1839,7 @@ async def _handle_slash_command(
         default_engine_override=command_context.default_engine_override,
         default_context=command_context.default_context,
         engine_overrides_resolver=command_context.engine_overrides_resolver,
+        user_id=_payload_user_id(payload),
     )
     if not handled:
         await _respond_ephemeral(
@@ -1522,6 +1940,19 @@ def _extract_payload_thread_id(payload: dict[str, Any]) -> str | None:
     return None
 
 
+def _payload_user_id(payload: dict[str, Any]) -> str | None:
+    # Slash commands carry a flat user_id; interactive payloads nest it.
+    user_id = payload.get("user_id")
+    if isinstance(user_id, str) and user_id:
+        return user_id
+    user = payload.get("user")
+    if isinstance(user, dict):
+        user_id = user.get("id")
+        if isinstance(user_id, str) and user_id:
+            return user_id
+    return None
+
+
 def _extract_action_message_ts(payload: dict[str, Any]) -> str | None:
     message = payload.get("message")
     if isinstance(message, dict):
@@ -1596,7 +2027,19 @@ async def _reset_project_to_origin_main(
     if path is None or not path.exists():
         return False, "project path not found on disk."
 
+    try:
+        async with cfg.repo_locks.hold(repo_key(path)):
+            return await _reset_repo_to_origin_main(cfg, path)
+    except RepoBusyError:
+        return False, REPO_BUSY_TEXT
+
+
+async def _reset_repo_to_origin_main(
+    cfg: SlackBridgeConfig,
+    path: Path,
+) -> tuple[bool, str]:
     code, stdout, stderr = await _run_git(
+        cfg,
         ["git", "-C", str(path), "fetch", "origin", "main"],
         cwd=path,
     )
@@ -1605,6 +2048,7 @@ async def _reset_project_to_origin_main(
         return False, f"git fetch failed: {details}"
 
     code, stdout, stderr = await _run_git(
+        cfg,
         ["git", "-C", str(path), "reset", "--hard", "origin/main"],
         cwd=path,
     )
@@ -1613,6 +2057,7 @@ async def _reset_project_to_origin_main(
         return False, f"git reset failed: {details}"
 
     code, stdout, stderr = await _run_git(
+        cfg,
         ["git", "-C", str(path), "clean", "-fd"],
         cwd=path,
     )
@@ -1741,9 +2186,9 @@ async def _handle_custom_action(
     payload: dict[str, Any],
     running_tasks: RunningTasks,
 ) -> bool:
-    action_map: dict[str, tuple[str, str]] = {}
+    action_map: dict[str, SlackActionHandler] = {}
     for handler in cfg.action_handlers:
-        action_map[handler.action_id] = (handler.command, handler.args)
+        action_map[handler.action_id] = handler
     if not action_map:
         return False
     action = _extract_block_action(
@@ -1761,10 +2206,10 @@ async def _handle_custom_action(
     action_id = action.get("action_id")
     if not isinstance(action_id, str):
         return True
-    action_entry = action_map.get(action_id)
-    if action_entry is None:
+    handler = action_map.get(action_id)
+    if handler is None:
         return True
-    command_id, args_text = action_entry
+    command_id, args_text = handler.command, handler.args
 
     thread_ts = _extract_action_thread_id(payload, action)
     if thread_ts is None:
@@ -1809,6 +2254,8 @@ async def _handle_custom_action(
         default_engine_override=command_context.default_engine_override,
         default_context=command_context.default_context,
         engine_overrides_resolver=command_context.engine_overrides_resolver,
+        user_id=_payload_user_id(payload),
+        priority=handler.priority,
     )
     if not handled:
         await _respond_ephemeral(
@@ -1837,8 +2284,7 @@ async def _archive_thread(
         )
         if ok:
             await cfg.thread_store.clear_worktree(
-                channel_id=channel_id,
-                thread_id=thread_id,
+                channel_id=channel_id, thread_id=thread_id
             )
         text = (
             f"archive: {_format_worktree_ref(snapshot.worktree)} {result}"
@@ -1883,6 +2329,115 @@ async def _archive_thread(
     )
 
 
+@dataclass(frozen=True, slots=True)
+class BulkArchiveResult:
+    archived: list[ThreadSnapshot]
+    failed: list[tuple[ThreadSnapshot, str]]
+
+
+def _select_stale_worktrees(
+    cfg: SlackBridgeConfig,
+    snapshots: list[ThreadSnapshot],
+    *,
+    now: float,
+    project: str | None = None,
+    owner_user_id: str | None = None,
+) -> list[ThreadSnapshot]:
+    selected: list[ThreadSnapshot] = []
+    for snapshot in snapshots:
+        worktree = snapshot.worktree
+        if worktree is None or snapshot.last_activity_at is None:
+            continue
+        if project is not None and worktree.project.lower() != project.lower():
+            continue
+        if owner_user_id is not None and snapshot.owner_user_id != owner_user_id:
+            continue
+        idle_s = now - snapshot.last_activity_at
+        if idle_s >= _stale_worktree_hours(cfg, worktree) * 3600.0:
+            selected.append(snapshot)
+    return selected
+
+
+async def _bulk_archive_worktrees(
+    cfg: SlackBridgeConfig,
+    snapshots: list[ThreadSnapshot],
+) -> BulkArchiveResult:
+    # Projects are archived in parallel up to bulk_archive_concurrency, but
+    # worktrees of one repository go one after another so git never races
+    # itself on the shared repository metadata.
+    by_project: dict[str, list[ThreadSnapshot]] = {}
+    for snapshot in snapshots:
+        assert snapshot.worktree is not None
+        by_project.setdefault(snapshot.worktree.project.lower(), []).append(snapshot)
+    archived: list[ThreadSnapshot] = []
+    failed: list[tuple[ThreadSnapshot, str]] = []
+    limiter = anyio.CapacityLimiter(max(1, cfg.bulk_archive_concurrency))
+
+    async def archive_project(group: list[ThreadSnapshot]) -> None:
+        async with limiter:
+            for snapshot in group:
+                try:
+                    ok, result = await _delete_worktree_for_snapshot(
+                        cfg, snapshot, force_cleanup=False
+                    )
+                    if ok:
+                        await cfg.thread_store.clear_worktree(
+                            channel_id=snapshot.channel_id,
+                            thread_id=snapshot.thread_id,
+                        )
+                except Exception as exc:
+                    logger.exception(
+                        "slack.bulk_archive_failed",
+                        error=str(exc),
+                        error_type=exc.__class__.__name__,
+                    )
+                    ok, result = False, str(exc)
+                if ok:
+                    archived.append(snapshot)
+                else:
+                    failed.append((snapshot, result))
+
+    async with anyio.create_task_group() as tg:
+        for group in by_project.values():
+            tg.start_soon(archive_project, group)
+    return BulkArchiveResult(archived=archived, failed=failed)
+
+
+def _format_bulk_archive_result(result: BulkArchiveResult, *, limit: int = 20) -> str:
+    total = len(result.archived) + len(result.failed)
+    if total == 0:
+        return "bulk archive: no stale worktrees found."
+    lines = [
+        f"bulk archive: {len(result.archived)} of {total} stale worktree(s) archived."
+    ]
+    for snapshot, reason in result.failed[:limit]:
+        assert snapshot.worktree is not None
+        lines.append(f"• {_format_worktree_ref(snapshot.worktree)} skipped: {reason}")
+    if len(result.failed) > limit:
+        lines.append(f"• … and {len(result.failed) - limit} more")
+    return "\n".join(lines)
+
+
+def _parse_bulk_archive_filters(
+    tokens: Sequence[str],
+) -> tuple[str | None, str | None] | None:
+    project = None
+    owner = None
+    for token in tokens:
+        key, sep, value = token.partition("=")
+        value = value.strip()
+        if not sep or not value:
+            return None
+        key = key.lower()
+        if key == "project":
+            project = value.lstrip("/")
+        elif key == "owner":
+            owner = value.removeprefix("<@").removesuffix(">").split("|", 1)[0]
+        else:
+            return None
+    return project, owner
+
+
 async def _finalize_archive_message(
     cfg: SlackBridgeConfig,
     *,
@@ -1924,14 +2479,10 @@ async def _delete_worktree_for_snapshot(
         return False, "worktree data not found for this thread."
     if worktree.branch.lower() in {"main", "master"}:
         return False, "refusing to delete the main branch worktree."
-    try:
-        worktree_path = cfg.runtime.resolve_run_cwd(
-            RunContext(project=worktree.project, branch=worktree.branch)
-        )
-    except ConfigError as exc:
-        return False, f"could not resolve worktree path: {exc}"
-    path = _safely_resolve_path(worktree_path)
-    if path is None or not path.exists():
+    path = _resolve_worktree_path(
+        cfg, project=worktree.project, branch=worktree.branch
+    )
+    if path is None:
         return False, "worktree path not found on disk."
 
     base_path = None
@@ -1945,30 +2496,39 @@ async def _delete_worktree_for_snapshot(
     if base is not None and base.resolve() == path.resolve():
         return False, "refusing to delete the project base worktree."
 
-    code, stdout, stderr = await _run_git(
-        ["git", "-C", str(path), "rev-parse", "--abbrev-ref", "HEAD"],
-        cwd=path,
-    )
-    if code != 0:
-        details = stderr.strip() or stdout.strip()
-        return False, f"could not read worktree branch: {details}"
-    branch_name = stdout.strip()
-    if branch_name and branch_name != worktree.branch:
+    # Lock order is always repository, then worktree.
+    keys = [repo_key(path)] if base is None else [repo_key(base), repo_key(path)]
+    try:
+        async with AsyncExitStack() as stack:
+            for key in keys:
+                await stack.enter_async_context(cfg.repo_locks.hold(key))
+            return await _remove_worktree(
+                cfg, worktree, path, force_cleanup=force_cleanup
+            )
+    except RepoBusyError:
+        return False, REPO_BUSY_TEXT
+
+
+async def _remove_worktree(
+    cfg: SlackBridgeConfig,
+    worktree: WorktreeSnapshot,
+    path: Path,
+    *,
+    force_cleanup: bool,
+) -> tuple[bool, str]:
+    status, result = await cfg.git_runner.worktree_status(path)
+    if status is None:
+        return False, f"could not check worktree status: {result.details}"
+    branch_name = status.branch or "HEAD"
+    if branch_name != worktree.branch:
         return False, (
             f"worktree is on `{branch_name}`, expected `{worktree.branch}`."
         )
-
-    code, stdout, stderr = await _run_git(
-        ["git", "-C", str(path), "status", "--porcelain"],
-        cwd=path,
-    )
-    if code != 0:
-        details = stderr.strip() or stdout.strip()
-        return False, f"could not check worktree status: {details}"
-    if stdout.strip():
+    if status.dirty:
         if not force_cleanup:
             return False, "worktree has uncommitted changes; clean it before deleting."
         code, stdout, stderr = await _run_git(
+            cfg,
             ["git", "-C", str(path), "reset", "--hard", "HEAD"],
             cwd=path,
         )
@@ -1976,6 +2536,7 @@ async def _delete_worktree_for_snapshot(
             details = stderr.strip() or stdout.strip()
             return False, f"git reset failed: {details}"
         code, stdout, stderr = await _run_git(
+            cfg,
             ["git", "-C", str(path), "clean", "-fd"],
             cwd=path,
         )
@@ -1984,6 +2545,7 @@ async def _delete_worktree_for_snapshot(
             return False, f"git clean failed: {details}"
 
     code, stdout, stderr = await _run_git(
+        cfg,
         ["git", "-C", str(path), "worktree", "remove", str(path)],
         cwd=path,
     )
@@ -2115,6 +2677,8 @@ async def _handle_shortcut(
         default_engine_override=command_context.default_engine_override,
         default_context=command_context.default_context,
         engine_overrides_resolver=command_context.engine_overrides_resolver,
+        user_id=_payload_user_id(payload),
+        priority="batch",
     )
     if not handled:
         await _respond_ephemeral(
@@ -2149,11 +2713,18 @@ def _slash_usage() -> str:
         "/takopi model <engine> <model|clear>\n"
         "/takopi reasoning <engine> <level|clear>\n"
         "/takopi session clear\n"
+        "/takopi prune [days]\n"
+        "/takopi archive stale [project=<name>] [owner=<@user>]\n"
         "/takopi file <put|get> <path>\n"
     )
 
 
-def _format_status(state: dict[str, object] | None) -> str:
+def _format_status(
+    state: dict[str, object] | None,
+    *,
+    worktree_status: WorktreeStatus | None = None,
+    worktree_size: int | None = None,
+) -> str:
     if not state:
         return "no thread state found."
     lines = []
@@ -2166,6 +2737,10 @@ def _format_status(state: dict[str, object] | None) -> str:
                 lines.append(f"context: `{project}` `@{branch}`")
             else:
                 lines.append(f"context: `{project}`")
+    if worktree_status is not None:
+        lines.append(f"worktree: {worktree_status.summary()}")
+    if worktree_size is not None:
+        lines.append(f"worktree disk usage: {format_bytes(worktree_size)}")
     default_engine = state.get("default_engine")
     if isinstance(default_engine, str):
         lines.append(f"default engine: `{default_engine}`")
@@ -2191,6 +2766,32 @@ def _format_status(state: dict[str, object] | None) -> str:
     return "\n".join(lines)
 
 
+def _parse_retention_days(value: str) -> float | None:
+    try:
+        days = float(value)
+    except ValueError:
+        return None
+    if not days >= 1:
+        return None
+    return days
+
+
+def _worker_label(cfg: SlackBridgeConfig, text: str) -> str:
+    # Every worker answers fleet-wide commands, so say which one this is.
+    if cfg.cluster is None:
+        return text
+    return f"`{cfg.cluster.worker_id}`: {text}"
+
+
+def _format_prune_result(result: ThreadPruneResult, *, retention_days: float) -> str:
+    days_label = f"{retention_days:g}d"
+    reclaimed = format_bytes(result.bytes_reclaimed)
+    return (
+        f"pruned {result.removed} thread(s) idle for more than {days_label}; "
+        f"{result.remaining} remaining, {reclaimed} reclaimed."
+    )
+
+
 def _format_worktree_ref(worktree: WorktreeSnapshot) -> str:
     return f"`/{worktree.project}` `@{worktree.branch}`"
 
@@ -2201,29 +2802,64 @@ def _format_stale_worktree_text(
     hours: float,
     owner_user_id: str | None,
     prefix: str | None = None,
+    size_bytes: int | None = None,
 ) -> str:
     mention = f"<@{owner_user_id}> " if owner_user_id else ""
     label = _format_worktree_ref(worktree)
+    if size_bytes is not None:
+        label = f"{label} ({format_bytes(size_bytes)})"
     hours_label = _format_hours_label(hours)
     intro = prefix or "Worktree"
     return f"{mention}{intro} {label} has been idle for {hours_label}. Archive it?"
 
 
 async def _run_git(
+    cfg: SlackBridgeConfig,
     args: list[str],
     *,
     cwd: Path,
 ) -> tuple[int, str, str]:
-    def _exec() -> subprocess.CompletedProcess[str]:
-        return subprocess.run(
-            args,
-            cwd=cwd,
-            text=True,
-            capture_output=True,
+    result = await cfg.git_runner.run(args, cwd=cwd)
+    return result.returncode, result.stdout, result.stderr
+
+
+async def _inspect_worktree(
+    cfg: SlackBridgeConfig,
+    *,
+    project: str,
+    branch: str,
+) -> WorktreeStatus | None:
+    # Best effort: reminders and /status still work without the extra detail.
+    path = _resolve_worktree_path(cfg, project=project, branch=branch)
+    if path is None:
+        return None
+    status, result = await cfg.git_runner.worktree_status(path)
+    if status is None:
+        logger.info(
+            "slack.worktree_status_failed",
+            project=project,
+            branch=branch,
+            error=result.details,
         )
+    return status
 
-    completed = await anyio.to_thread.run_sync(_exec)
-    return completed.returncode, completed.stdout, completed.stderr
+
+def _resolve_worktree_path(
+    cfg: SlackBridgeConfig,
+    *,
+    project: str,
+    branch: str,
+) -> Path | None:
+    return existing_run_path(cfg.runtime, RunContext(project=project, branch=branch))
+
+
+def _worktree_size(cfg: SlackBridgeConfig, worktree: WorktreeSnapshot) -> int | None:
+    if cfg.disk_usage is None:
+        return None
+    path = _resolve_worktree_path(cfg, project=worktree.project, branch=worktree.branch)
+    if path is None:
+        return None
+    return cfg.disk_usage.last_size(path)
 
 
 def _safely_resolve_path(path: Path | str | None) -> Path | None:
@@ -2235,19 +2871,44 @@ def _safely_resolve_path(path: Path | str | None) -> Path | None:
         return None
 
 
+def _stale_worktree_hours(cfg: SlackBridgeConfig, worktree: WorktreeSnapshot) -> float:
+    scheduler = cfg.stale_worktree_scheduler
+    if scheduler is None:
+        return cfg.stale_worktree_hours
+    return scheduler.stale_hours_for(worktree.project)
+
+
 async def _send_stale_worktree_reminder(
     cfg: SlackBridgeConfig,
     snapshot: ThreadSnapshot,
     *,
     now: float,
+    disk_pressure: bool = False,
 ) -> None:
     if snapshot.worktree is None:
         return
-    text = _format_stale_worktree_text(
-        worktree=snapshot.worktree,
-        hours=cfg.stale_worktree_hours,
-        owner_user_id=snapshot.owner_user_id,
+    if disk_pressure and snapshot.last_activity_at is not None:
+        text = _format_stale_worktree_text(
+            worktree=snapshot.worktree,
+            hours=max(0.0, now - snapshot.last_activity_at) / 3600.0,
+            owner_user_id=snapshot.owner_user_id,
+            prefix="Disk space is low. Worktree",
+            size_bytes=_worktree_size(cfg, snapshot.worktree),
+        )
+    else:
+        text = _format_stale_worktree_text(
+            worktree=snapshot.worktree,
+            hours=_stale_worktree_hours(cfg, snapshot.worktree),
+            owner_user_id=snapshot.owner_user_id,
+            size_bytes=_worktree_size(cfg, snapshot.worktree),
+        )
+    status = await _inspect_worktree(
+        cfg,
+        project=snapshot.worktree.project,
+        branch=snapshot.worktree.branch,
     )
+    if status is not None:
+        text = f"{text}\n{status.summary()}"
     blocks = _build_archive_blocks(
         text,
         thread_id=snapshot.thread_id,
@@ -2269,37 +2930,53 @@ async def _send_stale_worktree_reminder(
     )
 
 
+async def _rescan_stale_worktrees(
+    cfg: SlackBridgeConfig,
+    scheduler: StaleWorktreeScheduler,
+) -> None:
+    try:
+        snapshots = await cfg.thread_store.list_thread_snapshots()
+    except Exception as exc:
+        logger.exception(
+            "slack.stale_worktree_scan_failed",
+            error=str(exc),
+            error_type=exc.__class__.__name__,
+        )
+        return
+    for snapshot in snapshots:
+        scheduler.schedule(snapshot)
+
+
 async def _run_stale_worktree_reminders(cfg: SlackBridgeConfig) -> None:
     if not cfg.stale_worktree_reminder or cfg.thread_store is None:
         return
-    interval_s = max(30.0, float(cfg.stale_worktree_check_interval_s))
-    stale_s = max(0.0, float(cfg.stale_worktree_hours) * 3600.0)
+    scheduler = cfg.stale_worktree_scheduler
+    if scheduler is None:
+        return
+    # Thread store writes and reloads feed the scheduler (see backend), so
+    # deadlines drive the wakeups; the rescan is only a safety net.
+    rescan_s = max(30.0, float(cfg.stale_worktree_check_interval_s))
+    next_rescan = 0.0
     while True:
         now = time.time()
-        try:
-            snapshots = await cfg.thread_store.list_thread_snapshots()
-        except Exception as exc:
-            logger.exception(
-                "slack.stale_worktree_scan_failed",
-                error=str(exc),
-                error_type=exc.__class__.__name__,
-            )
-            await anyio.sleep(interval_s)
-            continue
+        if now >= next_rescan:
+            await _rescan_stale_worktrees(cfg, scheduler)
+            next_rescan = now + rescan_s
 
-        for snapshot in snapshots:
-            if snapshot.worktree is None or snapshot.last_activity_at is None:
-                continue
-            if now < snapshot.last_activity_at + stale_s:
-                continue
-            reminder = snapshot.reminder
-            if (
-                reminder is not None
-                and reminder.sent_at is not None
-                and reminder.sent_at >= snapshot.last_activity_at
-            ):
-                continue
+        for channel_id, thread_id in scheduler.pop_due(now):
             try:
+                snapshot = await cfg.thread_store.get_thread_snapshot(
+                    channel_id=channel_id,
+                    thread_id=thread_id,
+                )
+                if snapshot is None:
+                    continue
+                deadline = scheduler.deadline_for(snapshot)
+                if deadline is None:
+                    continue
+                if now < deadline:
+                    scheduler.schedule(snapshot)
+                    continue
                 await _send_stale_worktree_reminder(cfg, snapshot, now=now)
             except Exception as exc:
                 logger.exception(
@@ -2307,9 +2984,174 @@ async def _run_stale_worktree_reminders(cfg: SlackBridgeConfig) -> None:
                     error=str(exc),
                     error_type=exc.__class__.__name__,
                 )
+        await scheduler.wait(max_wait_s=max(0.0, next_rescan - time.time()))
+
+
+async def _scan_worktree_disk_usage(
+    cfg: SlackBridgeConfig,
+    *,
+    now: float,
+) -> list[tuple[ThreadSnapshot, Path, int]]:
+    scanner = cfg.disk_usage
+    if scanner is None or cfg.thread_store is None:
+        return []
+    # Threads can share a project/branch worktree: scan each directory once
+    # and keep its most recently active thread, so it is only idle (and
+    # reminded about once) when every thread using it is.
+    by_path: dict[str, tuple[ThreadSnapshot, Path]] = {}
+    for snapshot in await cfg.thread_store.list_thread_snapshots():
+        worktree = snapshot.worktree
+        if worktree is None:
+            continue
+        path = _resolve_worktree_path(
+            cfg, project=worktree.project, branch=worktree.branch
+        )
+        if path is None:
+            continue
+        key = repo_key(path)
+        kept = by_path.get(key)
+        if kept is None or (snapshot.last_activity_at or 0.0) > (
+            kept[0].last_activity_at or 0.0
+        ):
+            by_path[key] = (snapshot, path)
+    measured: list[tuple[ThreadSnapshot, Path, int]] = []
+    for snapshot, path in by_path.values():
+        measured.append((snapshot, path, await scanner.scan(path)))
+    scanner.retain({path for _snapshot, path, _size in measured})
+    if cfg.disk_pressure_free_bytes is not None:
+        await _remind_under_disk_pressure(cfg, measured, now=now)
+    return measured
+
+
+def _reminded_since_activity(snapshot: ThreadSnapshot) -> bool:
+    reminder = snapshot.reminder
+    return (
+        reminder is not None
+        and reminder.sent_at is not None
+        and snapshot.last_activity_at is not None
+        and reminder.sent_at >= snapshot.last_activity_at
+    )
+
+
+async def _remind_under_disk_pressure(
+    cfg: SlackBridgeConfig,
+    measured: list[tuple[ThreadSnapshot, Path, int]],
+    *,
+    now: float,
+) -> None:
+    # When a filesystem runs low, remind about its largest idle worktrees
+    # first instead of waiting for their stale deadlines.
+    threshold = cfg.disk_pressure_free_bytes
+    if threshold is None:
+        return
+    free_by_device: dict[int, int] = {}
+    candidates: list[tuple[int, ThreadSnapshot]] = []
+    for snapshot, path, size in measured:
+        if snapshot.last_activity_at is None or _reminded_since_activity(snapshot):
+            continue
+        if now - snapshot.last_activity_at < DISK_PRESSURE_MIN_IDLE_S:
+            continue
+        try:
+            device = path.stat().st_dev
+            if device not in free_by_device:
+                free_by_device[device] = shutil.disk_usage(path).free
+        except OSError:
+            continue
+        if free_by_device[device] < threshold:
+            candidates.append((size, snapshot))
+    if not candidates:
+        return
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    logger.warning(
+        "slack.disk_pressure",
+        candidates=len(candidates),
+        free_bytes=min(free_by_device.values()),
+    )
+    for _size, snapshot in candidates[: cfg.disk_pressure_reminders]:
+        await _send_stale_worktree_reminder(
+            cfg, snapshot, now=now, disk_pressure=True
+        )
+
+
+async def _run_worktree_disk_scan(cfg: SlackBridgeConfig) -> None:
+    if cfg.disk_usage is None or cfg.thread_store is None:
+        return
+    interval_s = max(60.0, float(cfg.disk_scan_interval_s))
+    while True:
+        try:
+            await _scan_worktree_disk_usage(cfg, now=time.time())
+        except Exception as exc:
+            logger.exception(
+                "slack.disk_scan_failed",
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+        await anyio.sleep(interval_s)
+
+
+async def _prune_threads(
+    cfg: SlackBridgeConfig,
+    *,
+    retention_days: float,
+) -> ThreadPruneResult:
+    result = await cfg.thread_store.prune_threads(
+        max_idle_s=retention_days * 86400.0,
+        now=time.time(),
+    )
+    logger.info(
+        "slack.thread_sessions.pruned",
+        removed=result.removed,
+        remaining=result.remaining,
+        bytes_reclaimed=result.bytes_reclaimed,
+    )
+    return result
+
+
+async def _run_thread_pruning(cfg: SlackBridgeConfig) -> None:
+    retention_days = cfg.thread_retention_days
+    if retention_days is None or cfg.thread_store is None:
+        return
+    interval_s = max(60.0, float(cfg.thread_prune_interval_s))
+    while True:
+        try:
+            await _prune_threads(cfg, retention_days=retention_days)
+        except Exception as exc:
+            logger.exception(
+                "slack.thread_prune_failed",
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
         await anyio.sleep(interval_s)
 
 
+def _build_channel_routes(cfg: SlackBridgeConfig) -> dict[str, SlackBridgeConfig]:
+    # One config per served channel, built once so routing an event is a
+    # dict lookup. Everything but the channel defaults and file settings is
+    # shared with the primary config.
+    routes = {cfg.channel_id: cfg}
+    for channel in cfg.channels:
+        routes[channel.channel_id] = replace(
+            cfg,
+            channel_id=channel.channel_id,
+            files=channel.files if channel.files is not None else cfg.files,
+            default_project=channel.project,
+            default_engine=channel.engine,
+        )
+    return routes
+
+
+EVENT_DEDUPE_SAVE_INTERVAL_S = 30.0
+
+
+async def _run_event_dedupe_persist(cfg: SlackBridgeConfig) -> None:
+    try:
+        while True:
+            await anyio.sleep(EVENT_DEDUPE_SAVE_INTERVAL_S)
+            cfg.event_dedupe.save()
+    finally:
+        cfg.event_dedupe.save()
+
+
 async def _run_socket_loop(
     cfg: SlackBridgeConfig,
     *,
@@ -2322,110 +3164,163 @@ async def _run_socket_loop(
         )
 
     running_tasks: RunningTasks = {}
-    backoff_s = 1.0
+    mention_stripper = _BotMentionStripper(
+        bot_user_id=bot_user_id, bot_name=bot_name
+    )
+    mailbox: ThreadMailbox[tuple[SlackMessage, str]] = ThreadMailbox(
+        coalesce=_coalesce_thread_messages
+        if cfg.thread_message_policy == "coalesce"
+        else None
+    )
+
+    async def handle_queued(
+        channel_cfg: SlackBridgeConfig, item: tuple[SlackMessage, str]
+    ) -> None:
+        message, cleaned = item
+        await _safe_handle_slack_message(channel_cfg, message, cleaned, running_tasks)
+
+    routes = _build_channel_routes(cfg)
+    cluster = cfg.cluster
+
+    def dispatch(envelope: dict[str, Any], hops: int = 0) -> None:
+        # With several workers, envelopes for a thread owned elsewhere are
+        # forwarded to its owner; the owner's own are handled right away.
+        # Fleet-wide commands run on the worker that got them and on a copy
+        # sent to every other worker.
+        if cluster is not None:
+            if _is_fleet_command(envelope, routes):
+                if hops == 0:
+                    tg.start_soon(cluster.broadcast, envelope)
+                dispatch_local(envelope, relayed=hops > 0)
+                return
+            key = _envelope_thread_key(envelope, routes)
+            if key is not None:
+                if not cluster.holds(key):
+                    tg.start_soon(route_envelope, envelope, key, hops)
+                    return
+                cluster.touch(key)
+        dispatch_local(envelope)
+
+    async def route_envelope(envelope: dict[str, Any], key: str, hops: int) -> None:
+        assert cluster is not None
+        if hops >= MAX_FORWARD_HOPS:
+            await cluster.claim(key)
+        else:
+            owner = await cluster.route(key)
+            if owner is not None and await cluster.forward(
+                owner, key, envelope, hops=hops
+            ):
+                return
+        # A thread taken over here brings its settings along.
+        if cluster.holds(key) and cfg.thread_store is not None:
+            settings = await cluster.load_settings(key)
+            if settings is not None:
+                channel_id, _, thread_id = key.partition(":")
+                await cfg.thread_store.import_settings(
+                    channel_id=channel_id, thread_id=thread_id, settings=settings
+                )
+        dispatch_local(envelope)
+
+    def connection_budget() -> int:
+        # Workers of a cluster share the app's connection limit.
+        return socket_budget(1 if cluster is None else len(cluster.ring.nodes))
+
+    def dispatch_local(envelope: dict[str, Any], *, relayed: bool = False) -> None:
+        msg_type = envelope.get("type")
+        if msg_type == "slash_commands":
+            payload = _coerce_socket_payload(envelope.get("payload"))
+            if payload is None:
+                return
+            channel_cfg = routes.get(payload.get("channel_id"))
+            if channel_cfg is not None:
+                tg.start_soon(
+                    functools.partial(
+                        _handle_slash_command,
+                        channel_cfg,
+                        payload,
+                        running_tasks,
+                        relayed=relayed,
+                    )
+                )
+            return
+        if msg_type == "interactive":
+            payload = _coerce_socket_payload(envelope.get("payload"))
+            if payload is None:
+                return
+            channel = payload.get("channel")
+            channel_id = channel.get("id") if isinstance(channel, dict) else None
+            channel_cfg = routes.get(channel_id, cfg)
+            tg.start_soon(_handle_interactive, channel_cfg, payload, running_tasks)
+            return
+        if msg_type != "events_api":
+            return
+
+        payload = envelope.get("payload")
+        if not isinstance(payload, dict):
+            return
+        event = payload.get("event")
+        if not isinstance(event, dict):
+            return
+
+        event_type = event.get("type")
+        if event_type not in {"message", "app_mention"}:
+            return
+        channel = event.get("channel")
+        channel_cfg = routes.get(channel)
+        if channel_cfg is None:
+            return
+
+        msg = SlackMessage.from_api(event)
+        if _should_skip_message(msg, bot_user_id):
+            return
+        cleaned = mention_stripper.strip(msg.text or "")
+        has_files = bool(msg.files)
+        if not cleaned.strip() and not has_files:
+            return
+        # Slack redelivers events after a slow ack or a reconnect; each one
+        # would otherwise cost a full engine run.
+        if cfg.event_dedupe.check(
+            event_keys(channel, event, payload.get("event_id"))
+        ):
+            logger.info(
+                "slack.event.duplicate",
+                event_id=payload.get("event_id"),
+                ts=msg.ts,
+                duplicates=cfg.event_dedupe.stats().duplicates,
+            )
+            return
+        # Messages in one thread run one after another so they never race on
+        # thread state or resume tokens.
+        mailbox.submit(
+            tg,
+            (channel, msg.thread_ts or msg.ts),
+            (msg, cleaned),
+            functools.partial(handle_queued, channel_cfg),
+        )
 
     async with anyio.create_task_group() as tg:
+        if cfg.thread_store is not None:
+            tg.start_soon(cfg.thread_store.watch_external_changes)
         if cfg.stale_worktree_reminder and cfg.thread_store is not None:
             tg.start_soon(_run_stale_worktree_reminders, cfg)
-        while True:
-            try:
-                socket_url = await open_socket_url(cfg.app_token)
-            except SlackApiError as exc:
-                logger.warning("slack.socket.open_failed", error=str(exc))
-                await anyio.sleep(backoff_s)
-                continue
-
-            try:
-                async with websockets.connect(
-                    socket_url,
-                    ping_interval=10,
-                    ping_timeout=10,
-                ) as ws:
-                    while True:
-                        raw = await ws.recv()
-                        if isinstance(raw, bytes):
-                            raw = raw.decode("utf-8", "ignore")
-                        try:
-                            envelope = json.loads(raw)
-                        except json.JSONDecodeError:
-                            logger.warning("slack.socket.bad_payload")
-                            continue
-
-                        envelope_id = envelope.get("envelope_id")
-                        if isinstance(envelope_id, str) and envelope_id:
-                            await ws.send(
-                                json.dumps({"envelope_id": envelope_id})
-                            )
-
-                        msg_type = envelope.get("type")
-                        if msg_type == "disconnect":
-                            logger.info("slack.socket.disconnect")
-                            break
-                        if msg_type == "slash_commands":
-                            payload = _coerce_socket_payload(
-                                envelope.get("payload")
-                            )
-                            if payload is not None:
-                                tg.start_soon(
-                                    _handle_slash_command,
-                                    cfg,
-                                    payload,
-                                    running_tasks,
-                                )
-                            continue
-                        if msg_type == "interactive":
-                            payload = _coerce_socket_payload(
-                                envelope.get("payload")
-                            )
-                            if payload is not None:
-                                tg.start_soon(
-                                    _handle_interactive,
-                                    cfg,
-                                    payload,
-                                    running_tasks,
-                                )
-                            continue
-                        if msg_type != "events_api":
-                            continue
-
-                        payload = envelope.get("payload")
-                        if not isinstance(payload, dict):
-                            continue
-                        event = payload.get("event")
-                        if not isinstance(event, dict):
-                            continue
-
-                        event_type = event.get("type")
-                        if event_type not in {"message", "app_mention"}:
-                            continue
-                        channel = event.get("channel")
-                        if channel != cfg.channel_id:
-                            continue
-
-                        msg = SlackMessage.from_api(event)
-                        if _should_skip_message(msg, bot_user_id):
-                            continue
-                        cleaned = _strip_bot_mention(
-                            msg.text or "",
-                            bot_user_id=bot_user_id,
-                            bot_name=bot_name,
-                        )
-                        has_files = bool(msg.files)
-                        if not cleaned.strip() and not has_files:
-                            continue
-                        tg.start_soon(
-                            _safe_handle_slack_message,
-                            cfg,
-                            msg,
-                            cleaned,
-                            running_tasks,
-                        )
-            except WebSocketException as exc:
-                logger.warning("slack.socket_failed", error=str(exc))
-            except OSError as exc:
-                logger.warning("slack.socket_failed", error=str(exc))
-
-            await anyio.sleep(backoff_s)
+        if cfg.thread_retention_days is not None and cfg.thread_store is not None:
+            tg.start_soon(_run_thread_pruning, cfg)
+        if cfg.disk_usage is not None and cfg.thread_store is not None:
+            tg.start_soon(_run_worktree_disk_scan, cfg)
+        if cfg.event_dedupe.path is not None:
+            tg.start_soon(_run_event_dedupe_persist, cfg)
+        if cluster is not None:
+            tg.start_soon(cluster.run, dispatch)
+        opener = SocketUrlOpener(cfg.app_token)
+        try:
+            await SocketModeRunner(
+                opener,
+                connections=cfg.socket_connections,
+                budget=connection_budget,
+            ).run(dispatch)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await opener.close()
 
 
 async def run_main_loop(
@@ -2436,8 +3331,15 @@ async def run_main_loop(
     transport_id: str | None = None,
     transport_config: object | None = None,
 ) -> None:
-    _ = watch_config, default_engine_override, transport_id, transport_config
-    await _send_startup(cfg)
+    _ = transport_id, transport_config
+    # Built up front so the first slash in a message does not pay for
+    # enumerating plugin entry points.
+    cfg.command_registry.resolve(cfg.runtime.allowlist)
+    if cfg.cluster is not None:
+        await cfg.cluster.start()
+    # One startup message per cluster, not one per worker.
+    if cfg.cluster is None or cfg.cluster.is_leader:
+        await _send_startup(cfg)
     bot_user_id: str | None = None
     bot_name: str | None = None
     try:
@@ -2447,4 +3349,32 @@ async def run_main_loop(
     except SlackApiError as exc:
         logger.warning("slack.auth_test_failed", error=str(exc))
 
-    await _run_socket_loop(cfg, bot_user_id=bot_user_id, bot_name=bot_name)
+    config_path = cfg.runtime.config_path
+    try:
+        async with anyio.create_task_group() as tg:
+            if watch_config and config_path is not None:
+                tg.start_soon(
+                    functools.partial(
+                        watch_config_changes,
+                        config_path=config_path,
+                        runtime=cfg.runtime,
+                        default_engine_override=default_engine_override,
+                        on_reload=functools.partial(_handle_config_reload, cfg),
+                    )
+                )
+            await _run_socket_loop(cfg, bot_user_id=bot_user_id, bot_name=bot_name)
+            tg.cancel_scope.cancel()
+    finally:
+        if cfg.cluster is not None:
+            await cfg.cluster.close()
+
+
+async def _handle_config_reload(cfg: SlackBridgeConfig, reload: ConfigReload) -> None:
+    # A reload can change the allowlist or the installed command plugins.
+    cfg.command_registry.refresh()
+    commands = cfg.command_registry.resolve(cfg.runtime.allowlist)
+    logger.info(
+        "slack.commands.refreshed",
+        config_path=str(reload.config_path),
+        commands=len(commands.ids),
+    )
@@ -5,6 +5,7 @@ from typing import Any
 
 import anyio
 import httpx
+import msgspec
 
 from takopi.api import get_logger
 
@@ -245,6 +246,10 @@ class SlackClient:
         return file_payload
 
 
+_JSON_ENCODER = msgspec.json.Encoder()
+_JSON_HEADERS = {"Content-Type": "application/json; charset=utf-8"}
+
+
 async def _request_with_client(
     client: httpx.AsyncClient,
     method: str,
@@ -255,15 +260,20 @@ async def _request_with_client(
     data: dict[str, Any] | None = None,
     files: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
+    # Encode once up front (msgspec is much faster than httpx's stdlib json)
+    # so rate-limit retries resend the same bytes.
+    content = None if json is None else _JSON_ENCODER.encode(json)
+    headers = None if content is None else _JSON_HEADERS
     while True:
         try:
             response = await client.request(
                 method,
                 endpoint,
                 params=params,
-                json=json,
+                content=content,
                 data=data,
                 files=files,
+                headers=headers,
             )
         except httpx.HTTPError as exc:
             logger.warning("slack.network_error", error=str(exc))
@@ -320,6 +330,43 @@ async def open_socket_url(
             "POST",
             "/apps.connections.open",
         )
+    return _socket_url_from(payload)
+
+
+class SocketUrlOpener:
+    # Reconnects reuse one HTTP client (and its pooled TLS connection) for
+    # apps.connections.open instead of building a new one every time.
+
+    def __init__(
+        self,
+        app_token: str,
+        *,
+        base_url: str = "https://slack.com/api",
+        timeout_s: float = 30.0,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        token = app_token.strip()
+        if not token:
+            raise SlackApiError("Missing Slack app token")
+        self._client = client or httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout_s,
+        )
+
+    async def open(self) -> str:
+        payload = await _request_with_client(
+            self._client,
+            "POST",
+            "/apps.connections.open",
+        )
+        return _socket_url_from(payload)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def _socket_url_from(payload: dict[str, Any]) -> str:
     url = payload.get("url")
     if not isinstance(url, str) or not url.strip():
         raise SlackApiError("Slack socket url missing")
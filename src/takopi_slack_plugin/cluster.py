@@ -0,0 +1,667 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import socket
+import sqlite3
+import time
+import zlib
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import anyio
+
+from takopi.api import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "MAX_FORWARD_HOPS",
+    "ClusterCoordinator",
+    "ClusterStore",
+    "FLEET_KEY",
+    "ForwardedEnvelope",
+    "HashRing",
+    "default_worker_id",
+    "thread_key",
+]
+
+DEFAULT_LEASE_S = 60.0
+DEFAULT_HEARTBEAT_S = 10.0
+DEFAULT_IDLE_RELEASE_S = 7 * 86400.0
+DEFAULT_POLL_S = 0.5
+DEFAULT_RING_REPLICAS = 64
+LEADER_KEY = "__leader__"
+# Inbox key for copies of fleet-wide commands, which every worker runs once.
+FLEET_KEY = "__fleet__"
+# A forwarded envelope is handled where it lands after this many hops, so a
+# ring that is still settling cannot bounce it around forever.
+MAX_FORWARD_HOPS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_worker ON leases(worker_id);
+CREATE TABLE IF NOT EXISTS inbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    worker_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hops INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS inbox_worker ON inbox(worker_id, id);
+CREATE TABLE IF NOT EXISTS thread_settings (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def default_worker_id(config_path: Path) -> str:
+    # Stable across restarts, so a restarted worker keeps its state files;
+    # distinct per config file on the same host.
+    digest = zlib.crc32(str(config_path.expanduser().resolve()).encode("utf-8"))
+    return f"{socket.gethostname()}-{digest:08x}"
+
+
+def thread_key(channel_id: str, thread_id: str) -> str:
+    return f"{channel_id}:{thread_id}"
+
+
+def _hash(value: str) -> int:
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    # Consistent hashing with virtual nodes: when a worker joins or leaves
+    # only the threads on its arcs move.
+
+    def __init__(
+        self, nodes: Iterable[str] = (), *, replicas: int = DEFAULT_RING_REPLICAS
+    ) -> None:
+        self._replicas = max(1, replicas)
+        self._nodes = frozenset(nodes)
+        points = sorted(
+            (_hash(f"{node}#{idx}"), node)
+            for node in self._nodes
+            for idx in range(self._replicas)
+        )
+        self._hashes = [point for point, _node in points]
+        self._owners = [node for _point, node in points]
+
+    @property
+    def nodes(self) -> frozenset[str]:
+        return self._nodes
+
+    def owner(self, key: str) -> str | None:
+        if not self._hashes:
+            return None
+        idx = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[idx]
+
+
+@dataclass(frozen=True, slots=True)
+class ForwardedEnvelope:
+    id: int
+    key: str
+    hops: int
+    envelope: dict[str, Any]
+
+
+class ClusterStore:
+    # Shared SQLite state: worker heartbeats, thread leases, a per-worker
+    # inbox for envelopes received by the wrong worker and each thread's
+    # settings, so they survive a failover. Every call runs in a
+    # worker thread, one at a time; other processes wait on sqlite's file
+    # locks for up to `busy_timeout_s`.
+
+    def __init__(self, path: Path, *, busy_timeout_s: float = 5.0) -> None:
+        self._path = path
+        self._busy_timeout_s = busy_timeout_s
+        self._conn: sqlite3.Connection | None = None
+        self._limiter = anyio.CapacityLimiter(1)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self._path,
+                timeout=self._busy_timeout_s,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            # Rollback journal, not WAL: WAL's shared-memory index only works
+            # when every process is on one host, and workers usually are not.
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await anyio.to_thread.run_sync(fn, *args, limiter=self._limiter)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def heartbeat(self, worker_id: str, now: float) -> None:
+        await self._call(self.heartbeat_sync, worker_id, now)
+
+    def heartbeat_sync(self, worker_id: str, now: float) -> None:
+        self._connect().execute(
+            "INSERT INTO workers(worker_id, heartbeat_at) VALUES(?, ?) "
+            "ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at=excluded.heartbeat_at",
+            (worker_id, now),
+        )
+
+    async def live_workers(self, *, now: float, ttl_s: float) -> set[str]:
+        return await self._call(self.live_workers_sync, now, ttl_s)
+
+    def live_workers_sync(self, now: float, ttl_s: float) -> set[str]:
+        rows = self._connect().execute(
+            "SELECT worker_id FROM workers WHERE heartbeat_at > ?", (now - ttl_s,)
+        )
+        return {row[0] for row in rows}
+
+    async def remove_worker(self, worker_id: str) -> None:
+        await self._call(self.remove_worker_sync, worker_id)
+
+    def remove_worker_sync(self, worker_id: str) -> None:
+        conn = self._connect()
+        with _transaction(conn):
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            conn.execute("DELETE FROM leases WHERE worker_id = ?", (worker_id,))
+
+    async def acquire(
+        self, key: str, worker_id: str, *, now: float, lease_s: float
+    ) -> str:
+        return await self._call(self.acquire_sync, key, worker_id, now, lease_s)
+
+    def acquire_sync(self, key: str, worker_id: str, now: float, lease_s: float) -> str:
+        # Takes the lease when it is free, expired or already ours; returns
+        # whoever holds it afterwards.
+        conn = self._connect()
+        with _transaction(conn):
+            conn.execute(
+                "INSERT INTO leases(key, worker_id, expires_at) VALUES(?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "worker_id=excluded.worker_id, expires_at=excluded.expires_at "
+                "WHERE leases.worker_id = excluded.worker_id "
+                "OR leases.expires_at <= ?",
+                (key, worker_id, now + lease_s, now),
+            )
+            row = conn.execute(
+                "SELECT worker_id FROM leases WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0]
+
+    async def holder(self, key: str, *, now: float) -> str | None:
+        return await self._call(self.holder_sync, key, now)
+
+    def holder_sync(self, key: str, now: float) -> str | None:
+        row = self._connect().execute(
+            "SELECT worker_id FROM leases WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    async def renew(self, worker_id: str, *, now: float, lease_s: float) -> set[str]:
+        return await self._call(self.renew_sync, worker_id, now, lease_s)
+
+    def renew_sync(self, worker_id: str, now: float, lease_s: float) -> set[str]:
+        # One statement renews every lease of the worker, however many
+        # threads it owns; returns the keys it still holds.
+        conn = self._connect()
+        with _transaction(conn):
+            conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE worker_id = ?",
+                (now + lease_s, worker_id),
+            )
+            rows = conn.execute(
+                "SELECT key FROM leases WHERE worker_id = ?", (worker_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    async def release(self, keys: list[str], worker_id: str) -> None:
+        await self._call(self.release_sync, keys, worker_id)
+
+    def release_sync(self, keys: list[str], worker_id: str) -> None:
+        conn = self._connect()
+        with _transaction(conn):
+            conn.executemany(
+                "DELETE FROM leases WHERE key = ? AND worker_id = ?",
+                [(key, worker_id) for key in keys],
+            )
+
+    async def push(
+        self,
+        worker_id: str,
+        key: str,
+        envelope: dict[str, Any],
+        *,
+        hops: int,
+        now: float,
+    ) -> None:
+        await self._call(self.push_sync, worker_id, key, envelope, hops, now)
+
+    def push_sync(
+        self,
+        worker_id: str,
+        key: str,
+        envelope: dict[str, Any],
+        hops: int,
+        now: float,
+    ) -> None:
+        self._connect().execute(
+            "INSERT INTO inbox(worker_id, key, hops, payload, created_at) "
+            "VALUES(?, ?, ?, ?, ?)",
+            (worker_id, key, hops, json.dumps(envelope), now),
+        )
+
+    async def peek(
+        self, worker_id: str, *, limit: int = 50
+    ) -> list[ForwardedEnvelope]:
+        return await self._call(self.peek_sync, worker_id, limit)
+
+    def peek_sync(self, worker_id: str, limit: int) -> list[ForwardedEnvelope]:
+        # Rows stay in the inbox until acked, so a crash mid-delivery
+        # redelivers them instead of losing them.
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, key, hops, payload FROM inbox WHERE worker_id = ? "
+            "ORDER BY id LIMIT ?",
+            (worker_id, limit),
+        ).fetchall()
+        forwarded: list[ForwardedEnvelope] = []
+        broken: list[int] = []
+        for row_id, key, hops, payload in rows:
+            try:
+                envelope = json.loads(payload)
+            except json.JSONDecodeError:
+                broken.append(row_id)
+                continue
+            forwarded.append(
+                ForwardedEnvelope(id=row_id, key=key, hops=hops, envelope=envelope)
+            )
+        if broken:
+            self.ack_sync(broken)
+        return forwarded
+
+    async def ack(self, ids: list[int]) -> None:
+        await self._call(self.ack_sync, ids)
+
+    def ack_sync(self, ids: list[int]) -> None:
+        self._connect().executemany(
+            "DELETE FROM inbox WHERE id = ?", [(row_id,) for row_id in ids]
+        )
+
+    async def put_settings(
+        self, settings: dict[str, dict[str, Any]], *, now: float
+    ) -> None:
+        await self._call(self.put_settings_sync, settings, now)
+
+    def put_settings_sync(
+        self, settings: dict[str, dict[str, Any]], now: float
+    ) -> None:
+        conn = self._connect()
+        with _transaction(conn):
+            conn.executemany(
+                "INSERT INTO thread_settings(key, payload, updated_at) "
+                "VALUES(?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "payload=excluded.payload, updated_at=excluded.updated_at",
+                [(key, json.dumps(value), now) for key, value in settings.items()],
+            )
+
+    async def get_settings(self, key: str) -> dict[str, Any] | None:
+        return await self._call(self.get_settings_sync, key)
+
+    def get_settings_sync(self, key: str) -> dict[str, Any] | None:
+        row = self._connect().execute(
+            "SELECT payload FROM thread_settings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            settings = json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+        return settings if isinstance(settings, dict) else None
+
+    async def adopt_orphans(
+        self, worker_id: str, live: set[str], ring: HashRing
+    ) -> int:
+        return await self._call(self.adopt_orphans_sync, worker_id, live, ring)
+
+    def adopt_orphans_sync(
+        self, worker_id: str, live: set[str], ring: HashRing
+    ) -> int:
+        # Envelopes queued for a worker that stopped heartbeating go to the
+        # thread's new ring owner. Fleet-wide copies are dropped instead: the
+        # other workers already ran their own.
+        conn = self._connect()
+        with _transaction(conn):
+            rows = conn.execute("SELECT id, worker_id, key FROM inbox").fetchall()
+            orphans = [row for row in rows if row[1] not in live]
+            adopted = [
+                (worker_id, row_id, target)
+                for row_id, target, key in orphans
+                if key != FLEET_KEY and ring.owner(key) == worker_id
+            ]
+            conn.executemany(
+                "UPDATE inbox SET worker_id = ? WHERE id = ? AND worker_id = ?",
+                adopted,
+            )
+            conn.executemany(
+                "DELETE FROM inbox WHERE id = ?",
+                [(row_id,) for row_id, _target, key in orphans if key == FLEET_KEY],
+            )
+        return len(adopted)
+
+
+class _transaction:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        if exc_type is None:
+            self._conn.execute("COMMIT")
+        else:
+            self._conn.execute("ROLLBACK")
+
+
+Deliver = Callable[[dict[str, Any], int], None]
+
+
+class ClusterCoordinator:
+    # Thread affinity across workers sharing one Slack app. A thread belongs
+    # to whoever holds its lease; without one, the consistent-hash owner
+    # among live workers claims it. Leases are renewed with every heartbeat
+    # and only lapse when their worker stops, so a thread's resume tokens,
+    # runs and worktree stay on one machine until it fails over. Its
+    # settings are copied to the shared store and follow it.
+
+    def __init__(
+        self,
+        store: ClusterStore,
+        *,
+        worker_id: str,
+        lease_s: float = DEFAULT_LEASE_S,
+        heartbeat_s: float = DEFAULT_HEARTBEAT_S,
+        idle_release_s: float = DEFAULT_IDLE_RELEASE_S,
+        poll_s: float = DEFAULT_POLL_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._store = store
+        self._worker_id = worker_id
+        self._lease_s = lease_s
+        self._heartbeat_s = heartbeat_s
+        self._idle_release_s = idle_release_s
+        self._poll_s = poll_s
+        self._clock = clock
+        self._ring = HashRing([worker_id])
+        self._held: dict[str, float] = {}
+        self._settings: dict[str, dict[str, Any]] = {}
+        self._leader = False
+        self.forwarded = 0
+        self.received = 0
+
+    @property
+    def worker_id(self) -> str:
+        return self._worker_id
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    @property
+    def ring(self) -> HashRing:
+        return self._ring
+
+    def holds(self, key: str) -> bool:
+        return key in self._held
+
+    def touch(self, key: str) -> None:
+        if key in self._held:
+            self._held[key] = self._clock()
+
+    async def route(self, key: str) -> str | None:
+        # None when this worker owns the thread (now holding its lease),
+        # otherwise the worker to forward to. If the shared state is
+        # unavailable the envelope is handled here rather than dropped.
+        try:
+            holder = await self._store.holder(key, now=self._clock())
+            if holder is None:
+                preferred = self._ring.owner(key)
+                if preferred is not None and preferred != self._worker_id:
+                    return preferred
+            elif holder != self._worker_id:
+                return holder
+            return await self._claim(key)
+        except sqlite3.Error as exc:
+            logger.warning(
+                "slack.cluster.route_failed",
+                key=key,
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return None
+
+    async def claim(self, key: str) -> str | None:
+        try:
+            return await self._claim(key)
+        except sqlite3.Error as exc:
+            logger.warning(
+                "slack.cluster.claim_failed",
+                key=key,
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return None
+
+    async def _claim(self, key: str) -> str | None:
+        now = self._clock()
+        holder = await self._store.acquire(
+            key, self._worker_id, now=now, lease_s=self._lease_s
+        )
+        if holder != self._worker_id:
+            return holder
+        self._held[key] = now
+        return None
+
+    def stage_settings(
+        self, channel_id: str, thread_id: str, settings: dict[str, Any]
+    ) -> None:
+        # Written with the next inbox poll. Only the owner's count: another
+        # worker may still have an old copy of the thread.
+        key = thread_key(channel_id, thread_id)
+        if key in self._held:
+            self._settings[key] = settings
+
+    async def load_settings(self, key: str) -> dict[str, Any] | None:
+        try:
+            return await self._store.get_settings(key)
+        except sqlite3.Error as exc:
+            logger.warning(
+                "slack.cluster.settings_failed",
+                key=key,
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return None
+
+    async def _flush_settings(self) -> None:
+        if not self._settings:
+            return
+        pending, self._settings = self._settings, {}
+        try:
+            await self._store.put_settings(pending, now=self._clock())
+        except sqlite3.Error as exc:
+            # Retried with the next poll unless newer settings replace them.
+            self._settings = {**pending, **self._settings}
+            logger.warning(
+                "slack.cluster.settings_failed",
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+
+    async def forward(
+        self, owner: str, key: str, envelope: dict[str, Any], *, hops: int
+    ) -> bool:
+        try:
+            await self._store.push(
+                owner, key, envelope, hops=hops + 1, now=self._clock()
+            )
+        except sqlite3.Error as exc:
+            logger.warning(
+                "slack.cluster.forward_failed",
+                key=key,
+                owner=owner,
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return False
+        self.forwarded += 1
+        logger.debug("slack.cluster.forwarded", key=key, owner=owner, hops=hops + 1)
+        return True
+
+    async def broadcast(self, envelope: dict[str, Any]) -> int:
+        # Copies go out at the hop limit, so receivers run them locally
+        # instead of routing or broadcasting them again.
+        sent = 0
+        for owner in sorted(self._ring.nodes - {self._worker_id}):
+            if await self.forward(
+                owner, FLEET_KEY, envelope, hops=MAX_FORWARD_HOPS - 1
+            ):
+                sent += 1
+        return sent
+
+    async def start(self) -> None:
+        try:
+            await self._heartbeat()
+        except sqlite3.Error as exc:
+            logger.warning(
+                "slack.cluster.heartbeat_failed",
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+
+    async def run(self, deliver: Deliver) -> None:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(self._run_heartbeats)
+            await self._run_inbox(deliver)
+
+    async def close(self) -> None:
+        with anyio.CancelScope(shield=True):
+            await self._flush_settings()
+            try:
+                await self._store.remove_worker(self._worker_id)
+            except sqlite3.Error as exc:
+                logger.warning(
+                    "slack.cluster.close_failed",
+                    error=str(exc),
+                    error_type=exc.__class__.__name__,
+                )
+        self._held.clear()
+        self._leader = False
+
+    async def _run_heartbeats(self) -> None:
+        while True:
+            await anyio.sleep(self._heartbeat_s)
+            try:
+                await self._heartbeat()
+            except sqlite3.Error as exc:
+                logger.warning(
+                    "slack.cluster.heartbeat_failed",
+                    error=str(exc),
+                    error_type=exc.__class__.__name__,
+                )
+
+    async def _heartbeat(self) -> None:
+        now = self._clock()
+        store = self._store
+        await store.heartbeat(self._worker_id, now)
+        # A worker is gone after missing three heartbeats.
+        live = await store.live_workers(now=now, ttl_s=self._heartbeat_s * 3)
+        live.add(self._worker_id)
+        if live != self._ring.nodes:
+            logger.info("slack.cluster.workers", workers=sorted(live))
+            self._ring = HashRing(live)
+        idle = [
+            key
+            for key, touched in self._held.items()
+            if now - touched >= self._idle_release_s
+        ]
+        if idle:
+            await store.release(idle, self._worker_id)
+            for key in idle:
+                self._held.pop(key, None)
+        held = await store.renew(self._worker_id, now=now, lease_s=self._lease_s)
+        for key in [key for key in self._held if key not in held]:
+            logger.warning("slack.cluster.lease_lost", key=key)
+            self._held.pop(key, None)
+        leader = await store.acquire(
+            LEADER_KEY, self._worker_id, now=now, lease_s=self._lease_s
+        )
+        self._leader = leader == self._worker_id
+        self._held.pop(LEADER_KEY, None)
+        await store.adopt_orphans(self._worker_id, live, self._ring)
+
+    async def _run_inbox(self, deliver: Deliver) -> None:
+        while True:
+            await self._flush_settings()
+            try:
+                forwarded = await self._store.peek(self._worker_id)
+            except sqlite3.Error as exc:
+                logger.warning(
+                    "slack.cluster.inbox_failed",
+                    error=str(exc),
+                    error_type=exc.__class__.__name__,
+                )
+                forwarded = []
+            for item in forwarded:
+                self.received += 1
+                try:
+                    deliver(item.envelope, item.hops)
+                except Exception as exc:
+                    # Acked anyway: an envelope that breaks dispatch would
+                    # otherwise come back on every poll.
+                    logger.exception(
+                        "slack.cluster.deliver_failed",
+                        key=item.key,
+                        error=str(exc),
+                        error_type=exc.__class__.__name__,
+                    )
+            if forwarded:
+                try:
+                    await self._store.ack([item.id for item in forwarded])
+                except sqlite3.Error as exc:
+                    logger.warning(
+                        "slack.cluster.inbox_failed",
+                        error=str(exc),
+                        error_type=exc.__class__.__name__,
+                    )
+                    await anyio.sleep(self._poll_s)
+            else:
+                await anyio.sleep(self._poll_s)
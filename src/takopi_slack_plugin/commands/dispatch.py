@@ -12,6 +12,7 @@ from takopi.runner_bridge import RunningTasks
 from takopi.runners.run_options import EngineRunOptions
 from takopi.transport import MessageRef
 
+from ..engine import RunPriority
 from .executor import SlackCommandExecutor
 
 logger = get_logger(__name__)
@@ -43,6 +44,8 @@ async def dispatch_command(
     default_context,
     engine_overrides_resolver: Callable[[EngineId], Awaitable[EngineRunOptions | None]]
     | None,
+    user_id: str | None = None,
+    priority: RunPriority = "interactive",
 ) -> bool:
     allowlist = cfg.runtime.allowlist
 
@@ -58,6 +61,10 @@ async def dispatch_command(
         show_resume_line=True,
         default_engine_override=default_engine_override,
         default_context=default_context,
+        user_id=user_id,
+        run_scheduler=getattr(cfg, "run_scheduler", None),
+        priority=priority,
+        repo_locks=getattr(cfg, "repo_locks", None),
     )
 
     message_ref = MessageRef(
@@ -13,7 +13,8 @@ from takopi.runners.run_options import EngineRunOptions
 from takopi.transport import MessageRef, RenderedMessage, SendOptions
 from takopi.transport_runtime import TransportRuntime
 
-from ..engine import run_engine
+from ..engine import RunPriority, RunScheduler, run_engine
+from ..repo_locks import RepoLockManager
 
 
 class _CaptureTransport:
@@ -68,6 +69,10 @@ class SlackCommandExecutor(CommandExecutor):
     show_resume_line: bool
     default_engine_override: EngineId | None
     default_context: RunContext | None
+    user_id: str | None = None
+    run_scheduler: RunScheduler | None = None
+    priority: RunPriority = "interactive"
+    repo_locks: RepoLockManager | None = None
 
     def _apply_default_context(self, request: RunRequest) -> RunRequest:
         if request.context is not None or self.default_context is None:
@@ -151,6 +156,10 @@ class SlackCommandExecutor(CommandExecutor):
                 thread_id=self.thread_id,
                 on_thread_known=self.on_thread_known,
                 run_options=run_options,
+                scheduler=self.run_scheduler,
+                user_id=self.user_id,
+                priority=self.priority,
+                repo_locks=self.repo_locks,
             )
             return RunResult(engine=engine, message=capture.last_message)
 
@@ -167,6 +176,10 @@ class SlackCommandExecutor(CommandExecutor):
             thread_id=self.thread_id,
             on_thread_known=self.on_thread_known,
             run_options=run_options,
+            scheduler=self.run_scheduler,
+            user_id=self.user_id,
+            priority=self.priority,
+            repo_locks=self.repo_locks,
         )
         return RunResult(engine=engine, message=None)
 
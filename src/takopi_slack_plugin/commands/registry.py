@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from takopi.ids import RESERVED_COMMAND_IDS
+from takopi.plugins import COMMAND_GROUP, list_ids
+
+_INLINE_ID_RE = re.compile(r"[a-z0-9_]{1,32}")
+
+CommandLoader = Callable[..., list[str]]
+
+
+@dataclass(frozen=True, slots=True)
+class InlineCommands:
+    ids: frozenset[str]
+    pattern: re.Pattern[str] | None
+
+
+def compile_inline_pattern(ids: Iterable[str]) -> re.Pattern[str] | None:
+    # Longest ids first so a shared prefix never shadows a longer command.
+    names = sorted(
+        (name for name in ids if _INLINE_ID_RE.fullmatch(name)),
+        key=lambda name: (-len(name), name),
+    )
+    if not names:
+        return None
+    alternation = "|".join(re.escape(name) for name in names)
+    return re.compile(
+        rf"(^|\s)(?P<token>/(?P<cmd>{alternation}))(?![a-z0-9_])",
+        re.IGNORECASE,
+    )
+
+
+class CommandRegistry:
+    # Enumerating plugin entry points is too slow for the per-message path, so
+    # the allowed ids and their combined regex are cached per allowlist.
+
+    def __init__(
+        self,
+        *,
+        reserved_ids: Iterable[str] = RESERVED_COMMAND_IDS,
+        loader: CommandLoader = list_ids,
+    ) -> None:
+        self._reserved_ids = frozenset(reserved_ids)
+        self._loader = loader
+        self._allowlist: frozenset[str] | None = None
+        self._cached: InlineCommands | None = None
+
+    def refresh(self) -> None:
+        self._cached = None
+
+    def resolve(self, allowlist: Iterable[str] | None) -> InlineCommands:
+        key = None if allowlist is None else frozenset(allowlist)
+        cached = self._cached
+        if cached is not None and key == self._allowlist:
+            return cached
+        ids = frozenset(
+            command_id.lower()
+            for command_id in self._loader(
+                COMMAND_GROUP,
+                allowlist=key,
+                reserved_ids=self._reserved_ids,
+            )
+        )
+        cached = InlineCommands(ids=ids, pattern=compile_inline_pattern(ids))
+        self._allowlist = key
+        self._cached = cached
+        return cached
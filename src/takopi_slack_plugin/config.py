@@ -24,6 +24,7 @@ class SlackActionHandler:
     action_id: str
     command: str
     args: str = ""
+    priority: Literal["interactive", "batch"] = "batch"
 
 
 @dataclass(frozen=True, slots=True)
@@ -119,18 +120,53 @@ class SlackFilesSettings:
         )
 
 
+@dataclass(frozen=True, slots=True)
+class SlackChannelSettings:
+    channel_id: str
+    project: str | None = None
+    engine: str | None = None
+    files: SlackFilesSettings | None = None
+    outbox_interval_s: float | None = None
+
+
 @dataclass(frozen=True, slots=True)
 class SlackTransportSettings:
     bot_token: str
     channel_id: str
     app_token: str
-    message_overflow: Literal["trim", "split"] = "split"
+    message_overflow: Literal["trim", "split", "file"] = "split"
+    message_overflow_file_threshold: int = 12000
     files: SlackFilesSettings = field(default_factory=SlackFilesSettings)
     action_handlers: list[SlackActionHandler] = field(default_factory=list)
     action_blocks: list[dict[str, Any]] | None = None
     stale_worktree_reminder: bool = False
     stale_worktree_hours: float = 24.0
-    stale_worktree_check_interval_s: float = 600.0
+    stale_worktree_project_hours: dict[str, float] = field(default_factory=dict)
+    stale_worktree_check_interval_s: float = 3600.0
+    thread_retention_days: float | None = None
+    thread_prune_interval_s: float = 3600.0
+    thread_state_format: Literal["json", "msgpack"] = "json"
+    thread_message_policy: Literal["queue", "coalesce"] = "queue"
+    max_concurrent_runs: int | None = None
+    max_runs_per_user: int | None = None
+    max_runs_per_project: int | None = None
+    max_batch_runs: int | None = None
+    git_timeout_s: float = 120.0
+    git_max_concurrent: int = 4
+    bulk_archive_concurrency: int = 4
+    git_lock_fail_fast: bool = False
+    worktree_disk_usage: bool = False
+    worktree_disk_scan_interval_s: float = 1800.0
+    disk_pressure_free_gb: float | None = None
+    disk_pressure_reminders: int = 3
+    socket_connections: int = 1
+    event_dedupe_ttl_s: float = 600.0
+    event_dedupe_persist: bool = False
+    channels: list[SlackChannelSettings] = field(default_factory=list)
+    cluster_state_path: Path | None = None
+    cluster_worker_id: str | None = None
+    cluster_lease_s: float = 60.0
+    cluster_heartbeat_s: float = 10.0
 
     @classmethod
     def from_config(
@@ -165,11 +201,20 @@ class SlackTransportSettings:
                 "expected a string."
             )
         message_overflow = message_overflow.strip()
-        if message_overflow not in {"trim", "split"}:
+        if message_overflow not in {"trim", "split", "file"}:
             raise ConfigError(
                 f"Invalid `transports.slack.message_overflow` in {config_path}; "
-                "expected 'trim' or 'split'."
+                "expected 'trim', 'split' or 'file'."
+            )
+        message_overflow_file_threshold = int(
+            _require_number(
+                config,
+                "message_overflow_file_threshold",
+                default=12000,
+                config_path=config_path,
+                min_value=1000,
             )
+        )
 
         files = SlackFilesSettings.from_config(
             config.get("files"), config_path=config_path
@@ -180,6 +225,7 @@ class SlackTransportSettings:
             "action_handlers",
             config_path,
         )
+        channels = _optional_channels(config, "channels", config_path)
         action_blocks = _optional_action_blocks(
             config,
             "action_blocks",
@@ -200,25 +246,219 @@ class SlackTransportSettings:
             config_path=config_path,
             min_value=0.5,
         )
+        stale_worktree_project_hours = _optional_number_table(
+            config,
+            "stale_worktree_project_hours",
+            config_path,
+            min_value=0.5,
+        )
         stale_worktree_check_interval_s = _require_number(
             config,
             "stale_worktree_check_interval_s",
-            default=600.0,
+            default=3600.0,
             config_path=config_path,
             min_value=30.0,
         )
 
+        thread_retention_days = None
+        if config.get("thread_retention_days") is not None:
+            thread_retention_days = _require_number(
+                config,
+                "thread_retention_days",
+                default=0.0,
+                config_path=config_path,
+                min_value=1.0,
+            )
+        thread_prune_interval_s = _require_number(
+            config,
+            "thread_prune_interval_s",
+            default=3600.0,
+            config_path=config_path,
+            min_value=60.0,
+        )
+
+        thread_state_format = config.get("thread_state_format", "json")
+        if not isinstance(thread_state_format, str):
+            raise ConfigError(
+                f"Invalid `transports.slack.thread_state_format` in {config_path}; "
+                "expected a string."
+            )
+        thread_state_format = thread_state_format.strip()
+        if thread_state_format not in {"json", "msgpack"}:
+            raise ConfigError(
+                f"Invalid `transports.slack.thread_state_format` in {config_path}; "
+                "expected 'json' or 'msgpack'."
+            )
+
+        thread_message_policy = config.get("thread_message_policy", "queue")
+        if not isinstance(thread_message_policy, str):
+            raise ConfigError(
+                f"Invalid `transports.slack.thread_message_policy` in {config_path}; "
+                "expected a string."
+            )
+        thread_message_policy = thread_message_policy.strip()
+        if thread_message_policy not in {"queue", "coalesce"}:
+            raise ConfigError(
+                f"Invalid `transports.slack.thread_message_policy` in {config_path}; "
+                "expected 'queue' or 'coalesce'."
+            )
+
+        max_concurrent_runs = _optional_limit(
+            config, "max_concurrent_runs", config_path
+        )
+        max_runs_per_user = _optional_limit(config, "max_runs_per_user", config_path)
+        max_runs_per_project = _optional_limit(
+            config, "max_runs_per_project", config_path
+        )
+        max_batch_runs = _optional_limit(config, "max_batch_runs", config_path)
+        git_timeout_s = _require_number(
+            config,
+            "git_timeout_s",
+            default=120.0,
+            config_path=config_path,
+            min_value=1.0,
+        )
+        worktree_disk_usage = config.get("worktree_disk_usage", False)
+        if not isinstance(worktree_disk_usage, bool):
+            raise ConfigError(
+                f"Invalid `transports.slack.worktree_disk_usage` in {config_path}; "
+                "expected true or false."
+            )
+        worktree_disk_scan_interval_s = _require_number(
+            config,
+            "worktree_disk_scan_interval_s",
+            default=1800.0,
+            config_path=config_path,
+            min_value=60.0,
+        )
+        disk_pressure_free_gb = None
+        if config.get("disk_pressure_free_gb") is not None:
+            disk_pressure_free_gb = _require_number(
+                config,
+                "disk_pressure_free_gb",
+                default=0.0,
+                config_path=config_path,
+                min_value=0.1,
+            )
+        disk_pressure_reminders = int(
+            _require_number(
+                config,
+                "disk_pressure_reminders",
+                default=3,
+                config_path=config_path,
+                min_value=1,
+            )
+        )
+        git_lock_fail_fast = config.get("git_lock_fail_fast", False)
+        if not isinstance(git_lock_fail_fast, bool):
+            raise ConfigError(
+                f"Invalid `transports.slack.git_lock_fail_fast` in {config_path}; "
+                "expected true or false."
+            )
+        bulk_archive_concurrency = int(
+            _require_number(
+                config,
+                "bulk_archive_concurrency",
+                default=4,
+                config_path=config_path,
+                min_value=1,
+            )
+        )
+        git_max_concurrent = int(
+            _require_number(
+                config,
+                "git_max_concurrent",
+                default=4,
+                config_path=config_path,
+                min_value=1,
+            )
+        )
+        event_dedupe_ttl_s = _require_number(
+            config,
+            "event_dedupe_ttl_s",
+            default=600.0,
+            config_path=config_path,
+            min_value=1.0,
+        )
+        event_dedupe_persist = config.get("event_dedupe_persist", False)
+        if not isinstance(event_dedupe_persist, bool):
+            raise ConfigError(
+                f"Invalid `transports.slack.event_dedupe_persist` in {config_path}; "
+                "expected true or false."
+            )
+        cluster_state_path = None
+        raw_cluster_path = _optional_str(
+            config, "cluster_state_path", None, config_path
+        )
+        if raw_cluster_path is not None:
+            cluster_state_path = Path(raw_cluster_path).expanduser()
+            if not cluster_state_path.is_absolute():
+                cluster_state_path = config_path.parent / cluster_state_path
+        cluster_worker_id = _optional_str(
+            config, "cluster_worker_id", None, config_path
+        )
+        cluster_heartbeat_s = _require_number(
+            config,
+            "cluster_heartbeat_s",
+            default=10.0,
+            config_path=config_path,
+            min_value=1.0,
+        )
+        cluster_lease_s = _require_number(
+            config,
+            "cluster_lease_s",
+            default=max(60.0, cluster_heartbeat_s * 3),
+            config_path=config_path,
+            min_value=cluster_heartbeat_s * 3,
+        )
+        socket_connections = config.get("socket_connections", 1)
+        if (
+            not isinstance(socket_connections, int)
+            or isinstance(socket_connections, bool)
+            or not 1 <= socket_connections <= 5
+        ):
+            raise ConfigError(
+                f"Invalid `transports.slack.socket_connections` in {config_path}; "
+                "expected an integer between 1 and 5."
+            )
+
         return cls(
             bot_token=bot_token,
             channel_id=channel_id,
             app_token=app_token,
             message_overflow=message_overflow,
+            message_overflow_file_threshold=message_overflow_file_threshold,
             files=files,
             action_handlers=action_handlers,
             action_blocks=action_blocks,
             stale_worktree_reminder=stale_worktree_reminder,
             stale_worktree_hours=stale_worktree_hours,
+            stale_worktree_project_hours=stale_worktree_project_hours,
             stale_worktree_check_interval_s=stale_worktree_check_interval_s,
+            thread_retention_days=thread_retention_days,
+            thread_prune_interval_s=thread_prune_interval_s,
+            thread_state_format=thread_state_format,
+            thread_message_policy=thread_message_policy,
+            max_concurrent_runs=max_concurrent_runs,
+            max_runs_per_user=max_runs_per_user,
+            max_runs_per_project=max_runs_per_project,
+            max_batch_runs=max_batch_runs,
+            git_timeout_s=git_timeout_s,
+            git_max_concurrent=git_max_concurrent,
+            bulk_archive_concurrency=bulk_archive_concurrency,
+            git_lock_fail_fast=git_lock_fail_fast,
+            worktree_disk_usage=worktree_disk_usage,
+            worktree_disk_scan_interval_s=worktree_disk_scan_interval_s,
+            disk_pressure_free_gb=disk_pressure_free_gb,
+            disk_pressure_reminders=disk_pressure_reminders,
+            socket_connections=socket_connections,
+            event_dedupe_ttl_s=event_dedupe_ttl_s,
+            event_dedupe_persist=event_dedupe_persist,
+            channels=channels,
+            cluster_state_path=cluster_state_path,
+            cluster_worker_id=cluster_worker_id,
+            cluster_lease_s=cluster_lease_s,
+            cluster_heartbeat_s=cluster_heartbeat_s,
         )
 
 
@@ -311,7 +551,7 @@ def _optional_action_handlers(
                 f"Invalid `transports.slack.{key}[{idx}]` in {config_path}; "
                 "expected a table."
             )
-        allowed = {"action_id", "id", "command", "args"}
+        allowed = {"action_id", "id", "command", "args", "priority"}
         unknown_keys = set(raw) - allowed
         if unknown_keys:
             unknown = ", ".join(sorted(unknown_keys))
@@ -365,17 +605,101 @@ def _optional_action_handlers(
             )
         args = args.strip()
 
+        priority = raw.get("priority", "batch")
+        if isinstance(priority, str):
+            priority = priority.strip()
+        if not isinstance(priority, str) or priority not in {"interactive", "batch"}:
+            raise ConfigError(
+                f"Invalid `transports.slack.{key}[{idx}].priority` in {config_path}; "
+                "expected 'interactive' or 'batch'."
+            )
+
         handlers.append(
             SlackActionHandler(
                 action_id=action_id,
                 command=command,
                 args=args,
+                priority=priority,
             )
         )
 
     return handlers
 
 
+def _optional_channels(
+    config: dict[str, Any],
+    key: str,
+    config_path: Path,
+) -> list[SlackChannelSettings]:
+    value = config.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ConfigError(
+            f"Invalid `transports.slack.{key}` in {config_path}; "
+            "expected a list of tables."
+        )
+    channels: list[SlackChannelSettings] = []
+    seen_ids: set[str] = set()
+    for idx, raw in enumerate(value, start=1):
+        label = f"transports.slack.{key}[{idx}]"
+        if not isinstance(raw, dict):
+            raise ConfigError(
+                f"Invalid `{label}` in {config_path}; expected a table."
+            )
+        allowed = {"channel_id", "project", "engine", "files", "outbox_interval_s"}
+        unknown_keys = set(raw) - allowed
+        if unknown_keys:
+            unknown = ", ".join(sorted(unknown_keys))
+            raise ConfigError(
+                f"Invalid `{label}` in {config_path}; unknown keys: {unknown}."
+            )
+        channel_id = raw.get("channel_id")
+        if not isinstance(channel_id, str) or not channel_id.strip():
+            raise ConfigError(
+                f"Invalid `{label}.channel_id` in {config_path}; "
+                "expected a non-empty string."
+            )
+        channel_id = channel_id.strip()
+        if channel_id in seen_ids:
+            raise ConfigError(
+                f"Invalid `{label}.channel_id` in {config_path}; "
+                "duplicate channel_id."
+            )
+        seen_ids.add(channel_id)
+        project = _optional_str(
+            raw, "project", None, config_path, label=f"{label}.project"
+        )
+        engine = _optional_str(
+            raw, "engine", None, config_path, label=f"{label}.engine"
+        )
+        files = None
+        if raw.get("files") is not None:
+            files = SlackFilesSettings.from_config(
+                raw["files"], config_path=config_path
+            )
+        outbox_interval_s = None
+        if raw.get("outbox_interval_s") is not None:
+            outbox_interval_s = _require_number(
+                raw,
+                "outbox_interval_s",
+                default=0.0,
+                config_path=config_path,
+                min_value=0.0,
+                label=f"{key}[{idx}].outbox_interval_s",
+            )
+        channels.append(
+            SlackChannelSettings(
+                channel_id=channel_id,
+                project=project,
+                engine=engine,
+                files=files,
+                outbox_interval_s=outbox_interval_s,
+            )
+        )
+    return channels
+
+
 def _optional_action_blocks(
     config: dict[str, Any],
     key: str,
@@ -450,17 +774,65 @@ def _require_number(
     default: float,
     config_path: Path,
     min_value: float | None = None,
+    label: str | None = None,
 ) -> float:
+    name = label or key
     value = config.get(key, default)
     if not isinstance(value, (int, float)):
         raise ConfigError(
-            f"Invalid `transports.slack.{key}` in {config_path}; "
+            f"Invalid `transports.slack.{name}` in {config_path}; "
             "expected a number."
         )
     value = float(value)
     if min_value is not None and value < min_value:
         raise ConfigError(
-            f"Invalid `transports.slack.{key}` in {config_path}; "
+            f"Invalid `transports.slack.{name}` in {config_path}; "
             f"expected >= {min_value}."
         )
     return value
+
+
+def _optional_limit(
+    config: dict[str, Any], key: str, config_path: Path
+) -> int | None:
+    value = config.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ConfigError(
+            f"Invalid `transports.slack.{key}` in {config_path}; "
+            "expected a positive integer."
+        )
+    return value
+
+
+def _optional_number_table(
+    config: dict[str, Any],
+    key: str,
+    config_path: Path,
+    *,
+    min_value: float | None = None,
+) -> dict[str, float]:
+    value = config.get(key)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ConfigError(
+            f"Invalid `transports.slack.{key}` in {config_path}; expected a table."
+        )
+    result: dict[str, float] = {}
+    for name, raw in value.items():
+        if not isinstance(name, str) or not name.strip():
+            raise ConfigError(
+                f"Invalid `transports.slack.{key}` in {config_path}; "
+                "expected non-empty keys."
+            )
+        result[name.strip()] = _require_number(
+            value,
+            name,
+            default=0.0,
+            config_path=config_path,
+            min_value=min_value,
+            label=f"{key}.{name}",
+        )
+    return result
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import anyio
+
+__all__ = ["DiskUsageScanner"]
+
+
+@dataclass(frozen=True, slots=True)
+class _DirRecord:
+    mtime_ns: int
+    file_bytes: int
+    subdirs: tuple[str, ...]
+
+
+def _entry_bytes(stat: os.stat_result) -> int:
+    blocks = getattr(stat, "st_blocks", None)
+    if blocks is not None:
+        return blocks * 512
+    return stat.st_size
+
+
+class DiskUsageScanner:
+    # Directory sizes are cached per root and keyed by directory mtime, which
+    # changes when entries are added, removed or renamed. An unchanged
+    # directory costs one stat; its files are only listed again after it
+    # changes, so files growing in place are picked up on the next change.
+    # Symlinks are never followed.
+
+    def __init__(self) -> None:
+        self._records: dict[Path, dict[str, _DirRecord]] = {}
+        self._totals: dict[Path, int] = {}
+        self._limiter = anyio.CapacityLimiter(1)
+
+    def last_size(self, root: Path) -> int | None:
+        return self._totals.get(root)
+
+    def forget(self, root: Path) -> None:
+        self._records.pop(root, None)
+        self._totals.pop(root, None)
+
+    def retain(self, roots: set[Path]) -> None:
+        for root in [root for root in self._records if root not in roots]:
+            self.forget(root)
+
+    async def scan(self, root: Path) -> int:
+        return await anyio.to_thread.run_sync(
+            self.measure, root, limiter=self._limiter
+        )
+
+    def measure(self, root: Path) -> int:
+        previous = self._records.get(root, {})
+        records: dict[str, _DirRecord] = {}
+        total = 0
+        stack = [str(root)]
+        while stack:
+            path = stack.pop()
+            try:
+                stat = os.stat(path, follow_symlinks=False)
+            except OSError:
+                continue
+            record = previous.get(path)
+            if record is None or record.mtime_ns != stat.st_mtime_ns:
+                record = self._list_dir(path, stat.st_mtime_ns)
+                if record is None:
+                    continue
+            records[path] = record
+            total += record.file_bytes
+            stack.extend(os.path.join(path, name) for name in record.subdirs)
+        self._records[root] = records
+        self._totals[root] = total
+        return total
+
+    def _list_dir(self, path: str, mtime_ns: int) -> _DirRecord | None:
+        file_bytes = 0
+        subdirs: list[str] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            file_bytes += _entry_bytes(
+                                entry.stat(follow_symlinks=False)
+                            )
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return _DirRecord(
+            mtime_ns=mtime_ns, file_bytes=file_bytes, subdirs=tuple(subdirs)
+        )
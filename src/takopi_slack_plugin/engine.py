@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Literal
 
 import anyio
 
@@ -12,17 +17,276 @@ from takopi.api import (
     RenderedMessage,
     RunContext,
     RunnerUnavailableError,
+    RunningTask,
     RunningTasks,
     SendOptions,
     TransportRuntime,
     bind_run_context,
     clear_context,
+    get_logger,
     handle_message,
     reset_run_base_dir,
     set_run_base_dir,
 )
 from takopi.runners.run_options import EngineRunOptions, apply_run_options
 
+from .repo_locks import RepoLockManager, resolve_run_cwd_locked
+
+logger = get_logger(__name__)
+
+_ANONYMOUS_USER = "-"
+
+RunPriority = Literal["interactive", "batch"]
+RUN_PRIORITIES: tuple[RunPriority, ...] = ("interactive", "batch")
+_PRIORITY_RANK = {priority: rank for rank, priority in enumerate(RUN_PRIORITIES)}
+
+
+@dataclass(frozen=True, slots=True)
+class RunLimits:
+    max_concurrent: int | None = None
+    per_user: int | None = None
+    per_project: int | None = None
+    batch: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            value is not None
+            for value in (
+                self.max_concurrent,
+                self.per_user,
+                self.per_project,
+                self.batch,
+            )
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RunSchedulerStats:
+    running: int
+    queued: int
+    queued_by_priority: dict[str, int]
+    admitted: int
+    waited: int
+    total_wait_s: float
+    max_wait_s: float
+
+
+@dataclass(slots=True, eq=False)
+class _RunWaiter:
+    user: str
+    project: str | None
+    priority: RunPriority
+    queued_at: float
+    ready: anyio.Event = field(default_factory=anyio.Event)
+    granted: bool = False
+
+
+class RunScheduler:
+    # Admits engine runs under global, per-user and per-project limits.
+    # Interactive waiters always go before batch ones (buttons, shortcuts).
+    # Within a priority, waiters queue per user and the least recently served
+    # user goes next, so one person queueing many runs cannot starve others.
+
+    def __init__(
+        self,
+        limits: RunLimits,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limits = limits
+        self._clock = clock
+        self._queues: dict[tuple[int, str], deque[_RunWaiter]] = {}
+        self._last_served: dict[str, int] = {}
+        self._grants = 0
+        self._running = 0
+        self._running_by_user: Counter[str] = Counter()
+        self._running_by_project: Counter[str] = Counter()
+        self._running_by_priority: Counter[RunPriority] = Counter()
+        self._admitted = 0
+        self._waited = 0
+        self._total_wait_s = 0.0
+        self._max_wait_s = 0.0
+
+    @property
+    def limits(self) -> RunLimits:
+        return self._limits
+
+    def stats(self) -> RunSchedulerStats:
+        return RunSchedulerStats(
+            running=self._running,
+            queued=sum(len(queue) for queue in self._queues.values()),
+            queued_by_priority={
+                priority: sum(
+                    len(queue)
+                    for (rank, _user), queue in self._queues.items()
+                    if rank == _PRIORITY_RANK[priority]
+                )
+                for priority in RUN_PRIORITIES
+            },
+            admitted=self._admitted,
+            waited=self._waited,
+            total_wait_s=self._total_wait_s,
+            max_wait_s=self._max_wait_s,
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        *,
+        user_id: str | None,
+        project: str | None,
+        priority: RunPriority = "interactive",
+        on_queued: Callable[[int], Awaitable[None]] | None = None,
+    ) -> AsyncIterator[None]:
+        waiter = _RunWaiter(
+            user=user_id or _ANONYMOUS_USER,
+            project=project.lower() if project else None,
+            priority=priority,
+            queued_at=self._clock(),
+        )
+        if not self._queues and self._has_capacity(waiter):
+            self._grant(waiter)
+        else:
+            self._queues.setdefault(_queue_key(waiter), deque()).append(waiter)
+            self._dispatch()
+        if not waiter.granted:
+            try:
+                if on_queued is not None:
+                    await on_queued(self.position(waiter))
+                await waiter.ready.wait()
+            except BaseException:
+                if waiter.granted:
+                    self._release(waiter)
+                else:
+                    self._remove(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def position(self, waiter: _RunWaiter) -> int:
+        # 1-based position in the order _dispatch would admit waiters if
+        # capacity opened up one slot at a time.
+        rank = _PRIORITY_RANK[waiter.priority]
+        position = sum(
+            len(queue) for (other, _user), queue in self._queues.items() if other < rank
+        )
+        queues = [list(self._queues[key]) for key in self._rotation() if key[0] == rank]
+        depth = 0
+        while any(depth < len(queue) for queue in queues):
+            for queue in queues:
+                if depth < len(queue):
+                    position += 1
+                    if queue[depth] is waiter:
+                        return position
+            depth += 1
+        return 0
+
+    def _rotation(self) -> list[tuple[int, str]]:
+        return sorted(
+            self._queues,
+            key=lambda key: (key[0], self._last_served.get(key[1], -1)),
+        )
+
+    def _has_capacity(self, waiter: _RunWaiter) -> bool:
+        limits = self._limits
+        if limits.max_concurrent is not None and self._running >= limits.max_concurrent:
+            return False
+        if (
+            limits.per_user is not None
+            and self._running_by_user[waiter.user] >= limits.per_user
+        ):
+            return False
+        if (
+            limits.per_project is not None
+            and waiter.project is not None
+            and self._running_by_project[waiter.project] >= limits.per_project
+        ):
+            return False
+        if (
+            limits.batch is not None
+            and waiter.priority == "batch"
+            and self._running_by_priority["batch"] >= limits.batch
+        ):
+            return False
+        return True
+
+    def _grant(self, waiter: _RunWaiter) -> None:
+        waiter.granted = True
+        self._grants += 1
+        self._last_served[waiter.user] = self._grants
+        self._running += 1
+        self._running_by_user[waiter.user] += 1
+        self._running_by_priority[waiter.priority] += 1
+        if waiter.project is not None:
+            self._running_by_project[waiter.project] += 1
+        waited = max(0.0, self._clock() - waiter.queued_at)
+        self._admitted += 1
+        if waited > 0:
+            self._waited += 1
+            self._total_wait_s += waited
+            self._max_wait_s = max(self._max_wait_s, waited)
+            logger.info(
+                "slack.run_scheduler.admitted",
+                user=waiter.user,
+                project=waiter.project,
+                priority=waiter.priority,
+                wait_s=round(waited, 3),
+                running=self._running,
+            )
+        waiter.ready.set()
+
+    def _release(self, waiter: _RunWaiter) -> None:
+        if not waiter.granted:
+            return
+        waiter.granted = False
+        self._running -= 1
+        self._running_by_user[waiter.user] -= 1
+        self._running_by_priority[waiter.priority] -= 1
+        if self._running_by_user[waiter.user] <= 0:
+            del self._running_by_user[waiter.user]
+            if not any(user == waiter.user for _rank, user in self._queues):
+                self._last_served.pop(waiter.user, None)
+        if waiter.project is not None:
+            self._running_by_project[waiter.project] -= 1
+            if self._running_by_project[waiter.project] <= 0:
+                del self._running_by_project[waiter.project]
+        self._dispatch()
+
+    def _remove(self, waiter: _RunWaiter) -> None:
+        key = _queue_key(waiter)
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[key]
+
+    def _dispatch(self) -> None:
+        # Admit one head at a time: granting moves that user to the back of
+        # the rotation, so the order is recomputed after every admission.
+        while self._queues:
+            for key in self._rotation():
+                queue = self._queues[key]
+                head = queue[0]
+                if self._has_capacity(head):
+                    break
+            else:
+                return
+            queue.popleft()
+            if not queue:
+                del self._queues[key]
+            self._grant(head)
+
+
+def _queue_key(waiter: _RunWaiter) -> tuple[int, str]:
+    return (_PRIORITY_RANK[waiter.priority], waiter.user)
+
 
 async def send_plain(
     exec_cfg: ExecBridgeConfig,
@@ -59,6 +323,130 @@ async def run_engine(
     thread_id: str | None,
     on_thread_known: Callable[[Any, anyio.Event], Awaitable[None]] | None = None,
     run_options: EngineRunOptions | None = None,
+    scheduler: RunScheduler | None = None,
+    user_id: str | None = None,
+    priority: RunPriority = "interactive",
+    repo_locks: RepoLockManager | None = None,
+) -> None:
+    async with AsyncExitStack() as stack:
+        if scheduler is not None and not await _enter_slot(
+            stack,
+            scheduler,
+            exec_cfg=exec_cfg,
+            running_tasks=running_tasks,
+            channel_id=channel_id,
+            user_msg_id=user_msg_id,
+            thread_id=thread_id,
+            context=context,
+            user_id=user_id,
+            priority=priority,
+        ):
+            return
+        await _run_engine(
+            exec_cfg=exec_cfg,
+            runtime=runtime,
+            running_tasks=running_tasks,
+            channel_id=channel_id,
+            user_msg_id=user_msg_id,
+            text=text,
+            resume_token=resume_token,
+            context=context,
+            engine_override=engine_override,
+            thread_id=thread_id,
+            on_thread_known=on_thread_known,
+            run_options=run_options,
+            repo_locks=repo_locks,
+        )
+
+
+async def _enter_slot(
+    stack: AsyncExitStack,
+    scheduler: RunScheduler,
+    *,
+    exec_cfg: ExecBridgeConfig,
+    running_tasks: RunningTasks,
+    channel_id: str,
+    user_msg_id: str,
+    thread_id: str | None,
+    context: RunContext | None,
+    user_id: str | None,
+    priority: RunPriority,
+) -> bool:
+    # The queued notice gets a cancel button registered like a running task,
+    # so a run can be withdrawn before it starts. False when it was.
+    queued_ref: MessageRef | None = None
+    admitted = False
+    try:
+        async with anyio.create_task_group() as tg:
+
+            async def cancel_when_requested(task: RunningTask) -> None:
+                await task.cancel_requested.wait()
+                tg.cancel_scope.cancel()
+
+            async def notify_queued(position: int) -> None:
+                nonlocal queued_ref
+                message = RenderedMessage(
+                    text=f"queued · position {position}; "
+                    "starting when a run slot frees up."
+                )
+                message.extra["show_cancel"] = True
+                queued_ref = await exec_cfg.transport.send(
+                    channel_id=channel_id,
+                    message=message,
+                    options=SendOptions(
+                        reply_to=MessageRef(
+                            channel_id=channel_id,
+                            message_id=user_msg_id,
+                            thread_id=thread_id,
+                        ),
+                        notify=False,
+                        thread_id=thread_id,
+                    ),
+                )
+                if queued_ref is not None:
+                    task = RunningTask(context=context)
+                    running_tasks[queued_ref] = task
+                    tg.start_soon(cancel_when_requested, task)
+
+            await stack.enter_async_context(
+                scheduler.slot(
+                    user_id=user_id,
+                    project=context.project if context is not None else None,
+                    priority=priority,
+                    on_queued=notify_queued,
+                )
+            )
+            admitted = True
+            tg.cancel_scope.cancel()
+    finally:
+        if queued_ref is not None:
+            running_tasks.pop(queued_ref, None)
+    if queued_ref is not None:
+        message = RenderedMessage(
+            text="queued · starting now."
+            if admitted
+            else "`cancelled` · removed from the queue."
+        )
+        message.extra["clear_blocks"] = True
+        await exec_cfg.transport.edit(ref=queued_ref, message=message)
+    return admitted
+
+
+async def _run_engine(
+    *,
+    exec_cfg: ExecBridgeConfig,
+    runtime: TransportRuntime,
+    running_tasks: RunningTasks,
+    channel_id: str,
+    user_msg_id: str,
+    text: str,
+    resume_token,
+    context: RunContext | None,
+    engine_override,
+    thread_id: str | None,
+    on_thread_known: Callable[[Any, anyio.Event], Awaitable[None]] | None,
+    run_options: EngineRunOptions | None,
+    repo_locks: RepoLockManager | None = None,
 ) -> None:
     try:
         try:
@@ -91,7 +479,7 @@ async def run_engine(
             return
 
         try:
-            cwd = runtime.resolve_run_cwd(context)
+            cwd = await resolve_run_cwd_locked(runtime, context, repo_locks)
         except ConfigError as exc:
             await send_plain(
                 exec_cfg,
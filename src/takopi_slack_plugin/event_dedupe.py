@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import msgspec
+
+from takopi.api import get_logger
+
+from .thread_sessions import _atomic_write_bytes
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "EventDedupeCache",
+    "EventDedupeStats",
+    "event_keys",
+    "resolve_dedupe_path",
+]
+
+STATE_VERSION = 1
+STATE_FILENAME = "slack_event_dedupe.json"
+DEFAULT_TTL_S = 600.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class _DedupeState(msgspec.Struct, forbid_unknown_fields=False):
+    version: int
+    entries: dict[str, float] = msgspec.field(default_factory=dict)
+
+
+_ENCODER = msgspec.json.Encoder()
+_DECODER = msgspec.json.Decoder(_DedupeState)
+
+
+def resolve_dedupe_path(config_path: Path) -> Path:
+    return config_path.with_name(STATE_FILENAME)
+
+
+def event_keys(channel_id: str, event: dict[str, Any], event_id: Any) -> list[str]:
+    # A message can arrive as both `message` and `app_mention` with different
+    # event ids, so the message ts is a key of its own.
+    keys: list[str] = []
+    if isinstance(event_id, str) and event_id:
+        keys.append(f"event:{event_id}")
+    ts = event.get("ts")
+    if isinstance(ts, str) and ts:
+        keys.append(f"ts:{channel_id}:{ts}")
+    return keys
+
+
+@dataclass(frozen=True, slots=True)
+class EventDedupeStats:
+    checked: int
+    duplicates: int
+    expired: int
+    evicted: int
+    size: int
+
+
+class EventDedupeCache:
+    # Remembers handled events for `ttl_s` seconds, at most `max_entries`
+    # keys (oldest dropped first). Entries are wall-clock expiry times so a
+    # persisted cache stays meaningful across restarts.
+
+    def __init__(
+        self,
+        *,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._ttl_s = ttl_s
+        self._max_entries = max(1, max_entries)
+        self._path = path
+        self._clock = clock
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._dirty = False
+        self._checked = 0
+        self._duplicates = 0
+        self._expired = 0
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    def stats(self) -> EventDedupeStats:
+        return EventDedupeStats(
+            checked=self._checked,
+            duplicates=self._duplicates,
+            expired=self._expired,
+            evicted=self._evicted,
+            size=len(self._entries),
+        )
+
+    def check(self, keys: list[str]) -> bool:
+        # True when any key was seen within the ttl; records the keys either
+        # way so a duplicate also covers its sibling keys.
+        if not keys:
+            return False
+        now = self._clock()
+        self._expire(now)
+        self._checked += 1
+        duplicate = any(key in self._entries for key in keys)
+        expires_at = now + self._ttl_s
+        for key in keys:
+            self._entries[key] = expires_at
+            self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evicted += 1
+        self._dirty = True
+        if duplicate:
+            self._duplicates += 1
+        return duplicate
+
+    def _expire(self, now: float) -> None:
+        # Entries are kept in expiry order, so expired ones are at the front.
+        while self._entries:
+            key, expires_at = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+            self._expired += 1
+            self._dirty = True
+
+    def load(self) -> None:
+        if self._path is None:
+            return
+        try:
+            state = _DECODER.decode(self._path.read_bytes())
+        except FileNotFoundError:
+            return
+        except (OSError, msgspec.DecodeError) as exc:
+            logger.warning(
+                "slack.event_dedupe.load_failed",
+                path=str(self._path),
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return
+        if state.version != STATE_VERSION:
+            return
+        now = self._clock()
+        for key, expires_at in sorted(state.entries.items(), key=lambda kv: kv[1]):
+            if expires_at > now:
+                self._entries[key] = expires_at
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        if self._path is None or not self._dirty:
+            return
+        self._expire(self._clock())
+        state = _DedupeState(version=STATE_VERSION, entries=dict(self._entries))
+        try:
+            _atomic_write_bytes(self._path, _ENCODER.encode(state))
+        except OSError as exc:
+            logger.warning(
+                "slack.event_dedupe.save_failed",
+                path=str(self._path),
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return
+        self._dirty = False
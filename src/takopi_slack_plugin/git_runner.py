@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import anyio
+from anyio.abc import ByteReceiveStream
+
+from takopi.api import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = ["GitResult", "GitRunner", "WorktreeStatus", "parse_worktree_status"]
+
+DEFAULT_GIT_TIMEOUT_S = 120.0
+DEFAULT_GIT_MAX_CONCURRENT = 4
+DEFAULT_GIT_MAX_OUTPUT_BYTES = 1024 * 1024
+TIMEOUT_RETURNCODE = -1
+
+# Never block on a credential or editor prompt: there is nobody to answer it.
+_GIT_ENV = {"GIT_TERMINAL_PROMPT": "0", "GIT_EDITOR": "true", "LC_ALL": "C"}
+
+
+@dataclass(frozen=True, slots=True)
+class GitResult:
+    returncode: int
+    stdout: str
+    stderr: str
+    truncated: bool = False
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def details(self) -> str:
+        return self.stderr.strip() or self.stdout.strip()
+
+
+@dataclass(frozen=True, slots=True)
+class WorktreeStatus:
+    head: str | None
+    branch: str | None
+    upstream: str | None = None
+    ahead: int = 0
+    behind: int = 0
+    changed: int = 0
+    untracked: int = 0
+
+    @property
+    def dirty(self) -> bool:
+        return self.changed > 0 or self.untracked > 0
+
+    @property
+    def detached(self) -> bool:
+        return self.branch is None
+
+    def summary(self) -> str:
+        parts = [f"`{self.branch}`" if self.branch else "detached HEAD"]
+        if self.changed or self.untracked:
+            parts.append(f"{self.changed} changed, {self.untracked} untracked")
+        else:
+            parts.append("clean")
+        if self.upstream is not None:
+            if self.ahead or self.behind:
+                parts.append(
+                    f"{self.ahead} ahead / {self.behind} behind `{self.upstream}`"
+                )
+            else:
+                parts.append(f"up to date with `{self.upstream}`")
+        else:
+            parts.append("no upstream")
+        return ", ".join(parts)
+
+
+def parse_worktree_status(output: str) -> WorktreeStatus:
+    # Parses `git status --porcelain=v2 --branch`: header lines start with
+    # "# branch.", entries with 1/2/u (tracked changes) or ? (untracked).
+    head: str | None = None
+    branch: str | None = None
+    upstream: str | None = None
+    ahead = behind = changed = untracked = 0
+    for line in output.splitlines():
+        if line.startswith("# branch."):
+            key, _, value = line[len("# branch.") :].partition(" ")
+            if key == "oid":
+                head = None if value == "(initial)" else value
+            elif key == "head":
+                branch = None if value == "(detached)" else value
+            elif key == "upstream":
+                upstream = value
+            elif key == "ab":
+                for token in value.split():
+                    if token.startswith("+"):
+                        ahead = int(token[1:])
+                    elif token.startswith("-"):
+                        behind = int(token[1:])
+        elif line[:2] in {"1 ", "2 ", "u "}:
+            changed += 1
+        elif line.startswith("? "):
+            untracked += 1
+    return WorktreeStatus(
+        head=head,
+        branch=branch,
+        upstream=upstream,
+        ahead=ahead,
+        behind=behind,
+        changed=changed,
+        untracked=untracked,
+    )
+
+
+class GitRunner:
+    # Runs git as async subprocesses instead of blocking worker threads.
+    # The limiter bounds concurrent git processes, output beyond the cap is
+    # drained and dropped, and a timed out or cancelled process is killed.
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = DEFAULT_GIT_MAX_CONCURRENT,
+        timeout_s: float = DEFAULT_GIT_TIMEOUT_S,
+        max_output_bytes: int = DEFAULT_GIT_MAX_OUTPUT_BYTES,
+    ) -> None:
+        self._limiter = anyio.CapacityLimiter(max(1, int(max_concurrent)))
+        self._timeout_s = timeout_s
+        self._max_output_bytes = max(1, int(max_output_bytes))
+        self._env = {**os.environ, **_GIT_ENV}
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        return self._limiter
+
+    async def run(
+        self,
+        args: Sequence[str],
+        *,
+        cwd: Path,
+        timeout_s: float | None = None,
+    ) -> GitResult:
+        timeout = self._timeout_s if timeout_s is None else timeout_s
+        async with self._limiter:
+            return await self._run(list(args), cwd=cwd, timeout_s=timeout)
+
+    async def worktree_status(
+        self, path: Path
+    ) -> tuple[WorktreeStatus | None, GitResult]:
+        # One process for branch, upstream, ahead/behind and dirty state.
+        result = await self.run(
+            ["git", "-C", str(path), "status", "--porcelain=v2", "--branch"],
+            cwd=path,
+        )
+        if not result.ok or result.truncated:
+            return None, result
+        return parse_worktree_status(result.stdout), result
+
+    async def _run(
+        self,
+        args: list[str],
+        *,
+        cwd: Path,
+        timeout_s: float,
+    ) -> GitResult:
+        stdout = bytearray()
+        stderr = bytearray()
+        truncated = False
+
+        async def collect(stream: ByteReceiveStream, sink: bytearray) -> None:
+            nonlocal truncated
+            async for chunk in stream:
+                room = self._max_output_bytes - len(sink)
+                if len(chunk) > room:
+                    truncated = True
+                if room > 0:
+                    sink += chunk[:room]
+
+        try:
+            process = await anyio.open_process(
+                args,
+                cwd=cwd,
+                env=self._env,
+                stdin=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            return GitResult(returncode=127, stdout="", stderr=str(exc))
+
+        timed_out = False
+        try:
+            with anyio.move_on_after(timeout_s) as scope:
+                async with anyio.create_task_group() as tg:
+                    assert process.stdout is not None
+                    assert process.stderr is not None
+                    tg.start_soon(collect, process.stdout, stdout)
+                    tg.start_soon(collect, process.stderr, stderr)
+                    await process.wait()
+            timed_out = scope.cancelled_caught
+        finally:
+            if process.returncode is None:
+                process.kill()
+                with anyio.CancelScope(shield=True):
+                    await process.wait()
+            with anyio.CancelScope(shield=True):
+                await process.aclose()
+
+        if timed_out:
+            logger.warning(
+                "slack.git.timeout",
+                args=args[1:4],
+                cwd=str(cwd),
+                timeout_s=timeout_s,
+            )
+            return GitResult(
+                returncode=TIMEOUT_RETURNCODE,
+                stdout=stdout.decode("utf-8", errors="replace"),
+                stderr=f"timed out after {timeout_s:g}s",
+                truncated=truncated,
+                timed_out=True,
+            )
+        if truncated:
+            logger.info("slack.git.output_truncated", args=args[1:4], cwd=str(cwd))
+        assert process.returncode is not None
+        return GitResult(
+            returncode=process.returncode,
+            stdout=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace"),
+            truncated=truncated,
+        )
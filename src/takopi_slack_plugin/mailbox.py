@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, Literal, TypeVar
+
+import anyio.abc
+
+from takopi.api import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = ["MailboxPolicy", "ThreadMailbox"]
+
+T = TypeVar("T")
+MailboxPolicy = Literal["queue", "coalesce"]
+
+
+class ThreadMailbox(Generic[T]):
+    # At most one worker per key (thread): items submitted while it is busy
+    # wait in arrival order, or are merged into the last pending item when a
+    # coalesce function is given and does not return None. The worker exits
+    # once its backlog drains.
+
+    def __init__(
+        self,
+        *,
+        coalesce: Callable[[T, T], T | None] | None = None,
+        max_pending: int = 20,
+    ) -> None:
+        self._coalesce = coalesce
+        self._max_pending = max(1, int(max_pending))
+        self._pending: dict[Hashable, deque[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def is_busy(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    def pending_count(self, key: Hashable) -> int:
+        pending = self._pending.get(key)
+        return 0 if pending is None else len(pending)
+
+    def submit(
+        self,
+        tg: anyio.abc.TaskGroup,
+        key: Hashable,
+        item: T,
+        handler: Callable[[T], Awaitable[None]],
+    ) -> bool:
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = deque()
+            tg.start_soon(self._drain, key, item, handler)
+            return True
+        if self._coalesce is not None and pending:
+            merged = self._coalesce(pending[-1], item)
+            if merged is not None:
+                pending[-1] = merged
+                return True
+        if len(pending) >= self._max_pending:
+            logger.warning(
+                "slack.mailbox.full",
+                key=str(key),
+                pending=len(pending),
+            )
+            return False
+        pending.append(item)
+        return True
+
+    async def _drain(
+        self,
+        key: Hashable,
+        item: T,
+        handler: Callable[[T], Awaitable[None]],
+    ) -> None:
+        try:
+            while True:
+                await handler(item)
+                pending = self._pending.get(key)
+                if not pending:
+                    return
+                item = pending.popleft()
+        finally:
+            self._pending.pop(key, None)
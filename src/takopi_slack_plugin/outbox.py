@@ -7,6 +7,7 @@ from typing import Any
 import anyio
 
 __all__ = [
+    "DEFAULT_CHANNEL_INTERVAL",
     "DELETE_PRIORITY",
     "EDIT_PRIORITY",
     "SEND_PRIORITY",
@@ -60,7 +61,9 @@ class SlackOutbox:
         self._start_lock = anyio.Lock()
         self._closed = False
         self._tg: anyio.abc.TaskGroup | None = None
-        self._next_at = 0.0
+        # Each channel is its own rate-limit lane: a busy channel does not
+        # hold back sends and edits in the others.
+        self._next_at: dict[str | None, float] = {}
 
     async def ensure_worker(self) -> None:
         async with self._start_lock:
@@ -107,12 +110,21 @@ class SlackOutbox:
             pending.set_result(None)
         self._pending.clear()
 
-    def _pick_locked(self) -> tuple[object, OutboxOp] | None:
-        if not self._pending:
+    def _pick_locked(
+        self, now: float | None = None
+    ) -> tuple[object, OutboxOp] | None:
+        ready = [
+            item
+            for item in self._pending.items()
+            if now is None or self._next_at.get(item[1].channel_id, 0.0) <= now
+        ]
+        if not ready:
             return None
+        return min(ready, key=lambda item: (item[1].priority, item[1].queued_at))
+
+    def _ready_at_locked(self) -> float:
         return min(
-            self._pending.items(),
-            key=lambda item: (item[1].priority, item[1].queued_at),
+            self._next_at.get(op.channel_id, 0.0) for op in self._pending.values()
         )
 
     async def _execute_op(self, op: OutboxOp) -> Any:
@@ -123,10 +135,22 @@ class SlackOutbox:
                 self._on_error(op, exc)
             return None
 
-    async def _sleep_until(self, deadline: float) -> None:
+    async def _wait_until_locked(self, deadline: float) -> None:
+        # Sleeps until `deadline` with the condition released; an enqueue or
+        # close wakes the worker early, so an op for a ready channel does not
+        # wait out another channel's interval.
         delay = deadline - self._clock()
-        if delay > 0:
-            await self._sleep(delay)
+        if delay <= 0:
+            return
+        async with anyio.create_task_group() as tg:
+
+            async def wake_at_deadline() -> None:
+                await self._sleep(delay)
+                tg.cancel_scope.cancel()
+
+            tg.start_soon(wake_at_deadline)
+            await self._cond.wait()
+            tg.cancel_scope.cancel()
 
     async def _run(self) -> None:
         cancel_exc = anyio.get_cancelled_exc_class()
@@ -137,23 +161,19 @@ class SlackOutbox:
                         await self._cond.wait()
                     if self._closed and not self._pending:
                         return
-
-                if self._clock() < self._next_at:
-                    await self._sleep_until(self._next_at)
-                    continue
-
-                async with self._cond:
-                    if self._closed and not self._pending:
-                        return
-                    picked = self._pick_locked()
+                    picked = self._pick_locked(self._clock())
                     if picked is None:
+                        await self._wait_until_locked(self._ready_at_locked())
                         continue
                     key, op = picked
                     self._pending.pop(key, None)
 
                 interval = self._interval_for_channel(op.channel_id)
                 if interval:
-                    self._next_at = max(self._next_at, self._clock()) + interval
+                    lane = op.channel_id
+                    self._next_at[lane] = (
+                        max(self._next_at.get(lane, 0.0), self._clock()) + interval
+                    )
                 result = await self._execute_op(op)
                 op.set_result(result)
         except cancel_exc:
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import heapq
+import time
+from collections.abc import Callable, Mapping
+
+import anyio
+
+from .thread_sessions import ThreadSnapshot
+
+__all__ = ["StaleWorktreeScheduler"]
+
+_ThreadKey = tuple[str, str]
+
+
+class StaleWorktreeScheduler:
+    # Min-heap of stale deadlines so the reminder loop sleeps until the next
+    # one is due; superseded entries are dropped lazily when they surface.
+
+    def __init__(
+        self,
+        *,
+        stale_hours: float,
+        project_hours: Mapping[str, float] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._stale_hours = max(0.0, float(stale_hours))
+        self._project_hours = {
+            key.lower(): max(0.0, float(value))
+            for key, value in (project_hours or {}).items()
+        }
+        self._clock = clock
+        self._deadlines: dict[_ThreadKey, float] = {}
+        self._heap: list[tuple[float, _ThreadKey]] = []
+        self._changed: anyio.Event | None = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def stale_hours_for(self, project: str) -> float:
+        return self._project_hours.get(project.lower(), self._stale_hours)
+
+    def schedule(self, snapshot: ThreadSnapshot) -> None:
+        key = (snapshot.channel_id, snapshot.thread_id)
+        deadline = self.deadline_for(snapshot)
+        if deadline is None:
+            self.discard(channel_id=snapshot.channel_id, thread_id=snapshot.thread_id)
+            return
+        if self._deadlines.get(key) == deadline:
+            return
+        previous_next = self.next_deadline()
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if previous_next is None or deadline < previous_next:
+            self._notify()
+
+    def track(
+        self, channel_id: str, thread_id: str, snapshot: ThreadSnapshot | None
+    ) -> None:
+        # Thread store listener.
+        if snapshot is None:
+            self.discard(channel_id=channel_id, thread_id=thread_id)
+        else:
+            self.schedule(snapshot)
+
+    def discard(self, *, channel_id: str, thread_id: str) -> None:
+        # Heap entries are left behind and dropped when they surface.
+        self._deadlines.pop((channel_id, thread_id), None)
+
+    def next_deadline(self) -> float | None:
+        self._drop_superseded()
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_due(self, now: float | None = None) -> list[_ThreadKey]:
+        current = self._clock() if now is None else now
+        due: list[_ThreadKey] = []
+        while True:
+            self._drop_superseded()
+            if not self._heap or self._heap[0][0] > current:
+                return due
+            _, key = heapq.heappop(self._heap)
+            self._deadlines.pop(key, None)
+            due.append(key)
+
+    async def wait(self, *, max_wait_s: float) -> None:
+        delay = max(0.0, float(max_wait_s))
+        deadline = self.next_deadline()
+        if deadline is not None:
+            delay = min(delay, deadline - self._clock())
+        if delay <= 0:
+            return
+        changed = anyio.Event()
+        self._changed = changed
+        with anyio.move_on_after(delay):
+            await changed.wait()
+        if self._changed is changed:
+            self._changed = None
+
+    def deadline_for(self, snapshot: ThreadSnapshot) -> float | None:
+        worktree = snapshot.worktree
+        if worktree is None or snapshot.last_activity_at is None:
+            return None
+        reminder = snapshot.reminder
+        if (
+            reminder is not None
+            and reminder.sent_at is not None
+            and reminder.sent_at >= snapshot.last_activity_at
+        ):
+            return None
+        stale_s = self.stale_hours_for(worktree.project) * 3600.0
+        return snapshot.last_activity_at + stale_s
+
+    def _drop_superseded(self) -> None:
+        heap = self._heap
+        while heap:
+            deadline, key = heap[0]
+            if self._deadlines.get(key) == deadline:
+                return
+            heapq.heappop(heap)
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
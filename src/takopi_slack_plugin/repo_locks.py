@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import anyio
+
+from takopi.api import RunContext, TransportRuntime, get_logger
+from takopi.worktrees import (
+    WorktreeError,
+    _ensure_within_root,
+    _matches_project_branch,
+    _sanitize_branch,
+)
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "RepoBusyError",
+    "RepoLockManager",
+    "RepoLockStats",
+    "existing_run_path",
+    "repo_key",
+    "resolve_run_cwd_locked",
+]
+
+
+def repo_key(path: Path) -> str:
+    try:
+        return str(path.resolve())
+    except OSError:
+        return str(path)
+
+
+def existing_run_path(
+    runtime: TransportRuntime, context: RunContext | None
+) -> Path | None:
+    # Same validation as takopi's resolve_run_cwd, minus the worktree
+    # creation it does when the branch has no worktree yet.
+    if context is None or context.project is None:
+        return None
+    project = runtime._projects.projects.get(context.project)
+    if project is None or not project.path.exists():
+        return None
+    if context.branch is None:
+        return project.path
+    try:
+        branch = _sanitize_branch(context.branch)
+        if _matches_project_branch(project.path, branch):
+            return project.path
+        path = project.worktrees_root / branch
+        _ensure_within_root(project.worktrees_root, path)
+    except WorktreeError:
+        return None
+    return path if path.exists() else None
+
+
+async def resolve_run_cwd_locked(
+    runtime: TransportRuntime,
+    context: RunContext | None,
+    locks: RepoLockManager | None,
+) -> Path | None:
+    # Creating a worktree runs `git worktree add` in the project repository,
+    # so it holds that repository's lock; an existing tree needs no lock.
+    if (
+        locks is None
+        or context is None
+        or context.project is None
+        or existing_run_path(runtime, context) is not None
+    ):
+        return runtime.resolve_run_cwd(context)
+    project = runtime._projects.projects.get(context.project)
+    if project is None:
+        return runtime.resolve_run_cwd(context)
+    async with locks.hold(repo_key(project.path), fail_fast=False):
+        return runtime.resolve_run_cwd(context)
+
+
+class RepoBusyError(RuntimeError):
+    def __init__(self, key: str) -> None:
+        super().__init__(f"repository is busy: {key}")
+        self.key = key
+
+
+@dataclass(frozen=True, slots=True)
+class RepoLockStats:
+    acquired: int
+    contended: int
+    failed_fast: int
+    total_wait_s: float
+    max_wait_s: float
+
+
+@dataclass(slots=True)
+class _RepoLock:
+    condition: anyio.Condition = field(default_factory=anyio.Condition)
+    readers: int = 0
+    writer: bool = False
+    waiting_writers: int = 0
+    users: int = 0
+
+    def available(self, *, shared: bool) -> bool:
+        if shared:
+            # Waiting writers go first so a stream of runs cannot starve them.
+            return not self.writer and self.waiting_writers == 0
+        return not self.writer and self.readers == 0
+
+
+class RepoLockManager:
+    # Per-repository locks keyed by path. Git mutations (worktree add,
+    # reset, clean, worktree remove) hold an exclusive lock, so they queue
+    # behind each other instead of failing on git's index.lock. Engine runs
+    # themselves take no lock.
+
+    def __init__(
+        self,
+        *,
+        fail_fast: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fail_fast = fail_fast
+        self._clock = clock
+        self._locks: dict[str, _RepoLock] = {}
+        self._acquired = 0
+        self._contended = 0
+        self._failed_fast = 0
+        self._total_wait_s = 0.0
+        self._max_wait_s = 0.0
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def stats(self) -> RepoLockStats:
+        return RepoLockStats(
+            acquired=self._acquired,
+            contended=self._contended,
+            failed_fast=self._failed_fast,
+            total_wait_s=self._total_wait_s,
+            max_wait_s=self._max_wait_s,
+        )
+
+    def is_locked(self, key: str) -> bool:
+        lock = self._locks.get(key)
+        return lock is not None and (lock.writer or lock.readers > 0)
+
+    @asynccontextmanager
+    async def hold(
+        self,
+        key: str,
+        *,
+        shared: bool = False,
+        fail_fast: bool | None = None,
+    ) -> AsyncIterator[None]:
+        fail_fast = self._fail_fast if fail_fast is None else fail_fast
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = _RepoLock()
+        lock.users += 1
+        try:
+            await self._acquire(key, lock, shared=shared, fail_fast=fail_fast)
+            try:
+                yield
+            finally:
+                with anyio.CancelScope(shield=True):
+                    async with lock.condition:
+                        if shared:
+                            lock.readers -= 1
+                        else:
+                            lock.writer = False
+                        lock.condition.notify_all()
+        finally:
+            lock.users -= 1
+            if lock.users == 0:
+                self._locks.pop(key, None)
+
+    async def _acquire(
+        self,
+        key: str,
+        lock: _RepoLock,
+        *,
+        shared: bool,
+        fail_fast: bool,
+    ) -> None:
+        async with lock.condition:
+            if not lock.available(shared=shared):
+                if fail_fast:
+                    self._failed_fast += 1
+                    raise RepoBusyError(key)
+                self._contended += 1
+                started = self._clock()
+                if not shared:
+                    lock.waiting_writers += 1
+                try:
+                    while not lock.available(shared=shared):
+                        await lock.condition.wait()
+                finally:
+                    if not shared:
+                        lock.waiting_writers -= 1
+                        # A cancelled writer may have been holding back readers.
+                        lock.condition.notify_all()
+                waited = self._clock() - started
+                self._total_wait_s += waited
+                self._max_wait_s = max(self._max_wait_s, waited)
+                logger.info(
+                    "slack.repo_lock.waited",
+                    key=key,
+                    shared=shared,
+                    wait_s=round(waited, 3),
+                )
+            if shared:
+                lock.readers += 1
+            else:
+                lock.writer = True
+            self._acquired += 1
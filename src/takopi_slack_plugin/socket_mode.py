@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import json
+import random
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+import anyio
+import anyio.abc
+import websockets
+from websockets.exceptions import WebSocketException
+
+from takopi.api import get_logger
+
+from .client import SlackApiError
+
+logger = get_logger(__name__)
+
+__all__ = ["Backoff", "RecentIds", "SocketModeRunner", "socket_budget"]
+
+EnvelopeHandler = Callable[[dict[str, Any]], None]
+
+# Slack allows 10 open connections per app, and a planned handoff briefly
+# keeps both the old and the new socket of a slot open.
+MAX_SOCKET_CONNECTIONS = 5
+DEFAULT_RECENT_IDS = 2048
+DEFAULT_BUDGET_POLL_S = 5.0
+
+
+def socket_budget(workers: int) -> int:
+    # Connections each of `workers` processes sharing one app may keep open.
+    # Every worker needs one, so past MAX_SOCKET_CONNECTIONS workers the
+    # app's limit can be exceeded during handoffs.
+    return max(1, MAX_SOCKET_CONNECTIONS // max(1, workers))
+
+
+class _Socket(Protocol):
+    async def recv(self) -> str | bytes: ...
+
+    async def send(self, message: str) -> None: ...
+
+
+class _UrlOpener(Protocol):
+    async def open(self) -> str: ...
+
+
+Connector = Callable[[str], AbstractAsyncContextManager[_Socket]]
+
+
+def _connect(url: str) -> AbstractAsyncContextManager[_Socket]:
+    return websockets.connect(url, ping_interval=10, ping_timeout=10)
+
+
+class Backoff:
+    # Exponential backoff with jitter, only used after failures; planned
+    # refreshes reconnect immediately.
+
+    def __init__(
+        self,
+        *,
+        initial_s: float = 1.0,
+        max_s: float = 30.0,
+        factor: float = 2.0,
+        jitter: float = 0.5,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self._initial_s = initial_s
+        self._max_s = max_s
+        self._factor = factor
+        self._jitter = min(1.0, max(0.0, jitter))
+        self._rng = rng
+        self._attempts = 0
+
+    def reset(self) -> None:
+        self._attempts = 0
+
+    def next_delay(self) -> float:
+        delay = min(self._max_s, self._initial_s * self._factor**self._attempts)
+        self._attempts += 1
+        return delay * (1.0 - self._jitter) + delay * self._jitter * self._rng()
+
+
+class RecentIds:
+    # Bounded LRU of ids already handled. Slack delivers an event on any open
+    # connection and retries unacked ones with a new envelope id, so both the
+    # envelope id and the event id are remembered.
+
+    def __init__(self, maxsize: int = DEFAULT_RECENT_IDS) -> None:
+        self._maxsize = max(1, maxsize)
+        self._ids: OrderedDict[str, None] = OrderedDict()
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._ids
+
+    def seen(self, keys: list[str]) -> bool:
+        duplicate = any(key in self._ids for key in keys)
+        for key in keys:
+            self._ids[key] = None
+            self._ids.move_to_end(key)
+        while len(self._ids) > self._maxsize:
+            self._ids.popitem(last=False)
+        if duplicate:
+            self.duplicates += 1
+        return duplicate
+
+
+def _envelope_keys(envelope: dict[str, Any]) -> list[str]:
+    keys: list[str] = []
+    envelope_id = envelope.get("envelope_id")
+    if isinstance(envelope_id, str) and envelope_id:
+        keys.append(f"envelope:{envelope_id}")
+    payload = envelope.get("payload")
+    if isinstance(payload, dict):
+        event_id = payload.get("event_id")
+        if isinstance(event_id, str) and event_id:
+            keys.append(f"event:{event_id}")
+    return keys
+
+
+@dataclass(slots=True)
+class _Handoff:
+    done: anyio.Event = field(default_factory=anyio.Event)
+    planned: bool = False
+    scope: anyio.CancelScope | None = None
+
+
+class SocketModeRunner:
+    # Keeps `connections` Socket Mode connections open. When Slack announces
+    # a disconnect (refresh or warning) the next connection is opened right
+    # away while the old one keeps delivering until Slack closes it, so there
+    # is no window without a listener. Every envelope is acked on the socket
+    # it arrived on, but each is handled once across all connections.
+    # `budget` caps the open connections at run time (workers of a cluster
+    # share the app's limit); slots above it close and wait.
+
+    def __init__(
+        self,
+        opener: _UrlOpener,
+        *,
+        connections: int = 1,
+        connect: Connector = _connect,
+        backoff_factory: Callable[[], Backoff] = Backoff,
+        drain_timeout_s: float = 15.0,
+        recent_ids: RecentIds | None = None,
+        budget: Callable[[], int] | None = None,
+        budget_poll_s: float = DEFAULT_BUDGET_POLL_S,
+    ) -> None:
+        self._opener = opener
+        self._connections = min(MAX_SOCKET_CONNECTIONS, max(1, connections))
+        self._budget = budget
+        self._budget_poll_s = budget_poll_s
+        self._connect = connect
+        self._backoff_factory = backoff_factory
+        self._drain_timeout_s = drain_timeout_s
+        self._recent = RecentIds() if recent_ids is None else recent_ids
+
+    @property
+    def recent_ids(self) -> RecentIds:
+        return self._recent
+
+    async def run(self, handle: EnvelopeHandler) -> None:
+        async with anyio.create_task_group() as tg:
+            for slot in range(self._connections):
+                tg.start_soon(self._run_slot, tg, handle, slot)
+
+    def _allowed(self, slot: int) -> bool:
+        # The first slot always stays open.
+        return slot == 0 or self._budget is None or slot < self._budget()
+
+    async def _run_slot(
+        self,
+        tg: anyio.abc.TaskGroup,
+        handle: EnvelopeHandler,
+        slot: int = 0,
+    ) -> None:
+        backoff = self._backoff_factory()
+        while True:
+            if not self._allowed(slot):
+                await anyio.sleep(self._budget_poll_s)
+                continue
+            handoff = _Handoff()
+            try:
+                url = await self._opener.open()
+                await tg.start(self._serve, url, handoff, handle)
+            except SlackApiError as exc:
+                logger.warning("slack.socket.open_failed", error=str(exc))
+                await anyio.sleep(backoff.next_delay())
+                continue
+            except (WebSocketException, OSError) as exc:
+                logger.warning("slack.socket_failed", error=str(exc))
+                await anyio.sleep(backoff.next_delay())
+                continue
+            except Exception as exc:
+                # Losing a slot for good would silently shrink the pool.
+                logger.exception(
+                    "slack.socket.crashed",
+                    error=str(exc),
+                    error_type=exc.__class__.__name__,
+                )
+                await anyio.sleep(backoff.next_delay())
+                continue
+            backoff.reset()
+            while not handoff.done.is_set():
+                with anyio.move_on_after(self._budget_poll_s):
+                    await handoff.done.wait()
+                if not handoff.done.is_set() and not self._allowed(slot):
+                    logger.info("slack.socket.over_budget", slot=slot)
+                    handoff.planned = True
+                    if handoff.scope is not None:
+                        handoff.scope.cancel()
+                    await handoff.done.wait()
+            if not handoff.planned:
+                await anyio.sleep(backoff.next_delay())
+
+    async def _serve(
+        self,
+        url: str,
+        handoff: _Handoff,
+        handle: EnvelopeHandler,
+        *,
+        task_status: anyio.abc.TaskStatus[None] = anyio.TASK_STATUS_IGNORED,
+    ) -> None:
+        started = False
+        try:
+            async with self._connect(url) as ws:
+                started = True
+                task_status.started()
+                with anyio.CancelScope() as scope:
+                    handoff.scope = scope
+                    while True:
+                        envelope = _decode(await ws.recv())
+                        if envelope is None:
+                            continue
+                        envelope_id = envelope.get("envelope_id")
+                        if isinstance(envelope_id, str) and envelope_id:
+                            await ws.send(json.dumps({"envelope_id": envelope_id}))
+                        if envelope.get("type") == "disconnect":
+                            logger.info(
+                                "slack.socket.disconnect",
+                                reason=envelope.get("reason"),
+                            )
+                            # Hand over now; keep reading until Slack closes
+                            # this socket, but not forever.
+                            handoff.planned = True
+                            handoff.done.set()
+                            scope.deadline = min(
+                                scope.deadline,
+                                anyio.current_time() + self._drain_timeout_s,
+                            )
+                            continue
+                        if self._recent.seen(_envelope_keys(envelope)):
+                            logger.debug(
+                                "slack.socket.duplicate",
+                                envelope_id=envelope_id,
+                                retry_attempt=envelope.get("retry_attempt"),
+                            )
+                            continue
+                        try:
+                            handle(envelope)
+                        except Exception as exc:
+                            # One bad envelope must not drop the connection.
+                            logger.exception(
+                                "slack.socket.handler_failed",
+                                envelope_id=envelope_id,
+                                error=str(exc),
+                                error_type=exc.__class__.__name__,
+                            )
+        except (WebSocketException, OSError) as exc:
+            if not started:
+                raise
+            if not handoff.planned:
+                logger.warning("slack.socket_failed", error=str(exc))
+        except Exception as exc:
+            if not started:
+                raise
+            logger.exception(
+                "slack.socket.crashed",
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+        finally:
+            handoff.done.set()
+
+
+def _decode(raw: str | bytes) -> dict[str, Any] | None:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", "ignore")
+    try:
+        envelope = json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning("slack.socket.bad_payload")
+        return None
+    return envelope if isinstance(envelope, dict) else None
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+import msgspec
+
+from takopi.config import HOME_CONFIG_PATH
+
+from .thread_sessions import (
+    SHARD_SUFFIXES,
+    decode_state,
+    resolve_sessions_path,
+    resolve_shards_dir,
+    state_format_for,
+)
+
+
+def _shard_paths(target: Path) -> list[Path]:
+    if target.is_dir():
+        return sorted(
+            path
+            for suffix in SHARD_SUFFIXES.values()
+            for path in target.glob(f"*{suffix}")
+        )
+    return [target]
+
+
+def dump_state(paths: Sequence[Path]) -> dict[str, object]:
+    shards: dict[str, object] = {}
+    for target in paths:
+        for path in _shard_paths(target):
+            state = decode_state(path.read_bytes(), state_format_for(path))
+            shards[str(path)] = msgspec.to_builtins(state)
+    return shards
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="takopi-slack-state",
+        description="Dump Slack thread session shards (json or msgpack) as JSON.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="shard files or shard directories (default: the takopi home state)",
+    )
+    args = parser.parse_args(argv)
+    paths = args.paths or [resolve_shards_dir(resolve_sessions_path(HOME_CONFIG_PATH))]
+    try:
+        shards = dump_state(paths)
+    except (OSError, msgspec.DecodeError, msgspec.ValidationError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    json.dump(shards, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
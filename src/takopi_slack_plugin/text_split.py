@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import re
+
+__all__ = ["split_markdown"]
+
+_FENCE_RE = re.compile(
+    r"^[ \t]*(?P<marker>`{3,}|~{3,})(?P<info>[^\n]*)$", re.MULTILINE
+)
+
+
+def _closer(opener: str) -> str:
+    # Closed with the opener's own marker: a ``` line does not end a ~~~
+    # block, and a shorter run does not end a longer one.
+    match = _FENCE_RE.match(opener)
+    marker = match.group("marker") if match is not None else "```"
+    return f"\n{marker}"
+
+
+def _find_cut(text: str, start: int, end: int) -> int:
+    # Prefer a paragraph, then a line, then a word boundary in the back half
+    # of the window; otherwise cut hard at the limit.
+    floor = start + (end - start) // 2
+    index = text.rfind("\n\n", floor, end)
+    if index != -1:
+        return index + 2
+    index = text.rfind("\n", floor, end)
+    if index != -1:
+        return index + 1
+    index = text.rfind(" ", floor, end)
+    if index != -1:
+        return index + 1
+    return end
+
+
+def _fence_after(text: str, start: int, end: int, opener: str | None) -> str | None:
+    marker = None if opener is None else opener.lstrip()[:3]
+    for match in _FENCE_RE.finditer(text, start, end):
+        fence = match.group("marker")
+        if opener is None:
+            opener = match.group(0).strip()
+            marker = fence[:3]
+        elif fence[:3] == marker and not match.group("info").strip():
+            opener = None
+            marker = None
+    return opener
+
+
+def split_markdown(text: str, max_chars: int) -> list[str]:
+    # Single pass: each window is scanned once for a cut and once for fences.
+    # Without code fences "".join(chunks) == text; a fence left open at a cut
+    # is closed in that chunk and re-opened at the start of the next one.
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+    chunks: list[str] = []
+    length = len(text)
+    start = 0
+    opener: str | None = None
+    while start < length:
+        prefix = f"{opener}\n" if opener is not None else ""
+        if opener is not None and len(prefix) + len(_closer(opener)) > max_chars // 2:
+            prefix = ""
+            opener = None
+        budget = max_chars - len(prefix)
+        if length - start <= budget:
+            chunks.append(prefix + text[start:])
+            break
+        cut = _find_cut(text, start, start + budget)
+        still_open = _fence_after(text, start, cut, opener)
+        closer = "" if still_open is None else _closer(still_open)
+        if still_open is not None and budget <= 2 * len(closer):
+            still_open = None
+        elif still_open is not None and cut - start + len(closer) > budget:
+            cut = _find_cut(text, start, start + budget - len(closer))
+            still_open = _fence_after(text, start, cut, opener)
+        chunk = prefix + text[start:cut]
+        if still_open is not None:
+            closer = _closer(still_open)
+            chunk += closer[1:] if chunk.endswith("\n") else closer
+        chunks.append(chunk)
+        opener = still_open
+        start = cut
+    return chunks
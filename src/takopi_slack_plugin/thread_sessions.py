@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import os
+import re
+import zlib
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Literal
+
+import anyio
 import msgspec
 
 from takopi.api import ResumeToken, RunContext, get_logger
@@ -9,8 +18,24 @@ from takopi.telegram.state_store import JsonStateStore
 
 logger = get_logger(__name__)
 
-STATE_VERSION = 1
+# v2: shards may be msgpack-encoded; v1 JSON shards load unchanged.
+STATE_VERSION = 2
+COMPATIBLE_STATE_VERSIONS = frozenset({1, STATE_VERSION})
 STATE_FILENAME = "slack_thread_sessions_state.json"
+SHARD_SUFFIXES = {"json": ".json", "msgpack": ".msgpack"}
+MIGRATED_SUFFIX = ".migrated"
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+DEFAULT_CACHE_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_WATCH_INTERVAL_S = 2.0
+
+_SHARD_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+_SESSION_ENCODER = msgspec.json.Encoder()
+_MISSING_SESSION_BYTES = 64
+
+_ThreadKey = tuple[str, str]
+StateFormat = Literal["json", "msgpack"]
+ThreadListener = Callable[[str, str, "ThreadSnapshot | None"], None]
+SettingsListener = Callable[[str, str, dict[str, object]], None]
 
 
 class _ThreadSession(msgspec.Struct, forbid_unknown_fields=False):
@@ -25,6 +50,13 @@ class _ThreadSession(msgspec.Struct, forbid_unknown_fields=False):
     reminder: _ReminderState | None = None
 
 
+class _ThreadSettings(msgspec.Struct, forbid_unknown_fields=False):
+    context: dict[str, str] | None = None
+    model_overrides: dict[str, str] | None = None
+    reasoning_overrides: dict[str, str] | None = None
+    default_engine: str | None = None
+
+
 class _WorktreeRef(msgspec.Struct, forbid_unknown_fields=False):
     project: str
     branch: str
@@ -37,6 +69,12 @@ class _ReminderState(msgspec.Struct, forbid_unknown_fields=False):
 class _ThreadSessionsState(msgspec.Struct, forbid_unknown_fields=False):
     version: int
     threads: dict[str, _ThreadSession] = msgspec.field(default_factory=dict)
+    channel_id: str | None = None
+
+
+_JSON_STATE_DECODER = msgspec.json.Decoder(_ThreadSessionsState)
+_MSGPACK_STATE_DECODER = msgspec.msgpack.Decoder(_ThreadSessionsState)
+_MSGPACK_ENCODER = msgspec.msgpack.Encoder()
 
 
 @dataclass(frozen=True, slots=True)
@@ -50,6 +88,18 @@ class ReminderSnapshot:
     sent_at: float | None
 
 
+@dataclass(frozen=True, slots=True)
+class ThreadPruneResult:
+    removed: int
+    remaining: int
+    bytes_before: int
+    bytes_after: int
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return max(0, self.bytes_before - self.bytes_after)
+
+
 @dataclass(frozen=True, slots=True)
 class ThreadSnapshot:
     channel_id: str
@@ -64,8 +114,34 @@ def resolve_sessions_path(config_path: Path) -> Path:
     return config_path.with_name(STATE_FILENAME)
 
 
-def _thread_key(channel_id: str, thread_id: str) -> str:
-    return f"{channel_id}:{thread_id}"
+def resolve_shards_dir(path: Path) -> Path:
+    return path.with_suffix("")
+
+
+def _shard_filename(channel_id: str, state_format: StateFormat = "json") -> str:
+    suffix = SHARD_SUFFIXES[state_format]
+    if _SHARD_NAME_RE.match(channel_id):
+        return f"{channel_id}{suffix}"
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", channel_id)
+    digest = f"{zlib.crc32(channel_id.encode('utf-8')):08x}"
+    return f"{safe}-{digest}{suffix}"
+
+
+def state_format_for(path: Path) -> StateFormat:
+    return "msgpack" if path.suffix == SHARD_SUFFIXES["msgpack"] else "json"
+
+
+def decode_state(data: bytes, state_format: StateFormat) -> _ThreadSessionsState:
+    if state_format == "msgpack":
+        return _MSGPACK_STATE_DECODER.decode(data)
+    return _JSON_STATE_DECODER.decode(data)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
 
 
 def _split_thread_key(key: str) -> tuple[str, str] | None:
@@ -77,32 +153,403 @@ def _split_thread_key(key: str) -> tuple[str, str] | None:
     return channel_id, thread_id
 
 
-def _new_state() -> _ThreadSessionsState:
-    return _ThreadSessionsState(version=STATE_VERSION, threads={})
+def _new_state(channel_id: str | None = None) -> _ThreadSessionsState:
+    return _ThreadSessionsState(
+        version=STATE_VERSION,
+        threads={},
+        channel_id=channel_id,
+    )
 
 
-class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
-    def __init__(self, path: Path) -> None:
+class _ChannelSessionStore(JsonStateStore[_ThreadSessionsState]):
+    def __init__(
+        self,
+        shards_dir: Path,
+        *,
+        channel_id: str,
+        state_format: StateFormat = "json",
+    ) -> None:
         super().__init__(
-            path,
+            shards_dir / _shard_filename(channel_id, state_format),
             version=STATE_VERSION,
             state_type=_ThreadSessionsState,
-            state_factory=_new_state,
+            state_factory=lambda: _new_state(channel_id),
             log_prefix="slack.thread_sessions",
             logger=logger,
         )
+        self.channel_id = channel_id
+        self.state_format: StateFormat = state_format
+        other_format: StateFormat = "json" if state_format == "msgpack" else "msgpack"
+        self._other_path = shards_dir / _shard_filename(channel_id, other_format)
 
-    @staticmethod
-    def _thread_key(channel_id: str, thread_id: str) -> str:
-        return _thread_key(channel_id, thread_id)
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def other_path(self) -> Path:
+        return self._other_path
+
+    @property
+    def lock(self):
+        return self._lock
+
+    @property
+    def threads(self) -> dict[str, _ThreadSession]:
+        return self._state.threads
 
-    def _get_or_create(self, key: str) -> _ThreadSession:
-        session = self._state.threads.get(key)
+    def get_or_create(self, thread_id: str) -> _ThreadSession:
+        session = self._state.threads.get(thread_id)
         if session is None:
             session = _ThreadSession()
-            self._state.threads[key] = session
+            self._state.threads[thread_id] = session
         return session
 
+    def reload_locked_if_needed(self) -> bool:
+        state = self._state
+        self._reload_locked_if_needed()
+        return self._state is not state
+
+    def changed_on_disk(self) -> bool:
+        if not self._loaded:
+            return False
+        return self._stat_mtime_ns() != self._mtime_ns
+
+    def save_locked(self) -> None:
+        self._state.channel_id = self.channel_id
+        self._save_locked()
+
+    def _load_locked(self) -> None:
+        # Same contract as JsonStateStore._load_locked, but codec-aware and
+        # converting a shard left in the other format on first load.
+        self._loaded = True
+        self._mtime_ns = self._stat_mtime_ns()
+        if self._mtime_ns is None:
+            self._state = _new_state(self.channel_id)
+            if self._other_path.exists():
+                self._convert_other_format()
+            return
+        try:
+            payload = decode_state(self._path.read_bytes(), self.state_format)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "slack.thread_sessions.load_failed",
+                path=str(self._path),
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            self._state = _new_state(self.channel_id)
+            return
+        if payload.version not in COMPATIBLE_STATE_VERSIONS:
+            logger.warning(
+                "slack.thread_sessions.version_mismatch",
+                path=str(self._path),
+                version=payload.version,
+                expected=STATE_VERSION,
+            )
+            self._state = _new_state(self.channel_id)
+            return
+        payload.version = STATE_VERSION
+        self._state = payload
+
+    def _save_locked(self) -> None:
+        if self.state_format == "json":
+            super()._save_locked()
+            return
+        _atomic_write_bytes(self._path, _MSGPACK_ENCODER.encode(self._state))
+        self._mtime_ns = self._stat_mtime_ns()
+
+    def _convert_other_format(self) -> None:
+        source = self._other_path
+        try:
+            payload = decode_state(source.read_bytes(), state_format_for(source))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "slack.thread_sessions.convert_failed",
+                path=str(source),
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return
+        if payload.version not in COMPATIBLE_STATE_VERSIONS:
+            return
+        payload.version = STATE_VERSION
+        self._state = payload
+        self.save_locked()
+        source.replace(source.with_name(source.name + MIGRATED_SUFFIX))
+        logger.info(
+            "slack.thread_sessions.converted",
+            path=str(self._path),
+            source=str(source),
+            threads=len(payload.threads),
+        )
+
+    def stat_size(self) -> int:
+        try:
+            return self._path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+
+class _ThreadSessionCache:
+    # LRU of live session objects (None caches a miss). Entries alias the
+    # shard state, so they must be dropped whenever a shard reloads.
+
+    def __init__(self, *, max_entries: int, max_bytes: int) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._max_bytes = max(0, int(max_bytes))
+        self._entries: OrderedDict[_ThreadKey, tuple[_ThreadSession | None, int]] = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: _ThreadKey) -> tuple[bool, _ThreadSession | None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, key: _ThreadKey, session: _ThreadSession | None) -> None:
+        if self._max_entries == 0:
+            return
+        size = (
+            _MISSING_SESSION_BYTES
+            if session is None
+            else len(_SESSION_ENCODER.encode(session))
+        )
+        self.discard(key)
+        if size > self._max_bytes:
+            return
+        self._entries[key] = (session, size)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def discard(self, key: _ThreadKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def discard_channel(self, channel_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == channel_id]:
+            self.discard(key)
+
+
+class SlackThreadSessionStore:
+    # Threads are sharded into one state file + lock per channel under
+    # resolve_shards_dir(path); shards are loaded on first access.
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        state_format: StateFormat = "json",
+        cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> None:
+        self._path = path
+        self._state_format: StateFormat = state_format
+        self._shards_dir = resolve_shards_dir(path)
+        self._shards: dict[str, _ChannelSessionStore] = {}
+        self._migrated = False
+        self._cache = _ThreadSessionCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+        )
+        self._listeners: list[ThreadListener] = []
+        self._settings_listeners: list[SettingsListener] = []
+
+    def subscribe(self, listener: ThreadListener) -> None:
+        # Called with each thread's new snapshot (None once it is removed)
+        # after a write here, and for every thread of a shard reloaded
+        # because it changed on disk.
+        self._listeners.append(listener)
+
+    def subscribe_settings(self, listener: SettingsListener) -> None:
+        # Called with a thread's context, default engine and overrides
+        # whenever one of them is set here.
+        self._settings_listeners.append(listener)
+
+    def _notify_settings(
+        self, channel_id: str, thread_id: str, session: _ThreadSession
+    ) -> None:
+        if not self._settings_listeners:
+            return
+        settings = msgspec.to_builtins(
+            _ThreadSettings(
+                context=session.context,
+                model_overrides=session.model_overrides,
+                reasoning_overrides=session.reasoning_overrides,
+                default_engine=session.default_engine,
+            )
+        )
+        for listener in self._settings_listeners:
+            listener(channel_id, thread_id, settings)
+
+    def _notify(
+        self, channel_id: str, thread_id: str, session: _ThreadSession | None
+    ) -> None:
+        if not self._listeners:
+            return
+        snapshot = (
+            None
+            if session is None
+            else self._snapshot_from_session(channel_id, thread_id, session)
+        )
+        for listener in self._listeners:
+            listener(channel_id, thread_id, snapshot)
+
+    def _shard(self, channel_id: str) -> _ChannelSessionStore:
+        self._migrate_legacy_if_needed()
+        return self._shard_unmigrated(channel_id)
+
+    def _shard_unmigrated(self, channel_id: str) -> _ChannelSessionStore:
+        shard = self._shards.get(channel_id)
+        if shard is None:
+            shard = _ChannelSessionStore(
+                self._shards_dir,
+                channel_id=channel_id,
+                state_format=self._state_format,
+            )
+            self._shards[channel_id] = shard
+        return shard
+
+    def _all_shards(self) -> list[_ChannelSessionStore]:
+        self._migrate_legacy_if_needed()
+        known: set[str] = set()
+        for shard in self._shards.values():
+            known.update((shard.path.name, shard.other_path.name))
+        try:
+            paths = sorted(
+                path
+                for suffix in SHARD_SUFFIXES.values()
+                for path in self._shards_dir.glob(f"*{suffix}")
+            )
+        except OSError:
+            paths = []
+        for shard_path in paths:
+            if shard_path.name in known:
+                continue
+            channel_id = _read_shard_channel_id(shard_path)
+            if channel_id is not None:
+                self._shard(channel_id)
+        return list(self._shards.values())
+
+    @asynccontextmanager
+    async def _locked(self, channel_id: str) -> AsyncIterator[_ChannelSessionStore]:
+        shard = self._shard(channel_id)
+        async with shard.lock:
+            if shard.reload_locked_if_needed():
+                self._cache.discard_channel(channel_id)
+                for thread_id, session in shard.threads.items():
+                    self._notify(channel_id, thread_id, session)
+            yield shard
+
+    async def _read_session(
+        self, channel_id: str, thread_id: str
+    ) -> _ThreadSession | None:
+        # Hot threads are served from the cache without touching the shard
+        # file; watch_external_changes() drops entries for edited shards.
+        key = (channel_id, thread_id)
+        found, session = self._cache.get(key)
+        if found:
+            return session
+        async with self._locked(channel_id) as shard:
+            session = shard.threads.get(thread_id)
+            self._cache.put(key, session)
+            return session
+
+    def _save_locked(
+        self,
+        shard: _ChannelSessionStore,
+        thread_id: str,
+        session: _ThreadSession | None,
+    ) -> None:
+        shard.save_locked()
+        self._cache.put((shard.channel_id, thread_id), session)
+        self._notify(shard.channel_id, thread_id, session)
+
+    def invalidate_external_changes(self) -> int:
+        return len(self._invalidate_changed_shards())
+
+    def _invalidate_changed_shards(self) -> list[str]:
+        changed: list[str] = []
+        for shard in list(self._shards.values()):
+            if shard.changed_on_disk():
+                self._cache.discard_channel(shard.channel_id)
+                changed.append(shard.channel_id)
+        return changed
+
+    async def watch_external_changes(
+        self, *, interval_s: float = DEFAULT_WATCH_INTERVAL_S
+    ) -> None:
+        while True:
+            await anyio.sleep(interval_s)
+            changed = self._invalidate_changed_shards()
+            if changed:
+                logger.debug(
+                    "slack.thread_sessions.cache_invalidated",
+                    shards=len(changed),
+                )
+            if self._listeners:
+                # Reloading under the lock notifies listeners of the edits.
+                for channel_id in changed:
+                    async with self._locked(channel_id):
+                        pass
+
+    def _migrate_legacy_if_needed(self) -> None:
+        # Split the pre-sharding single state file into per-channel shards once.
+        if self._migrated:
+            return
+        self._migrated = True
+        if not self._path.exists():
+            return
+        try:
+            legacy = msgspec.json.decode(
+                self._path.read_bytes(), type=_ThreadSessionsState
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "slack.thread_sessions.migrate_failed",
+                path=str(self._path),
+                error=str(exc),
+                error_type=exc.__class__.__name__,
+            )
+            return
+        by_channel: dict[str, dict[str, _ThreadSession]] = {}
+        for key, session in legacy.threads.items():
+            parsed = _split_thread_key(key)
+            if parsed is None:
+                continue
+            channel_id, thread_id = parsed
+            by_channel.setdefault(channel_id, {})[thread_id] = session
+        for channel_id, threads in by_channel.items():
+            shard = self._shard_unmigrated(channel_id)
+            shard.reload_locked_if_needed()
+            for thread_id, session in threads.items():
+                shard.threads.setdefault(thread_id, session)
+            shard.save_locked()
+        self._path.replace(self._path.with_name(self._path.name + MIGRATED_SUFFIX))
+        logger.info(
+            "slack.thread_sessions.migrated",
+            path=str(self._path),
+            channels=len(by_channel),
+            threads=sum(len(threads) for threads in by_channel.values()),
+        )
+
     @staticmethod
     def _snapshot_from_session(
         channel_id: str,
@@ -132,26 +579,21 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
     async def get_resume(
         self, *, channel_id: str, thread_id: str, engine: str
     ) -> ResumeToken | None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
-            if session is None:
-                return None
-            value = session.resumes.get(engine)
-            if not value:
-                return None
-            return ResumeToken(engine=engine, value=value)
+        session = await self._read_session(channel_id, thread_id)
+        if session is None:
+            return None
+        value = session.resumes.get(engine)
+        if not value:
+            return None
+        return ResumeToken(engine=engine, value=value)
 
     async def set_resume(
         self, *, channel_id: str, thread_id: str, token: ResumeToken
     ) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._get_or_create(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
             session.resumes[token.engine] = token.value
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
 
     async def record_activity(
         self,
@@ -162,11 +604,9 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
         worktree: WorktreeSnapshot | None,
         clear_worktree: bool,
         now: float,
-    ) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._get_or_create(key)
+    ) -> ThreadSnapshot:
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
             session.last_activity_at = now
             if user_id and not session.owner_user_id:
                 session.owner_user_id = user_id
@@ -182,7 +622,8 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
                 reminder = _ReminderState()
                 session.reminder = reminder
             reminder.sent_at = None
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
+            return self._snapshot_from_session(channel_id, thread_id, session)
 
     async def set_reminder_sent(
         self,
@@ -191,86 +632,105 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
         thread_id: str,
         now: float,
     ) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._get_or_create(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
             reminder = session.reminder
             if reminder is None:
                 reminder = _ReminderState()
                 session.reminder = reminder
             reminder.sent_at = now
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
 
     async def clear_worktree(self, *, channel_id: str, thread_id: str) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.threads.get(thread_id)
             if session is None:
                 return
             session.worktree = None
             session.reminder = None
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
 
     async def get_thread_snapshot(
         self, *, channel_id: str, thread_id: str
     ) -> ThreadSnapshot | None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
-            if session is None:
-                return None
-            return self._snapshot_from_session(channel_id, thread_id, session)
+        session = await self._read_session(channel_id, thread_id)
+        if session is None:
+            return None
+        return self._snapshot_from_session(channel_id, thread_id, session)
 
     async def list_thread_snapshots(self) -> list[ThreadSnapshot]:
-        async with self._lock:
-            self._reload_locked_if_needed()
-            snapshots: list[ThreadSnapshot] = []
-            for key, session in self._state.threads.items():
-                parsed = _split_thread_key(key)
-                if parsed is None:
-                    continue
-                channel_id, thread_id = parsed
-                snapshots.append(
-                    self._snapshot_from_session(channel_id, thread_id, session)
-                )
-            return snapshots
+        snapshots: list[ThreadSnapshot] = []
+        for shard in self._all_shards():
+            async with self._locked(shard.channel_id) as locked:
+                for thread_id, session in locked.threads.items():
+                    snapshots.append(
+                        self._snapshot_from_session(
+                            locked.channel_id, thread_id, session
+                        )
+                    )
+        return snapshots
 
     async def clear_thread(self, *, channel_id: str, thread_id: str) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            if key not in self._state.threads:
+        async with self._locked(channel_id) as shard:
+            if thread_id not in shard.threads:
                 return
-            self._state.threads.pop(key, None)
-            self._save_locked()
+            shard.threads.pop(thread_id, None)
+            self._save_locked(shard, thread_id, None)
+
+    async def prune_threads(self, *, max_idle_s: float, now: float) -> ThreadPruneResult:
+        cutoff = now - max(0.0, max_idle_s)
+        removed = 0
+        remaining = 0
+        bytes_before = 0
+        bytes_after = 0
+        for shard in self._all_shards():
+            async with self._locked(shard.channel_id) as locked:
+                bytes_before += locked.stat_size()
+                changed = False
+                for thread_id, session in list(locked.threads.items()):
+                    if session.worktree is not None:
+                        continue
+                    if session.last_activity_at is None:
+                        # Sessions written before activity tracking start aging now.
+                        session.last_activity_at = now
+                        changed = True
+                        continue
+                    if session.last_activity_at < cutoff:
+                        del locked.threads[thread_id]
+                        self._cache.discard((locked.channel_id, thread_id))
+                        self._notify(locked.channel_id, thread_id, None)
+                        removed += 1
+                        changed = True
+                if changed:
+                    locked.save_locked()
+                remaining += len(locked.threads)
+                bytes_after += locked.stat_size()
+        return ThreadPruneResult(
+            removed=removed,
+            remaining=remaining,
+            bytes_before=bytes_before,
+            bytes_after=bytes_after,
+        )
 
     async def clear_resumes(self, *, channel_id: str, thread_id: str) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.threads.get(thread_id)
             if session is None:
                 return
             session.resumes = {}
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
 
     async def get_context(
         self, *, channel_id: str, thread_id: str
     ) -> RunContext | None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
-            if session is None or session.context is None:
-                return None
-            project = session.context.get("project")
-            if not project:
-                return None
-            branch = session.context.get("branch")
-            return RunContext(project=project, branch=branch)
+        session = await self._read_session(channel_id, thread_id)
+        if session is None or session.context is None:
+            return None
+        project = session.context.get("project")
+        if not project:
+            return None
+        branch = session.context.get("branch")
+        return RunContext(project=project, branch=branch)
 
     async def set_context(
         self,
@@ -279,10 +739,8 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
         thread_id: str,
         context: RunContext | None,
     ) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._get_or_create(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
             if context is None:
                 session.context = None
             else:
@@ -290,39 +748,34 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
                 if context.branch:
                     payload["branch"] = context.branch
                 session.context = payload
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
+            self._notify_settings(shard.channel_id, thread_id, session)
 
     async def get_default_engine(
         self, *, channel_id: str, thread_id: str
     ) -> str | None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
-            if session is None:
-                return None
-            return session.default_engine
+        session = await self._read_session(channel_id, thread_id)
+        if session is None:
+            return None
+        return session.default_engine
 
     async def get_state(
         self, *, channel_id: str, thread_id: str
     ) -> dict[str, object] | None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
-            if session is None:
-                return None
-            return {
-                "context": dict(session.context) if session.context else None,
-                "default_engine": session.default_engine,
-                "model_overrides": dict(session.model_overrides)
-                if session.model_overrides
-                else None,
-                "reasoning_overrides": dict(session.reasoning_overrides)
-                if session.reasoning_overrides
-                else None,
-                "resumes": dict(session.resumes) if session.resumes else None,
-            }
+        session = await self._read_session(channel_id, thread_id)
+        if session is None:
+            return None
+        return {
+            "context": dict(session.context) if session.context else None,
+            "default_engine": session.default_engine,
+            "model_overrides": dict(session.model_overrides)
+            if session.model_overrides
+            else None,
+            "reasoning_overrides": dict(session.reasoning_overrides)
+            if session.reasoning_overrides
+            else None,
+            "resumes": dict(session.resumes) if session.resumes else None,
+        }
 
     async def set_default_engine(
         self,
@@ -331,12 +784,11 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
         thread_id: str,
         engine: str | None,
     ) -> None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._get_or_create(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
             session.default_engine = _normalize_override(engine)
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
+            self._notify_settings(shard.channel_id, thread_id, session)
 
     async def get_model_override(
         self, *, channel_id: str, thread_id: str, engine: str
@@ -398,17 +850,14 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
         engine: str,
         field: str,
     ) -> str | None:
-        key = self._thread_key(channel_id, thread_id)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._state.threads.get(key)
-            if session is None:
-                return None
-            overrides = getattr(session, field)
-            if not isinstance(overrides, dict):
-                return None
-            value = overrides.get(engine)
-            return _normalize_override(value)
+        session = await self._read_session(channel_id, thread_id)
+        if session is None:
+            return None
+        overrides = getattr(session, field)
+        if not isinstance(overrides, dict):
+            return None
+        value = overrides.get(engine)
+        return _normalize_override(value)
 
     async def _set_override(
         self,
@@ -419,11 +868,9 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
         value: str | None,
         field: str,
     ) -> None:
-        key = self._thread_key(channel_id, thread_id)
         normalized = _normalize_override(value)
-        async with self._lock:
-            self._reload_locked_if_needed()
-            session = self._get_or_create(key)
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
             overrides = getattr(session, field)
             if overrides is None or not isinstance(overrides, dict):
                 overrides = {}
@@ -434,7 +881,46 @@ class SlackThreadSessionStore(JsonStateStore[_ThreadSessionsState]):
                     setattr(session, field, None)
             else:
                 overrides[engine] = normalized
-            self._save_locked()
+            self._save_locked(shard, thread_id, session)
+            self._notify_settings(shard.channel_id, thread_id, session)
+
+    async def import_settings(
+        self, *, channel_id: str, thread_id: str, settings: object
+    ) -> bool:
+        # Settings another worker kept for a thread this one takes over;
+        # resume tokens and worktrees are not carried over.
+        try:
+            imported = msgspec.convert(settings, _ThreadSettings)
+        except msgspec.ValidationError as exc:
+            logger.warning(
+                "slack.thread_sessions.settings_invalid",
+                channel_id=channel_id,
+                thread_id=thread_id,
+                error=str(exc),
+            )
+            return False
+        async with self._locked(channel_id) as shard:
+            session = shard.get_or_create(thread_id)
+            session.context = imported.context
+            session.model_overrides = imported.model_overrides
+            session.reasoning_overrides = imported.reasoning_overrides
+            session.default_engine = imported.default_engine
+            self._save_locked(shard, thread_id, session)
+        return True
+
+
+def _read_shard_channel_id(path: Path) -> str | None:
+    try:
+        state = decode_state(path.read_bytes(), state_format_for(path))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "slack.thread_sessions.shard_unreadable",
+            path=str(path),
+            error=str(exc),
+            error_type=exc.__class__.__name__,
+        )
+        return None
+    return state.channel_id
 
 
 def _normalize_override(value: str | None) -> str | None:
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections import Counter
+from types import SimpleNamespace
+
+import anyio
+import pytest
+
+from takopi_slack_plugin import bridge
+from takopi_slack_plugin.bridge import (
+    _bulk_archive_worktrees,
+    _format_bulk_archive_result,
+    _parse_bulk_archive_filters,
+    _select_stale_worktrees,
+)
+from takopi_slack_plugin.thread_sessions import ThreadSnapshot, WorktreeSnapshot
+
+
+def _snapshot(
+    thread_id: str,
+    project: str,
+    *,
+    last_activity_at: float = 0.0,
+    owner: str | None = "U1",
+) -> ThreadSnapshot:
+    return ThreadSnapshot(
+        channel_id="C1",
+        thread_id=thread_id,
+        last_activity_at=last_activity_at,
+        owner_user_id=owner,
+        worktree=WorktreeSnapshot(project=project, branch=f"b{thread_id}"),
+        reminder=None,
+    )
+
+
+class _Store:
+    def __init__(self) -> None:
+        self.cleared: list[str] = []
+
+    async def clear_worktree(self, *, channel_id: str, thread_id: str) -> None:
+        self.cleared.append(thread_id)
+
+
+def _cfg(store: _Store | None = None, *, concurrency: int = 4) -> SimpleNamespace:
+    return SimpleNamespace(
+        thread_store=store,
+        stale_worktree_scheduler=None,
+        stale_worktree_hours=1.0,
+        bulk_archive_concurrency=concurrency,
+    )
+
+
+def test_select_stale_worktrees_filters() -> None:
+    snapshots = [
+        _snapshot("1", "alpha", last_activity_at=0.0),
+        _snapshot("2", "alpha", last_activity_at=3000.0),
+        _snapshot("3", "beta", last_activity_at=0.0, owner="U2"),
+    ]
+    cfg = _cfg()
+    selected = _select_stale_worktrees(cfg, snapshots, now=3600.0)
+    assert [snapshot.thread_id for snapshot in selected] == ["1", "3"]
+    selected = _select_stale_worktrees(cfg, snapshots, now=3600.0, project="BETA")
+    assert [snapshot.thread_id for snapshot in selected] == ["3"]
+    selected = _select_stale_worktrees(cfg, snapshots, now=3600.0, owner_user_id="U1")
+    assert [snapshot.thread_id for snapshot in selected] == ["1"]
+
+
+def test_parse_bulk_archive_filters() -> None:
+    assert _parse_bulk_archive_filters([]) == (None, None)
+    assert _parse_bulk_archive_filters(["project=/alpha", "owner=<@U1|bob>"]) == (
+        "alpha",
+        "U1",
+    )
+    assert _parse_bulk_archive_filters(["alpha"]) is None
+
+
+@pytest.mark.anyio
+async def test_bulk_archive_serializes_per_project(monkeypatch) -> None:
+    active: Counter[str] = Counter()
+    peak_total = 0
+
+    async def fake_delete(cfg, snapshot, *, force_cleanup):
+        nonlocal peak_total
+        project = snapshot.worktree.project
+        assert force_cleanup is False
+        assert active[project] == 0
+        active[project] += 1
+        peak_total = max(peak_total, sum(active.values()))
+        await anyio.sleep(0.01)
+        active[project] -= 1
+        if snapshot.thread_id == "4":
+            return False, "worktree has uncommitted changes."
+        return True, "worktree deleted."
+
+    monkeypatch.setattr(bridge, "_delete_worktree_for_snapshot", fake_delete)
+    store = _Store()
+    snapshots = [
+        _snapshot("1", "alpha"),
+        _snapshot("2", "alpha"),
+        _snapshot("3", "beta"),
+        _snapshot("4", "beta"),
+        _snapshot("5", "gamma"),
+    ]
+    result = await _bulk_archive_worktrees(_cfg(store, concurrency=2), snapshots)
+
+    assert peak_total == 2
+    assert sorted(store.cleared) == ["1", "2", "3", "5"]
+    assert [snapshot.thread_id for snapshot, _ in result.failed] == ["4"]
+    assert _format_bulk_archive_result(result) == (
+        "bulk archive: 4 of 5 stale worktree(s) archived.\n"
+        "• `/beta` `@b4` skipped: worktree has uncommitted changes."
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from functools import partial
 
 import anyio
@@ -121,6 +122,34 @@ async def test_upload_file_uses_files_upload() -> None:
     await client.close()
 
 
+@pytest.mark.anyio
+async def test_json_body_is_encoded_once_for_retries(monkeypatch) -> None:
+    bodies: list[bytes] = []
+
+    async def _sleep(delay: float) -> None:
+        _ = delay
+
+    monkeypatch.setattr("takopi_slack_plugin.client.anyio.sleep", _sleep)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(request.content)
+        assert request.headers["content-type"].startswith("application/json")
+        if len(bodies) == 1:
+            return httpx.Response(429, request=request, headers={"Retry-After": "0"})
+        return httpx.Response(200, request=request, json={"ok": True})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="https://example.com"
+    ) as client:
+        await _request_with_client(
+            client, "POST", "/chat.update", json={"text": "héllo", "blocks": []}
+        )
+
+    assert bodies[0] == bodies[1]
+    assert json.loads(bodies[0]) == {"text": "héllo", "blocks": []}
+
+
 def test_client_methods_build_payloads() -> None:
     class _StubClient(SlackClient):
         def __init__(self) -> None:
@@ -0,0 +1,219 @@
+from pathlib import Path
+
+import anyio
+import pytest
+
+from takopi.api import RunContext
+from takopi_slack_plugin.cluster import (
+    FLEET_KEY,
+    MAX_FORWARD_HOPS,
+    ClusterCoordinator,
+    ClusterStore,
+    HashRing,
+    thread_key,
+)
+from takopi_slack_plugin.thread_sessions import SlackThreadSessionStore
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _InlineStore(ClusterStore):
+    # Same SQLite work, minus the worker thread hop.
+    async def _call(self, fn, *args):
+        return fn(*args)
+
+
+def test_hash_ring_moves_only_departed_nodes_keys() -> None:
+    keys = [thread_key("C1", f"{idx}.0") for idx in range(200)]
+    full = HashRing(["a", "b", "c"])
+    owners = {key: full.owner(key) for key in keys}
+    assert set(owners.values()) == {"a", "b", "c"}
+    assert HashRing(["c", "b", "a"]).owner(keys[0]) == owners[keys[0]]
+
+    reduced = HashRing(["a", "b"])
+    for key in keys:
+        if owners[key] != "c":
+            assert reduced.owner(key) == owners[key]
+    assert HashRing().owner(keys[0]) is None
+
+
+def test_store_leases_expire_and_renew(tmp_path: Path) -> None:
+    store = ClusterStore(tmp_path / "cluster.db")
+    assert store.acquire_sync("k", "a", 0.0, 10.0) == "a"
+    assert store.acquire_sync("k", "b", 5.0, 10.0) == "a"
+    assert store.renew_sync("a", 8.0, 10.0) == {"k"}
+    assert store.acquire_sync("k", "b", 15.0, 10.0) == "a"
+    assert store.holder_sync("k", 17.0) == "a"
+    assert store.holder_sync("k", 18.0) is None
+    assert store.acquire_sync("k", "b", 18.0, 10.0) == "b"
+    assert store.renew_sync("a", 19.0, 10.0) == set()
+    store.release_sync(["k"], "b")
+    assert store.holder_sync("k", 19.0) is None
+    # WAL's shared-memory index does not work across hosts.
+    (mode,) = store._connect().execute("PRAGMA journal_mode").fetchone()
+    assert mode == "delete"
+    store.close()
+
+
+def test_store_inbox_is_fifo_and_adopts_orphans(tmp_path: Path) -> None:
+    store = ClusterStore(tmp_path / "cluster.db")
+    store.push_sync("a", "C1:1", {"n": 1}, 1, 0.0)
+    store.push_sync("a", "C1:2", {"n": 2}, 1, 0.0)
+    store.push_sync("gone", "C1:3", {"n": 3}, 1, 0.0)
+    items = store.peek_sync("a", 10)
+    assert [item.envelope["n"] for item in items] == [1, 2]
+    assert store.peek_sync("a", 10) == items
+    store.ack_sync([item.id for item in items])
+    assert store.peek_sync("a", 10) == []
+
+    assert store.adopt_orphans_sync("a", {"a"}, HashRing(["a"])) == 1
+    (item,) = store.peek_sync("a", 10)
+    assert (item.key, item.hops, item.envelope) == ("C1:3", 1, {"n": 3})
+
+    # A dead worker's copy of a fleet-wide command is dropped, not adopted.
+    store.push_sync("gone", FLEET_KEY, {"n": 4}, MAX_FORWARD_HOPS, 0.0)
+    assert store.adopt_orphans_sync("a", {"a"}, HashRing(["a"])) == 0
+    assert [item.key for item in store.peek_sync("a", 10)] == ["C1:3"]
+    assert store.peek_sync("gone", 10) == []
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_broadcast_reaches_every_other_worker_once(tmp_path: Path) -> None:
+    path = tmp_path / "cluster.db"
+    clock = _Clock()
+    workers = [
+        ClusterCoordinator(_InlineStore(path), worker_id=name, clock=clock)
+        for name in ("a", "b", "c")
+    ]
+    for worker in workers:
+        await worker.start()
+    await workers[0].start()
+
+    assert await workers[0].broadcast({"n": 1}) == 2
+    store = _InlineStore(path)
+    assert store.peek_sync("a", 10) == []
+    for name in ("b", "c"):
+        (item,) = store.peek_sync(name, 10)
+        assert (item.key, item.hops) == (FLEET_KEY, MAX_FORWARD_HOPS)
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_inbox_delivery_survives_a_failing_envelope(tmp_path: Path) -> None:
+    store = _InlineStore(tmp_path / "cluster.db")
+    for n in (1, 2, 3):
+        store.push_sync("a", f"C1:{n}", {"n": n}, 1, 0.0)
+    coordinator = ClusterCoordinator(store, worker_id="a", poll_s=0.01)
+    delivered: list[int] = []
+
+    def deliver(envelope: dict, hops: int) -> None:
+        if envelope["n"] == 2:
+            raise RuntimeError("dispatch bug")
+        delivered.append(envelope["n"])
+
+    with anyio.move_on_after(0.2):
+        await coordinator._run_inbox(deliver)
+
+    assert delivered == [1, 3]
+    assert coordinator.received == 3
+    assert store.peek_sync("a", 10) == []
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_coordinators_agree_on_owner_and_fail_over(tmp_path: Path) -> None:
+    clock = _Clock()
+    path = tmp_path / "cluster.db"
+    workers = {
+        name: ClusterCoordinator(
+            _InlineStore(path),
+            worker_id=name,
+            lease_s=30.0,
+            heartbeat_s=10.0,
+            clock=clock,
+        )
+        for name in ("a", "b")
+    }
+    for worker in workers.values():
+        await worker.start()
+    # The second start saw both workers; refresh the first one's view.
+    await workers["a"].start()
+    assert workers["a"].ring.nodes == {"a", "b"}
+    assert workers["a"].is_leader
+    assert not workers["b"].is_leader
+
+    key = thread_key("C1", "1.0")
+    owner_id = workers["a"].ring.owner(key)
+    assert owner_id is not None
+    other_id = "b" if owner_id == "a" else "a"
+    owner, other = workers[owner_id], workers[other_id]
+
+    assert await other.route(key) == owner_id
+    assert not other.holds(key)
+    assert await owner.route(key) is None
+    assert owner.holds(key)
+
+    # The owner stops heartbeating: its lease lapses and the survivor
+    # takes the thread over.
+    clock.now += 31.0
+    await other.start()
+    assert other.ring.nodes == {other_id}
+    assert other.is_leader
+    assert await other.route(key) is None
+    assert other.holds(key)
+
+    await owner.start()
+    assert not owner.holds(key)
+
+
+@pytest.mark.anyio
+async def test_thread_settings_follow_a_thread_to_its_new_owner(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "cluster.db"
+    old = ClusterCoordinator(_InlineStore(path), worker_id="a")
+    new = ClusterCoordinator(_InlineStore(path), worker_id="b")
+    old_sessions = SlackThreadSessionStore(tmp_path / "a" / "sessions.json")
+    new_sessions = SlackThreadSessionStore(tmp_path / "b" / "sessions.json")
+    old_sessions.subscribe_settings(old.stage_settings)
+    key = thread_key("C1", "1.0")
+
+    # Nothing is shared for a thread this worker does not own.
+    await old_sessions.set_default_engine(
+        channel_id="C1", thread_id="1.0", engine="codex"
+    )
+    await old.close()
+    assert await new.load_settings(key) is None
+
+    assert await old.claim(key) is None
+    await old_sessions.set_context(
+        channel_id="C1",
+        thread_id="1.0",
+        context=RunContext(project="web", branch="fix"),
+    )
+    await old_sessions.set_model_override(
+        channel_id="C1", thread_id="1.0", engine="codex", model="o3"
+    )
+    await old.close()
+
+    settings = await new.load_settings(key)
+    assert settings is not None
+    assert await new_sessions.import_settings(
+        channel_id="C1", thread_id="1.0", settings=settings
+    )
+    state = await new_sessions.get_state(channel_id="C1", thread_id="1.0")
+    assert state is not None
+    assert state["context"] == {"project": "web", "branch": "fix"}
+    assert state["default_engine"] == "codex"
+    assert state["model_overrides"] == {"codex": "o3"}
+    assert state["resumes"] is None
+    assert not await new_sessions.import_settings(
+        channel_id="C1", thread_id="1.0", settings={"context": "web"}
+    )
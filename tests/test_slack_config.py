@@ -135,6 +135,34 @@ def test_from_config_duplicate_action_handlers() -> None:
         SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
 
 
+def test_from_config_action_handler_priority() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+        "action_handlers": [
+            {"id": "deploy", "command": "preview"},
+            {"id": "ask", "command": "ask", "priority": "interactive"},
+        ],
+        "max_batch_runs": 2,
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert [handler.priority for handler in settings.action_handlers] == [
+        "batch",
+        "interactive",
+    ]
+    assert settings.max_batch_runs == 2
+
+    for value in ("urgent", ["batch"], {"lane": "batch"}, 1):
+        cfg["action_handlers"] = [{"id": "x", "command": "x", "priority": value}]
+        with pytest.raises(ConfigError, match="priority"):
+            SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+    cfg["action_handlers"] = [{"id": "x", "command": "x", "priority": " interactive "}]
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.action_handlers[0].priority == "interactive"
+
+
 def test_from_config_action_blocks_file(tmp_path: Path) -> None:
     blocks_path = tmp_path / "blocks.json"
     blocks_path.write_text(
@@ -162,3 +190,222 @@ def test_from_config_invalid_action_blocks() -> None:
     }
     with pytest.raises(ConfigError):
         SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_stale_worktree_project_hours() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+        "stale_worktree_project_hours": {"proj": 48, "other": 2.5},
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.stale_worktree_project_hours == {"proj": 48.0, "other": 2.5}
+
+    cfg["stale_worktree_project_hours"] = {"proj": 0.1}
+    with pytest.raises(ConfigError):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_thread_retention() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.thread_retention_days is None
+
+    cfg["thread_retention_days"] = 30
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.thread_retention_days == 30.0
+
+    cfg["thread_retention_days"] = 0
+    with pytest.raises(ConfigError):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_thread_state_format() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.thread_state_format == "json"
+
+    cfg["thread_state_format"] = "msgpack"
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.thread_state_format == "msgpack"
+
+    cfg["thread_state_format"] = "yaml"
+    with pytest.raises(ConfigError, match="thread_state_format"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_message_overflow_file() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+        "message_overflow": "file",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.message_overflow == "file"
+    assert settings.message_overflow_file_threshold == 12000
+
+    cfg["message_overflow_file_threshold"] = 100
+    with pytest.raises(ConfigError, match="message_overflow_file_threshold"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_thread_message_policy() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.thread_message_policy == "queue"
+
+    cfg["thread_message_policy"] = "coalesce"
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.thread_message_policy == "coalesce"
+
+    cfg["thread_message_policy"] = "parallel"
+    with pytest.raises(ConfigError, match="thread_message_policy"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_run_limits() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.max_concurrent_runs is None
+    assert settings.max_runs_per_user is None
+
+    cfg.update(max_concurrent_runs=4, max_runs_per_user=1, max_runs_per_project=2)
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.max_concurrent_runs == 4
+    assert settings.max_runs_per_user == 1
+    assert settings.max_runs_per_project == 2
+
+    cfg["max_runs_per_user"] = 0
+    with pytest.raises(ConfigError, match="max_runs_per_user"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_git_runner_settings() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.git_timeout_s == 120.0
+    assert settings.git_max_concurrent == 4
+
+    cfg.update(git_timeout_s=30, git_max_concurrent=2)
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.git_timeout_s == 30.0
+    assert settings.git_max_concurrent == 2
+
+    cfg["git_max_concurrent"] = 0
+    with pytest.raises(ConfigError, match="git_max_concurrent"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_socket_connections() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.socket_connections == 1
+
+    cfg["socket_connections"] = 3
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.socket_connections == 3
+
+    for value in (0, 6, 2.5, True):
+        cfg["socket_connections"] = value
+        with pytest.raises(ConfigError, match="socket_connections"):
+            SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_event_dedupe_settings() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.event_dedupe_ttl_s == 600.0
+    assert settings.event_dedupe_persist is False
+
+    cfg.update(event_dedupe_ttl_s=120, event_dedupe_persist=True)
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.event_dedupe_ttl_s == 120.0
+    assert settings.event_dedupe_persist is True
+
+    cfg["event_dedupe_persist"] = "yes"
+    with pytest.raises(ConfigError, match="event_dedupe_persist"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_channels() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+        "channels": [
+            {"channel_id": "C2", "project": "alpha", "engine": "codex"},
+            {
+                "channel_id": "C3",
+                "files": {"enabled": True},
+                "outbox_interval_s": 1,
+            },
+        ],
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    first, second = settings.channels
+    assert (first.channel_id, first.project, first.engine) == ("C2", "alpha", "codex")
+    assert first.files is None
+    assert first.outbox_interval_s is None
+    assert second.files is not None and second.files.enabled
+    assert second.outbox_interval_s == 1.0
+
+    cfg["channels"] = [{"channel_id": "C2"}, {"channel_id": "C2"}]
+    with pytest.raises(ConfigError, match="duplicate channel_id"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+    cfg["channels"] = [{"channel_id": "C2", "model": "x"}]
+    with pytest.raises(ConfigError, match="unknown keys: model"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+
+
+def test_from_config_cluster_settings() -> None:
+    cfg = {
+        "bot_token": "xoxb-1",
+        "channel_id": "C123",
+        "app_token": "xapp-1",
+    }
+    settings = SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
+    assert settings.cluster_state_path is None
+
+    cfg.update(cluster_state_path="shared/cluster.db", cluster_worker_id="w1")
+    settings = SlackTransportSettings.from_config(
+        cfg, config_path=Path("/etc/takopi/takopi.toml")
+    )
+    assert settings.cluster_state_path == Path("/etc/takopi/shared/cluster.db")
+    assert settings.cluster_worker_id == "w1"
+    assert settings.cluster_heartbeat_s == 10.0
+    assert settings.cluster_lease_s == 60.0
+
+    cfg.update(cluster_heartbeat_s=30, cluster_lease_s=60)
+    with pytest.raises(ConfigError, match="cluster_lease_s"):
+        SlackTransportSettings.from_config(cfg, config_path=Path("/tmp/x"))
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from takopi_slack_plugin import bridge
+from takopi_slack_plugin.disk_usage import DiskUsageScanner
+from takopi_slack_plugin.thread_sessions import (
+    ReminderSnapshot,
+    ThreadSnapshot,
+    WorktreeSnapshot,
+)
+
+
+def _write(path: Path, size: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+
+
+def test_scanner_measures_tree_without_following_symlinks(tmp_path: Path) -> None:
+    root = tmp_path / "wt"
+    _write(root / "a.bin", 10_000)
+    _write(root / "node_modules" / "pkg" / "b.bin", 50_000)
+    outside = tmp_path / "outside"
+    _write(outside / "big.bin", 500_000)
+    (root / "link").symlink_to(outside, target_is_directory=True)
+
+    scanner = DiskUsageScanner()
+    size = scanner.measure(root)
+    assert 60_000 <= size < 200_000
+    assert scanner.last_size(root) == size
+
+
+def test_scanner_reuses_unchanged_directories(tmp_path: Path, monkeypatch) -> None:
+    root = tmp_path / "wt"
+    _write(root / "src" / "a.bin", 8192)
+    _write(root / "build" / "b.bin", 8192)
+    scanner = DiskUsageScanner()
+    first = scanner.measure(root)
+
+    listed: list[str] = []
+    original = DiskUsageScanner._list_dir
+
+    def tracking(self, path, mtime_ns):
+        listed.append(path)
+        return original(self, path, mtime_ns)
+
+    monkeypatch.setattr(DiskUsageScanner, "_list_dir", tracking)
+    assert scanner.measure(root) == first
+    assert listed == []
+
+    _write(root / "build" / "c.bin", 65536)
+    assert scanner.measure(root) > first
+    assert listed == [str(root / "build")]
+
+    scanner.retain(set())
+    assert scanner.last_size(root) is None
+
+
+def _snapshot(thread_id: str, *, last_activity_at: float, reminded: bool = False):
+    return ThreadSnapshot(
+        channel_id="C1",
+        thread_id=thread_id,
+        last_activity_at=last_activity_at,
+        owner_user_id=None,
+        worktree=WorktreeSnapshot(project="p", branch=thread_id),
+        reminder=ReminderSnapshot(sent_at=last_activity_at + 1) if reminded else None,
+    )
+
+
+@pytest.mark.anyio
+async def test_disk_pressure_reminds_largest_idle_worktrees(
+    tmp_path: Path, monkeypatch
+) -> None:
+    sent: list[str] = []
+
+    async def fake_send(cfg, snapshot, *, now, disk_pressure=False):
+        assert disk_pressure is True
+        sent.append(snapshot.thread_id)
+
+    monkeypatch.setattr(bridge, "_send_stale_worktree_reminder", fake_send)
+    monkeypatch.setattr(
+        bridge.shutil, "disk_usage", lambda path: SimpleNamespace(free=10)
+    )
+    now = 100_000.0
+    measured = [
+        (_snapshot("small", last_activity_at=0.0), tmp_path, 10),
+        (_snapshot("large", last_activity_at=0.0), tmp_path, 900),
+        (_snapshot("active", last_activity_at=now - 60), tmp_path, 5000),
+        (_snapshot("reminded", last_activity_at=0.0, reminded=True), tmp_path, 800),
+        (_snapshot("medium", last_activity_at=0.0), tmp_path, 500),
+    ]
+    cfg = SimpleNamespace(disk_pressure_free_bytes=100, disk_pressure_reminders=2)
+    await bridge._remind_under_disk_pressure(cfg, measured, now=now)
+    assert sent == ["large", "medium"]
+
+    sent.clear()
+    cfg.disk_pressure_free_bytes = 5
+    await bridge._remind_under_disk_pressure(cfg, measured, now=now)
+    assert sent == []
+
+
+@pytest.mark.anyio
+async def test_disk_scan_counts_shared_worktrees_once(
+    tmp_path: Path, monkeypatch
+) -> None:
+    sent: list[str] = []
+    scanned: list[Path] = []
+
+    async def fake_send(cfg, snapshot, *, now, disk_pressure=False):
+        sent.append(snapshot.thread_id)
+
+    class _Scanner:
+        async def scan(self, path: Path) -> int:
+            scanned.append(path)
+            return 100
+
+        def retain(self, paths) -> None:
+            pass
+
+    class _Store:
+        async def list_thread_snapshots(self):
+            return snapshots
+
+    def snapshot(thread_id: str, branch: str, last_activity_at: float):
+        return ThreadSnapshot(
+            channel_id="C1",
+            thread_id=thread_id,
+            last_activity_at=last_activity_at,
+            owner_user_id=None,
+            worktree=WorktreeSnapshot(project="p", branch=branch),
+            reminder=None,
+        )
+
+    snapshots = [
+        snapshot("t1", "feat", 0.0),
+        snapshot("t2", "feat", 10.0),
+        snapshot("t3", "feat", 5.0),
+        snapshot("t4", "fix", 0.0),
+    ]
+    monkeypatch.setattr(bridge, "_send_stale_worktree_reminder", fake_send)
+    monkeypatch.setattr(
+        bridge,
+        "_resolve_worktree_path",
+        lambda cfg, *, project, branch: tmp_path / branch,
+    )
+    monkeypatch.setattr(
+        bridge.shutil, "disk_usage", lambda path: SimpleNamespace(free=10)
+    )
+    (tmp_path / "feat").mkdir()
+    (tmp_path / "fix").mkdir()
+    cfg = SimpleNamespace(
+        disk_usage=_Scanner(),
+        thread_store=_Store(),
+        disk_pressure_free_bytes=100,
+        disk_pressure_reminders=5,
+    )
+    measured = await bridge._scan_worktree_disk_usage(cfg, now=100_000.0)
+
+    assert sorted(scanned) == [tmp_path / "feat", tmp_path / "fix"]
+    assert sorted(item[0].thread_id for item in measured) == ["t2", "t4"]
+    assert sorted(sent) == ["t2", "t4"]
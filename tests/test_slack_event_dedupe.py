@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from takopi_slack_plugin.event_dedupe import EventDedupeCache, event_keys
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_event_keys_cover_event_id_and_message_ts() -> None:
+    event = {"type": "app_mention", "ts": "1.5"}
+    assert event_keys("C1", event, "Ev1") == ["event:Ev1", "ts:C1:1.5"]
+    assert event_keys("C1", {}, None) == []
+
+
+def test_dedupe_matches_same_message_across_event_types() -> None:
+    cache = EventDedupeCache(clock=_Clock())
+    assert not cache.check(event_keys("C1", {"ts": "1.5"}, "Ev1"))
+    # The `message` twin of an `app_mention` has its own event id.
+    assert cache.check(event_keys("C1", {"ts": "1.5"}, "Ev2"))
+    assert not cache.check(event_keys("C1", {"ts": "2.5"}, "Ev3"))
+    stats = cache.stats()
+    assert stats.checked == 3
+    assert stats.duplicates == 1
+
+
+def test_dedupe_entries_expire_and_are_bounded() -> None:
+    clock = _Clock()
+    cache = EventDedupeCache(ttl_s=60.0, max_entries=2, clock=clock)
+    assert not cache.check(["a"])
+    clock.now += 61
+    assert not cache.check(["a"])
+    assert not cache.check(["b"])
+    assert not cache.check(["c"])
+    assert len(cache) == 2
+    assert not cache.check(["a"])
+    stats = cache.stats()
+    assert stats.expired == 1
+    assert stats.evicted == 2
+
+
+def test_dedupe_persists_unexpired_entries(tmp_path: Path) -> None:
+    clock = _Clock()
+    path = tmp_path / "dedupe.json"
+    cache = EventDedupeCache(ttl_s=60.0, path=path, clock=clock)
+    cache.check(["old"])
+    clock.now += 30
+    cache.check(["new"])
+    cache.save()
+
+    clock.now += 40
+    reloaded = EventDedupeCache(ttl_s=60.0, path=path, clock=clock)
+    reloaded.load()
+    assert len(reloaded) == 1
+    assert reloaded.check(["new"])
+    assert not reloaded.check(["old"])
+
+
+def test_dedupe_ignores_corrupt_state(tmp_path: Path) -> None:
+    path = tmp_path / "dedupe.json"
+    path.write_text("{not json")
+    cache = EventDedupeCache(path=path, clock=_Clock())
+    cache.load()
+    assert len(cache) == 0
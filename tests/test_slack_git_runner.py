@@ -0,0 +1,104 @@
+import shutil
+import sys
+from pathlib import Path
+
+import anyio
+import pytest
+
+from takopi_slack_plugin.git_runner import (
+    TIMEOUT_RETURNCODE,
+    GitRunner,
+    parse_worktree_status,
+)
+
+
+@pytest.mark.anyio
+async def test_git_runner_captures_output(tmp_path: Path) -> None:
+    runner = GitRunner()
+    result = await runner.run(
+        [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"],
+        cwd=tmp_path,
+    )
+    assert result.ok
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+    assert result.truncated is False
+
+
+@pytest.mark.anyio
+async def test_git_runner_caps_output_and_reports_failure(tmp_path: Path) -> None:
+    runner = GitRunner(max_output_bytes=10)
+    result = await runner.run(
+        [sys.executable, "-c", "import sys; print('x' * 5000); sys.exit(3)"],
+        cwd=tmp_path,
+    )
+    assert result.returncode == 3
+    assert result.stdout == "x" * 10
+    assert result.truncated is True
+    assert result.details == "x" * 10
+
+
+@pytest.mark.anyio
+async def test_git_runner_kills_process_on_timeout(tmp_path: Path) -> None:
+    runner = GitRunner(timeout_s=0.2)
+    with anyio.fail_after(5):
+        result = await runner.run(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            cwd=tmp_path,
+        )
+    assert result.timed_out is True
+    assert result.returncode == TIMEOUT_RETURNCODE
+    assert "timed out" in result.details
+
+
+@pytest.mark.anyio
+async def test_git_runner_missing_binary(tmp_path: Path) -> None:
+    result = await GitRunner().run(["definitely-not-git-xyz"], cwd=tmp_path)
+    assert result.returncode == 127
+    assert result.details
+
+
+def test_parse_worktree_status() -> None:
+    status = parse_worktree_status(
+        "# branch.oid 1234abcd\n"
+        "# branch.head feature/x\n"
+        "# branch.upstream origin/feature/x\n"
+        "# branch.ab +2 -1\n"
+        "1 .M N... 100644 100644 100644 aaa bbb src/a.py\n"
+        "2 R. N... 100644 100644 100644 aaa bbb R100 new.py\told.py\n"
+        "? notes.txt\n"
+    )
+    assert status.head == "1234abcd"
+    assert status.branch == "feature/x"
+    assert (status.ahead, status.behind) == (2, 1)
+    assert (status.changed, status.untracked) == (2, 1)
+    assert status.dirty is True
+    assert status.summary() == (
+        "`feature/x`, 2 changed, 1 untracked, "
+        "2 ahead / 1 behind `origin/feature/x`"
+    )
+
+    detached = parse_worktree_status("# branch.oid (initial)\n# branch.head (detached)\n")
+    assert detached.head is None
+    assert detached.detached is True
+    assert detached.dirty is False
+    assert detached.summary() == "detached HEAD, clean, no upstream"
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+async def test_git_runner_worktree_status(tmp_path: Path) -> None:
+    runner = GitRunner()
+    result = await runner.run(["git", "init", "-q", "-b", "topic", str(tmp_path)], cwd=tmp_path)
+    assert result.ok, result.details
+    (tmp_path / "new.txt").write_text("hi", encoding="utf-8")
+
+    status, result = await runner.worktree_status(tmp_path)
+    assert status is not None, result.details
+    assert status.branch == "topic"
+    assert status.untracked == 1
+    assert status.upstream is None
+
+    status, result = await runner.worktree_status(tmp_path / "missing")
+    assert status is None
+    assert not result.ok
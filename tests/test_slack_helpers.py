@@ -1,20 +1,35 @@
 from __future__ import annotations
 
 import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
 
 from takopi.api import RunContext
 from takopi_slack_plugin.bridge import (
+    SlackBridgeConfig,
+    _BotMentionStripper,
+    _build_channel_routes,
+    _coalesce_thread_messages,
     _coerce_socket_payload,
+    _envelope_thread_key,
+    _is_fleet_command,
     _extract_command_text,
     _extract_inline_command,
     _extract_slash_payload_command,
     _format_context_directive,
+    _format_status,
+    _handle_config_reload,
     _parse_thread_ts,
     _should_skip_message,
     _strip_bot_mention,
     split_command_args,
 )
 from takopi_slack_plugin.client import SlackMessage
+from takopi_slack_plugin.commands.registry import CommandRegistry
+from takopi_slack_plugin.config import SlackChannelSettings, SlackFilesSettings
+from takopi_slack_plugin.git_runner import WorktreeStatus
 
 
 def test_split_command_args_quoted() -> None:
@@ -72,6 +87,16 @@ def test_strip_bot_mention() -> None:
     )
 
 
+def test_bot_mention_stripper_reused() -> None:
+    stripper = _BotMentionStripper(bot_user_id="U123", bot_name="Takopi")
+    assert stripper.strip("<@U123|takopi> fix it *@takopi*") == "fix it"
+    assert stripper.strip("takopi, takopi ship") == "ship"
+    assert stripper.strip("ask <@U999> and takopi later") == (
+        "ask <@U999> and takopi later"
+    )
+    assert _BotMentionStripper(bot_user_id=None, bot_name=None).strip(" hi ") == "hi"
+
+
 def test_coerce_socket_payload() -> None:
     payload = {"type": "event"}
     assert _coerce_socket_payload(payload) == payload
@@ -136,3 +161,181 @@ def test_should_skip_message() -> None:
         ),
         bot_user_id="U1",
     )
+
+
+def test_command_registry_caches_per_allowlist() -> None:
+    calls: list[object] = []
+
+    def loader(group, *, allowlist, reserved_ids):
+        calls.append(allowlist)
+        return ["preview", "Pr", "too-long-" + "x" * 40]
+
+    registry = CommandRegistry(loader=loader)
+    first = registry.resolve({"preview", "pr"})
+    assert registry.resolve({"pr", "preview"}) is first
+    assert len(calls) == 1
+    assert first.ids == {"preview", "pr", "too-long-" + "x" * 40}
+
+    prompt = "try /pr 12 or /preview start"
+    assert _extract_inline_command(
+        prompt, allowed_commands=first.ids, pattern=first.pattern
+    ) == ("pr", "12 or /preview start", "/pr 12 or /preview start")
+    assert (
+        _extract_inline_command(
+            "/previews now", allowed_commands=first.ids, pattern=first.pattern
+        )
+        is None
+    )
+
+    registry.resolve(None)
+    registry.refresh()
+    registry.resolve(None)
+    assert calls == [frozenset({"preview", "pr"}), None, None]
+
+
+@pytest.mark.anyio
+async def test_config_reload_picks_up_new_commands(tmp_path: Path) -> None:
+    installed = ["preview"]
+
+    def loader(group, *, allowlist, reserved_ids):
+        return list(installed)
+
+    registry = CommandRegistry(loader=loader)
+    cfg = SimpleNamespace(
+        command_registry=registry,
+        runtime=SimpleNamespace(allowlist=None),
+    )
+    assert registry.resolve(None).ids == {"preview"}
+
+    installed.append("deploy")
+    assert registry.resolve(None).ids == {"preview"}
+    await _handle_config_reload(
+        cfg, SimpleNamespace(config_path=tmp_path / "takopi.toml")
+    )
+    commands = registry.resolve(None)
+    assert commands.ids == {"preview", "deploy"}
+    assert _extract_inline_command(
+        "/deploy now", allowed_commands=commands.ids, pattern=commands.pattern
+    ) == ("deploy", "now", "/deploy now")
+
+
+def test_coalesce_thread_messages() -> None:
+    first = SlackMessage(
+        ts="1.1",
+        text="<@U1> fix tests",
+        user="U2",
+        bot_id=None,
+        subtype=None,
+        thread_ts="1.0",
+        files=[{"id": "F1"}],
+    )
+    second = SlackMessage(
+        ts="1.2",
+        text="and lint",
+        user="U2",
+        bot_id=None,
+        subtype=None,
+        thread_ts="1.0",
+    )
+    message, text = _coalesce_thread_messages(
+        (first, "fix tests"), (second, "and lint")
+    )
+    assert text == "fix tests\n\nand lint"
+    assert message.ts == "1.2"
+    assert message.text == "<@U1> fix tests\n\nand lint"
+    assert message.files == [{"id": "F1"}]
+
+    other = SlackMessage(
+        ts="1.3",
+        text="ship it",
+        user="U3",
+        bot_id=None,
+        subtype=None,
+        thread_ts="1.0",
+    )
+    assert _coalesce_thread_messages((second, "and lint"), (other, "ship it")) is None
+
+
+def test_format_status_includes_worktree_status() -> None:
+    state = {"context": {"project": "takopi", "branch": "feat"}}
+    status = WorktreeStatus(
+        head="abc", branch="feat", upstream="origin/feat", ahead=1, changed=3
+    )
+    assert _format_status(state, worktree_status=status) == (
+        "context: `takopi` `@feat`\n"
+        "worktree: `feat`, 3 changed, 0 untracked, 1 ahead / 0 behind `origin/feat`"
+    )
+
+
+def test_build_channel_routes_applies_channel_defaults() -> None:
+    shared_files = SlackFilesSettings(enabled=True)
+    own_files = SlackFilesSettings(enabled=False)
+    cfg = SlackBridgeConfig(
+        client=SimpleNamespace(),
+        runtime=SimpleNamespace(),
+        channel_id="C1",
+        app_token="xapp-1",
+        startup_msg="",
+        exec_cfg=SimpleNamespace(),
+        files=shared_files,
+        channels=(
+            SlackChannelSettings(channel_id="C2", project="alpha", engine="codex"),
+            SlackChannelSettings(channel_id="C3", files=own_files),
+        ),
+    )
+    routes = _build_channel_routes(cfg)
+    assert set(routes) == {"C1", "C2", "C3"}
+    assert routes["C1"] is cfg
+    assert routes["C2"].channel_id == "C2"
+    assert routes["C2"].default_project == "alpha"
+    assert routes["C2"].default_engine == "codex"
+    assert routes["C2"].files is shared_files
+    assert routes["C3"].files is own_files
+    assert routes["C3"].default_project is None
+    assert routes["C3"].repo_locks is cfg.repo_locks
+
+
+def test_envelope_thread_key_for_routable_envelopes() -> None:
+    channels = {"C1"}
+    reply = {
+        "type": "events_api",
+        "payload": {"event": {"channel": "C1", "ts": "2.0", "thread_ts": "1.0"}},
+    }
+    assert _envelope_thread_key(reply, channels) == "C1:1.0"
+    top_level = {
+        "type": "events_api",
+        "payload": {"event": {"channel": "C1", "ts": "3.0"}},
+    }
+    assert _envelope_thread_key(top_level, channels) == "C1:3.0"
+    button = {
+        "type": "interactive",
+        "payload": {
+            "type": "block_actions",
+            "channel": {"id": "C1"},
+            "message": {"ts": "5.0", "thread_ts": "1.0"},
+        },
+    }
+    assert _envelope_thread_key(button, channels) == "C1:1.0"
+    slash = {"type": "slash_commands", "payload": {"channel_id": "C1"}}
+    assert _envelope_thread_key(slash, channels) == "C1:C1"
+    other = {
+        "type": "events_api",
+        "payload": {"event": {"channel": "C9", "ts": "3.0"}},
+    }
+    assert _envelope_thread_key(other, channels) is None
+
+
+def test_fleet_commands_are_thread_maintenance_only() -> None:
+    def slash(text: str, command: str = "/takopi") -> dict:
+        return {
+            "type": "slash_commands",
+            "payload": {"channel_id": "C1", "command": command, "text": text},
+        }
+
+    channels = {"C1"}
+    assert _is_fleet_command(slash("prune 7"), channels)
+    assert _is_fleet_command(slash("archive stale project=web"), channels)
+    assert _is_fleet_command(slash("", command="/takopi-prune"), channels)
+    assert not _is_fleet_command(slash("archive"), channels)
+    assert not _is_fleet_command(slash("status"), channels)
+    assert not _is_fleet_command(slash("prune"), {"C2"})
@@ -0,0 +1,95 @@
+import anyio
+import pytest
+
+from takopi_slack_plugin.mailbox import ThreadMailbox
+
+
+@pytest.mark.anyio
+async def test_mailbox_serializes_per_thread() -> None:
+    mailbox: ThreadMailbox[str] = ThreadMailbox()
+    events: list[str] = []
+    release = anyio.Event()
+
+    async def handler(item: str) -> None:
+        events.append(f"start {item}")
+        if item == "a1":
+            await release.wait()
+        events.append(f"end {item}")
+
+    async with anyio.create_task_group() as tg:
+        mailbox.submit(tg, "A", "a1", handler)
+        mailbox.submit(tg, "A", "a2", handler)
+        mailbox.submit(tg, "B", "b1", handler)
+        await anyio.wait_all_tasks_blocked()
+        assert mailbox.is_busy("A")
+        assert mailbox.pending_count("A") == 1
+        assert sorted(events) == ["end b1", "start a1", "start b1"]
+        release.set()
+
+    assert events[3:] == ["end a1", "start a2", "end a2"]
+    assert len(mailbox) == 0
+
+
+@pytest.mark.anyio
+async def test_mailbox_coalesces_queued_items() -> None:
+    mailbox: ThreadMailbox[str] = ThreadMailbox(
+        coalesce=lambda queued, incoming: f"{queued}+{incoming}"
+    )
+    handled: list[str] = []
+    release = anyio.Event()
+
+    async def handler(item: str) -> None:
+        handled.append(item)
+        if item == "1":
+            await release.wait()
+
+    async with anyio.create_task_group() as tg:
+        mailbox.submit(tg, "T", "1", handler)
+        await anyio.wait_all_tasks_blocked()
+        mailbox.submit(tg, "T", "2", handler)
+        mailbox.submit(tg, "T", "3", handler)
+        mailbox.submit(tg, "T", "4", handler)
+        release.set()
+
+    assert handled == ["1", "2+3+4"]
+
+
+@pytest.mark.anyio
+async def test_mailbox_keeps_items_the_coalesce_declines() -> None:
+    mailbox: ThreadMailbox[str] = ThreadMailbox(
+        coalesce=lambda queued, incoming: (
+            f"{queued}+{incoming}" if queued[0] == incoming[0] else None
+        )
+    )
+    handled: list[str] = []
+    release = anyio.Event()
+
+    async def handler(item: str) -> None:
+        handled.append(item)
+        if item == "a1":
+            await release.wait()
+
+    async with anyio.create_task_group() as tg:
+        mailbox.submit(tg, "T", "a1", handler)
+        await anyio.wait_all_tasks_blocked()
+        for item in ("a2", "a3", "b1", "b2", "a4"):
+            mailbox.submit(tg, "T", item, handler)
+        assert mailbox.pending_count("T") == 3
+        release.set()
+
+    assert handled == ["a1", "a2+a3", "b1+b2", "a4"]
+
+
+@pytest.mark.anyio
+async def test_mailbox_rejects_when_full() -> None:
+    mailbox: ThreadMailbox[int] = ThreadMailbox(max_pending=1)
+    release = anyio.Event()
+
+    async def handler(item: int) -> None:
+        await release.wait()
+
+    async with anyio.create_task_group() as tg:
+        assert mailbox.submit(tg, "T", 1, handler)
+        assert mailbox.submit(tg, "T", 2, handler)
+        assert not mailbox.submit(tg, "T", 3, handler)
+        release.set()
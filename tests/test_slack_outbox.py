@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import anyio
 import pytest
 
 from takopi_slack_plugin.outbox import (
@@ -142,3 +143,83 @@ async def test_outbox_replaces_pending_without_worker() -> None:
     assert op1.done.is_set()
     assert op1.result is None
     assert op2.queued_at == 1.0
+
+
+@pytest.mark.anyio
+async def test_outbox_rate_limits_each_channel_separately() -> None:
+    clock = _Clock()
+    calls: list[tuple[str, float]] = []
+
+    async def exec_label(label: str) -> str:
+        calls.append((label, clock.now))
+        return label
+
+    class _DeferredOutbox(SlackOutbox):
+        async def ensure_worker(self) -> None:
+            return None
+
+    outbox = _DeferredOutbox(
+        interval_for_channel=lambda _: 1.0,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    ops = [
+        OutboxOp(
+            execute=lambda label=label: exec_label(label),
+            priority=SEND_PRIORITY,
+            queued_at=float(idx),
+            channel_id=channel_id,
+        )
+        for idx, (label, channel_id) in enumerate(
+            (("c1-a", "C1"), ("c1-b", "C1"), ("c2-a", "C2"))
+        )
+    ]
+    for idx, op in enumerate(ops):
+        await outbox.enqueue(key=idx, op=op, wait=False)
+
+    await SlackOutbox.ensure_worker(outbox)
+    for op in ops:
+        await op.done.wait()
+
+    # C1's second send waits for its lane; C2 does not wait behind it.
+    assert calls == [("c1-a", 0.0), ("c2-a", 0.0), ("c1-b", 1.0)]
+    await outbox.close()
+
+
+@pytest.mark.anyio
+async def test_outbox_enqueue_wakes_worker_for_ready_channel() -> None:
+    clock = _Clock()
+    calls: list[str] = []
+
+    async def exec_label(label: str) -> str:
+        calls.append(label)
+        return label
+
+    async def never_wake(delay: float) -> None:
+        await anyio.sleep_forever()
+
+    outbox = SlackOutbox(
+        interval_for_channel=lambda _: 10.0,
+        clock=clock,
+        sleep=never_wake,
+    )
+
+    def op(label: str, channel_id: str, queued_at: float) -> OutboxOp:
+        return OutboxOp(
+            execute=lambda: exec_label(label),
+            priority=SEND_PRIORITY,
+            queued_at=queued_at,
+            channel_id=channel_id,
+        )
+
+    with anyio.fail_after(2):
+        await outbox.enqueue(key=1, op=op("c1-a", "C1", 0.0))
+        waiting = op("c1-b", "C1", 1.0)
+        await outbox.enqueue(key=2, op=waiting, wait=False)
+        await anyio.wait_all_tasks_blocked()
+        # The worker is parked until C1's lane opens; C2 is ready now.
+        assert await outbox.enqueue(key=3, op=op("c2-a", "C2", 2.0)) == "c2-a"
+        await outbox.close()
+
+    assert calls == ["c1-a", "c2-a"]
+    assert waiting.done.is_set() and waiting.result is None
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+
+from takopi_slack_plugin.reminders import StaleWorktreeScheduler
+from takopi_slack_plugin.thread_sessions import (
+    ReminderSnapshot,
+    ThreadSnapshot,
+    WorktreeSnapshot,
+)
+
+
+def _snapshot(
+    thread_id: str,
+    *,
+    project: str = "proj",
+    last_activity_at: float | None = 0.0,
+    reminder_sent_at: float | None = None,
+) -> ThreadSnapshot:
+    return ThreadSnapshot(
+        channel_id="C1",
+        thread_id=thread_id,
+        last_activity_at=last_activity_at,
+        owner_user_id="U1",
+        worktree=WorktreeSnapshot(project=project, branch="feat"),
+        reminder=ReminderSnapshot(sent_at=reminder_sent_at),
+    )
+
+
+def test_scheduler_orders_deadlines_with_project_hours() -> None:
+    scheduler = StaleWorktreeScheduler(stale_hours=2, project_hours={"Fast": 1})
+    scheduler.schedule(_snapshot("T1", project="slow"))
+    scheduler.schedule(_snapshot("T2", project="fast"))
+
+    assert scheduler.next_deadline() == 3600.0
+    assert scheduler.pop_due(3600.0) == [("C1", "T2")]
+    assert scheduler.pop_due(7199.0) == []
+    assert scheduler.pop_due(7200.0) == [("C1", "T1")]
+    assert len(scheduler) == 0
+
+
+def test_scheduler_reschedules_on_activity() -> None:
+    scheduler = StaleWorktreeScheduler(stale_hours=1)
+    scheduler.schedule(_snapshot("T1", last_activity_at=0.0))
+    scheduler.schedule(_snapshot("T1", last_activity_at=1800.0))
+
+    assert scheduler.pop_due(3600.0) == []
+    assert scheduler.next_deadline() == 5400.0
+    assert scheduler.pop_due(5400.0) == [("C1", "T1")]
+
+
+def test_scheduler_skips_reminded_and_discarded_threads() -> None:
+    scheduler = StaleWorktreeScheduler(stale_hours=1)
+    scheduler.schedule(_snapshot("T1", last_activity_at=0.0, reminder_sent_at=10.0))
+    scheduler.schedule(_snapshot("T2"))
+    scheduler.discard(channel_id="C1", thread_id="T2")
+
+    assert scheduler.next_deadline() is None
+    assert scheduler.pop_due(10_000.0) == []
+
+
+@pytest.mark.anyio
+async def test_scheduler_wait_returns_at_deadline() -> None:
+    now = 0.0
+    scheduler = StaleWorktreeScheduler(stale_hours=1, clock=lambda: now)
+    scheduler.schedule(_snapshot("T1", last_activity_at=-3600.0))
+
+    await scheduler.wait(max_wait_s=600.0)
+    assert scheduler.pop_due() == [("C1", "T1")]
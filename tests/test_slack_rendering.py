@@ -2,6 +2,7 @@ from takopi_slack_plugin.bridge import (
     MAX_BLOCK_TEXT,
     SlackPresenter,
     _build_archive_blocks,
+    _build_archive_confirm_blocks,
     _build_cancel_blocks,
     _format_elapsed,
     _render_final_text,
@@ -53,6 +54,17 @@ def test_build_archive_blocks_splits_long_text() -> None:
     assert all(block["type"] == "section" for block in blocks)
 
 
+def test_block_templates_are_shared() -> None:
+    first = _build_cancel_blocks("one")
+    second = _build_cancel_blocks("two")
+    assert first[1] is second[1]
+    assert second[0]["text"]["text"] == "two"
+
+    confirm = _build_archive_confirm_blocks("sure?", thread_id="1.2")
+    assert confirm[1]["elements"][0]["value"] == "1.2"
+    assert _build_archive_confirm_blocks("again?", thread_id="1.2")[1] is confirm[1]
+
+
 def test_build_archive_blocks_uses_action_blocks() -> None:
     custom = [
         {
@@ -88,3 +100,61 @@ def test_presenter_split_followups() -> None:
     chunks = [rendered.text] + [item.text for item in followups]
     expected = _render_final_text(state, elapsed_s=1, status="ok", answer="hello world")
     assert "".join(chunks) == expected
+
+
+class _Action:
+    def __init__(self, action_id: str, title: str) -> None:
+        self.id = action_id
+        self.kind = "command"
+        self.title = title
+        self.detail = {}
+
+
+class _ActionState:
+    def __init__(self, action: _Action, *, completed: bool = False) -> None:
+        self.action = action
+        self.completed = completed
+        self.ok = True if completed else None
+        self.display_phase = "started"
+
+
+def test_presenter_progress_identical_renders_compare_equal() -> None:
+    presenter = SlackPresenter()
+    state = _State(engine="codex")
+    state.action_count = 1
+    state.actions = [_ActionState(_Action("a1", "ls"))]
+
+    first = presenter.render_progress(state, elapsed_s=1)
+    assert "[run] `ls`" in first.text
+    assert first.extra["show_cancel"] is True
+    assert presenter.render_progress(state, elapsed_s=1) == first
+
+    state.actions = [_ActionState(_Action("a1", "ls"), completed=True)]
+    second = presenter.render_progress(state, elapsed_s=1)
+    assert second is not first
+    assert "[ok] `ls`" in second.text
+
+    cancelled = presenter.render_progress(state, elapsed_s=1, label="`cancelled`")
+    assert cancelled.extra["show_cancel"] is False
+    assert cancelled.extra["clear_blocks"] is True
+
+
+def test_presenter_progress_keeps_interleaved_runs_apart() -> None:
+    presenter = SlackPresenter()
+    run_a = _State(engine="codex")
+    run_a.action_count = 1
+    run_a.actions = [_ActionState(_Action("a1", "ls"))]
+    run_b = _State(engine="claude")
+    run_b.action_count = 1
+    run_b.actions = [_ActionState(_Action("b1", "pwd"))]
+
+    a1 = presenter.render_progress(run_a, elapsed_s=1)
+    b1 = presenter.render_progress(run_b, elapsed_s=1)
+    b_cancelled = presenter.render_progress(run_b, elapsed_s=2, label="`cancelled`")
+    a2 = presenter.render_progress(run_a, elapsed_s=1)
+
+    assert "`ls`" in a1.text and "`pwd`" not in a1.text
+    assert "`pwd`" in b1.text and "`ls`" not in b1.text
+    assert b_cancelled.extra["show_cancel"] is False
+    assert a2 == a1
+    assert a2 is not b1 and a2.extra["show_cancel"] is True
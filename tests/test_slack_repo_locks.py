@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import anyio
+import pytest
+
+from takopi.api import RunContext
+from takopi_slack_plugin.repo_locks import (
+    RepoBusyError,
+    RepoLockManager,
+    existing_run_path,
+    repo_key,
+    resolve_run_cwd_locked,
+)
+
+
+@pytest.mark.anyio
+async def test_exclusive_holders_queue_and_record_waits() -> None:
+    locks = RepoLockManager()
+    events: list[str] = []
+    release = anyio.Event()
+
+    async def mutate(label: str) -> None:
+        async with locks.hold("/repo"):
+            events.append(f"start {label}")
+            if label == "reset":
+                await release.wait()
+            events.append(f"end {label}")
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(mutate, "reset")
+        await anyio.wait_all_tasks_blocked()
+        tg.start_soon(mutate, "archive")
+        await anyio.wait_all_tasks_blocked()
+        assert events == ["start reset"]
+        assert locks.is_locked("/repo")
+        release.set()
+
+    assert events == ["start reset", "end reset", "start archive", "end archive"]
+    stats = locks.stats()
+    assert stats.acquired == 2
+    assert stats.contended == 1
+    assert len(locks) == 0
+
+
+@pytest.mark.anyio
+async def test_shared_holders_overlap_and_writer_goes_before_new_readers() -> None:
+    locks = RepoLockManager()
+    events: list[str] = []
+    release = {label: anyio.Event() for label in ("run1", "run2", "archive", "run3")}
+
+    async def hold(label: str, shared: bool) -> None:
+        async with locks.hold("/repo", shared=shared):
+            events.append(label)
+            await release[label].wait()
+
+    async with anyio.create_task_group() as tg:
+        for label, shared in (
+            ("run1", True),
+            ("run2", True),
+            ("archive", False),
+            ("run3", True),
+        ):
+            tg.start_soon(hold, label, shared)
+            await anyio.wait_all_tasks_blocked()
+        assert events == ["run1", "run2"]
+        for label in ("run1", "run2", "archive", "run3"):
+            release[label].set()
+            await anyio.wait_all_tasks_blocked()
+
+    assert events == ["run1", "run2", "archive", "run3"]
+
+
+@pytest.mark.anyio
+async def test_fail_fast_raises_when_busy() -> None:
+    locks = RepoLockManager(fail_fast=True)
+    async with locks.hold("/repo", shared=True):
+        with pytest.raises(RepoBusyError):
+            async with locks.hold("/repo"):
+                pass
+        async with locks.hold("/other"):
+            pass
+    assert locks.stats().failed_fast == 1
+    async with locks.hold("/repo"):
+        pass
+
+
+def test_existing_run_path_does_not_create_worktrees(tmp_path: Path) -> None:
+    base = tmp_path / "repo"
+    (base / ".worktrees" / "feat").mkdir(parents=True)
+    project = SimpleNamespace(path=base, worktrees_root=base / ".worktrees")
+    runtime = SimpleNamespace(
+        _projects=SimpleNamespace(projects={"repo": project})
+    )
+    assert existing_run_path(runtime, RunContext(project="repo", branch=None)) == base
+    assert (
+        existing_run_path(runtime, RunContext(project="repo", branch="feat"))
+        == base / ".worktrees" / "feat"
+    )
+    assert existing_run_path(runtime, RunContext(project="repo", branch="gone")) is None
+    assert not (base / ".worktrees" / "gone").exists()
+    assert existing_run_path(runtime, RunContext(project="repo", branch="../x")) is None
+    assert existing_run_path(runtime, RunContext(project="repo", branch="/x")) is None
+    assert existing_run_path(runtime, None) is None
+
+
+@pytest.mark.anyio
+async def test_worktree_creation_locks_the_project_repository(tmp_path: Path) -> None:
+    base = tmp_path / "repo"
+    (base / ".worktrees" / "feat").mkdir(parents=True)
+    locks = RepoLockManager()
+    held: list[tuple[str | None, bool]] = []
+
+    def resolve_run_cwd(context: RunContext) -> Path:
+        held.append((context.branch, locks.is_locked(repo_key(base))))
+        return base / ".worktrees" / (context.branch or "")
+
+    runtime = SimpleNamespace(
+        _projects=SimpleNamespace(
+            projects={
+                "repo": SimpleNamespace(path=base, worktrees_root=base / ".worktrees")
+            }
+        ),
+        resolve_run_cwd=resolve_run_cwd,
+    )
+    await resolve_run_cwd_locked(runtime, RunContext(project="repo", branch="feat"), locks)
+    await resolve_run_cwd_locked(runtime, RunContext(project="repo", branch="new"), locks)
+    assert held == [("feat", False), ("new", True)]
+    assert not locks.is_locked(repo_key(base))
@@ -0,0 +1,240 @@
+from types import SimpleNamespace
+
+import anyio
+import pytest
+
+from takopi_slack_plugin.engine import RunLimits, RunScheduler, run_engine
+
+from .slack_fakes import FakeTransport
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _hold(
+    scheduler: RunScheduler,
+    *,
+    user: str,
+    label: str,
+    started: list[str],
+    release: anyio.Event,
+    positions: list[tuple[str, int]] | None = None,
+    project: str | None = None,
+) -> None:
+    async def on_queued(position: int) -> None:
+        if positions is not None:
+            positions.append((label, position))
+
+    async with scheduler.slot(user_id=user, project=project, on_queued=on_queued):
+        started.append(label)
+        await release.wait()
+
+
+@pytest.mark.anyio
+async def test_scheduler_round_robins_across_users() -> None:
+    clock = _Clock()
+    scheduler = RunScheduler(RunLimits(max_concurrent=1), clock=clock)
+    started: list[str] = []
+    positions: list[tuple[str, int]] = []
+    releases = {label: anyio.Event() for label in ("a1", "a2", "a3", "b1")}
+
+    async with anyio.create_task_group() as tg:
+        for user, label in (("A", "a1"), ("A", "a2"), ("A", "a3"), ("B", "b1")):
+            tg.start_soon(
+                lambda user=user, label=label: _hold(
+                    scheduler,
+                    user=user,
+                    label=label,
+                    started=started,
+                    release=releases[label],
+                    positions=positions,
+                )
+            )
+            await anyio.wait_all_tasks_blocked()
+
+        assert started == ["a1"]
+        assert positions == [("a2", 1), ("a3", 2), ("b1", 1)]
+        assert scheduler.stats().queued == 3
+
+        clock.now = 5.0
+        for label in ("a1", "b1", "a2", "a3"):
+            releases[label].set()
+            await anyio.wait_all_tasks_blocked()
+
+    assert started == ["a1", "b1", "a2", "a3"]
+    stats = scheduler.stats()
+    assert stats.running == 0
+    assert stats.admitted == 4
+    assert stats.waited == 3
+    assert stats.max_wait_s == 5.0
+
+
+@pytest.mark.anyio
+async def test_scheduler_enforces_per_user_and_project_limits() -> None:
+    scheduler = RunScheduler(RunLimits(per_user=1, per_project=2))
+    started: list[str] = []
+    release = anyio.Event()
+
+    async with anyio.create_task_group() as tg:
+        for user, label, project in (
+            ("A", "a1", "Repo"),
+            ("A", "a2", "other"),
+            ("B", "b1", "repo"),
+            ("C", "c1", "repo"),
+            ("D", "d1", None),
+        ):
+            tg.start_soon(
+                lambda user=user, label=label, project=project: _hold(
+                    scheduler,
+                    user=user,
+                    label=label,
+                    started=started,
+                    release=release,
+                    project=project,
+                )
+            )
+            await anyio.wait_all_tasks_blocked()
+
+        assert started == ["a1", "b1", "d1"]
+        assert scheduler.stats().queued == 2
+        release.set()
+
+    assert sorted(started) == ["a1", "a2", "b1", "c1", "d1"]
+
+
+@pytest.mark.anyio
+async def test_scheduler_cancelled_waiter_leaves_queue() -> None:
+    scheduler = RunScheduler(RunLimits(max_concurrent=1))
+    started: list[str] = []
+    release = anyio.Event()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(
+            lambda: _hold(
+                scheduler, user="A", label="a1", started=started, release=release
+            )
+        )
+        await anyio.wait_all_tasks_blocked()
+        with anyio.move_on_after(0.01):
+            await _hold(
+                scheduler, user="B", label="b1", started=started, release=release
+            )
+        assert scheduler.stats().queued == 0
+        release.set()
+
+    assert started == ["a1"]
+    assert scheduler.stats().running == 0
+
+
+@pytest.mark.anyio
+async def test_queued_run_can_be_cancelled_from_its_notice() -> None:
+    scheduler = RunScheduler(RunLimits(max_concurrent=1))
+    transport = FakeTransport()
+    running_tasks: dict = {}
+    started: list[str] = []
+    release = anyio.Event()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(
+            lambda: _hold(
+                scheduler, user="A", label="a1", started=started, release=release
+            )
+        )
+        await anyio.wait_all_tasks_blocked()
+        tg.start_soon(
+            lambda: run_engine(
+                exec_cfg=SimpleNamespace(transport=transport),
+                runtime=None,
+                running_tasks=running_tasks,
+                channel_id="C1",
+                user_msg_id="1.0",
+                text="hi",
+                resume_token=None,
+                context=None,
+                engine_override=None,
+                thread_id="1.0",
+                scheduler=scheduler,
+                user_id="B",
+            )
+        )
+        await anyio.wait_all_tasks_blocked()
+        (notice,) = transport.send_calls
+        assert notice["message"].extra["show_cancel"] is True
+        assert scheduler.stats().queued == 1
+
+        (task,) = running_tasks.values()
+        task.cancel_requested.set()
+        await anyio.wait_all_tasks_blocked()
+        assert scheduler.stats().queued == 0
+        assert running_tasks == {}
+        release.set()
+
+    (edit,) = transport.edit_calls
+    assert "removed from the queue" in edit["message"].text
+    assert edit["message"].extra["clear_blocks"] is True
+    assert started == ["a1"]
+
+
+@pytest.mark.anyio
+async def test_scheduler_admits_interactive_before_batch() -> None:
+    scheduler = RunScheduler(RunLimits(max_concurrent=1, batch=1))
+    started: list[str] = []
+    positions: list[tuple[str, int]] = []
+    releases = {label: anyio.Event() for label in ("b1", "b2", "b3", "i1")}
+
+    async def hold(user: str, label: str, priority: str) -> None:
+        async def on_queued(position: int) -> None:
+            positions.append((label, position))
+
+        async with scheduler.slot(
+            user_id=user, project=None, priority=priority, on_queued=on_queued
+        ):
+            started.append(label)
+            await releases[label].wait()
+
+    async with anyio.create_task_group() as tg:
+        for user, label, priority in (
+            ("A", "b1", "batch"),
+            ("A", "b2", "batch"),
+            ("B", "b3", "batch"),
+            ("A", "i1", "interactive"),
+        ):
+            tg.start_soon(hold, user, label, priority)
+            await anyio.wait_all_tasks_blocked()
+
+        assert positions == [("b2", 1), ("b3", 1), ("i1", 1)]
+        assert scheduler.stats().queued_by_priority == {
+            "interactive": 1,
+            "batch": 2,
+        }
+        for label in ("b1", "i1", "b3", "b2"):
+            releases[label].set()
+            await anyio.wait_all_tasks_blocked()
+
+    assert started == ["b1", "i1", "b3", "b2"]
+
+
+@pytest.mark.anyio
+async def test_scheduler_batch_limit_leaves_room_for_interactive() -> None:
+    scheduler = RunScheduler(RunLimits(max_concurrent=2, batch=1))
+    started: list[str] = []
+    release = anyio.Event()
+
+    async def hold(label: str, priority: str) -> None:
+        async with scheduler.slot(user_id=label, project=None, priority=priority):
+            started.append(label)
+            await release.wait()
+
+    async with anyio.create_task_group() as tg:
+        for label, priority in (("b1", "batch"), ("b2", "batch"), ("i1", "interactive")):
+            tg.start_soon(hold, label, priority)
+            await anyio.wait_all_tasks_blocked()
+        assert started == ["b1", "i1"]
+        release.set()
+
+    assert started == ["b1", "i1", "b2"]
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+from websockets.exceptions import ConnectionClosedOK
+
+from takopi_slack_plugin.client import SlackApiError
+from takopi_slack_plugin.socket_mode import (
+    Backoff,
+    RecentIds,
+    SocketModeRunner,
+    socket_budget,
+)
+
+
+class _FakeSocket:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.sent: list[str] = []
+        self.send_stream, self.receive_stream = anyio.create_memory_object_stream[
+            str | None
+        ](10)
+
+    def push(self, envelope: dict | None) -> None:
+        self.send_stream.send_nowait(None if envelope is None else json.dumps(envelope))
+
+    async def recv(self) -> str:
+        raw = await self.receive_stream.receive()
+        if raw is None:
+            raise ConnectionClosedOK(None, None)
+        return raw
+
+    async def send(self, message: str) -> None:
+        self.sent.append(message)
+
+
+class _Opener:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    async def open(self) -> str:
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise SlackApiError("boom")
+        return f"wss://socket/{self.calls}"
+
+
+def _connector(sockets: dict[str, _FakeSocket], opened: list[str]):
+    @asynccontextmanager
+    async def connect(url: str):
+        socket = _FakeSocket(url)
+        sockets[url] = socket
+        opened.append(url)
+        yield socket
+
+    return connect
+
+
+def test_backoff_grows_with_jitter_and_resets() -> None:
+    backoff = Backoff(initial_s=1.0, max_s=5.0, jitter=0.5, rng=lambda: 1.0)
+    assert [backoff.next_delay() for _ in range(4)] == [1.0, 2.0, 4.0, 5.0]
+    backoff.reset()
+    low = Backoff(initial_s=1.0, max_s=5.0, jitter=0.5, rng=lambda: 0.0)
+    assert low.next_delay() == 0.5
+    assert backoff.next_delay() == 1.0
+
+
+@pytest.mark.anyio
+async def test_runner_opens_next_socket_before_planned_disconnect() -> None:
+    sockets: dict[str, _FakeSocket] = {}
+    opened: list[str] = []
+    received: list[str] = []
+    runner = SocketModeRunner(
+        _Opener(),
+        connect=_connector(sockets, opened),
+        backoff_factory=lambda: Backoff(initial_s=60.0),
+    )
+
+    with anyio.fail_after(5):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(runner.run, lambda env: received.append(env["envelope_id"]))
+            await anyio.wait_all_tasks_blocked()
+            first = sockets["wss://socket/1"]
+            first.push({"envelope_id": "e1", "type": "events_api"})
+            first.push({"type": "disconnect", "reason": "warning"})
+            await anyio.wait_all_tasks_blocked()
+            assert opened == ["wss://socket/1", "wss://socket/2"]
+
+            # The old socket still delivers until Slack closes it.
+            first.push({"envelope_id": "e2", "type": "events_api"})
+            sockets["wss://socket/2"].push({"envelope_id": "e3", "type": "events_api"})
+            first.push(None)
+            await anyio.wait_all_tasks_blocked()
+            tg.cancel_scope.deadline = anyio.current_time()
+
+    assert sorted(received) == ["e1", "e2", "e3"]
+    assert first.sent == [
+        json.dumps({"envelope_id": "e1"}),
+        json.dumps({"envelope_id": "e2"}),
+    ]
+    assert opened == ["wss://socket/1", "wss://socket/2"]
+
+
+@pytest.mark.anyio
+async def test_runner_backs_off_after_failures() -> None:
+    sockets: dict[str, _FakeSocket] = {}
+    opened: list[str] = []
+    delays: list[float] = []
+
+    class _RecordingBackoff(Backoff):
+        def next_delay(self) -> float:
+            delay = super().next_delay()
+            delays.append(delay)
+            return 0.0
+
+    opener = _Opener(failures=2)
+    runner = SocketModeRunner(
+        opener,
+        connect=_connector(sockets, opened),
+        backoff_factory=lambda: _RecordingBackoff(rng=lambda: 1.0),
+    )
+    with anyio.fail_after(5):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(runner.run, lambda env: None)
+            while not opened:
+                await anyio.sleep(0.01)
+            sockets[opened[0]].push(None)
+            while len(opened) < 2:
+                await anyio.sleep(0.01)
+            tg.cancel_scope.deadline = anyio.current_time()
+
+    # Two failed opens, then an unplanned close after a healthy connect.
+    assert delays == [1.0, 2.0, 1.0]
+    assert opener.calls == 4
+
+
+@pytest.mark.anyio
+async def test_runner_survives_handler_and_opener_errors() -> None:
+    sockets: dict[str, _FakeSocket] = {}
+    opened: list[str] = []
+    received: list[str] = []
+    delays: list[float] = []
+
+    class _RecordingBackoff(Backoff):
+        def next_delay(self) -> float:
+            delays.append(super().next_delay())
+            return 0.0
+
+    class _BrokenOpener(_Opener):
+        async def open(self) -> str:
+            if self.calls == 0:
+                self.calls += 1
+                raise RuntimeError("unexpected")
+            return await super().open()
+
+    def handle(envelope: dict) -> None:
+        if envelope["envelope_id"] == "bad":
+            raise ValueError("handler bug")
+        received.append(envelope["envelope_id"])
+
+    runner = SocketModeRunner(
+        _BrokenOpener(),
+        connect=_connector(sockets, opened),
+        backoff_factory=lambda: _RecordingBackoff(rng=lambda: 1.0),
+    )
+    with anyio.fail_after(5):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(runner.run, handle)
+            while not opened:
+                await anyio.sleep(0.01)
+            socket = sockets[opened[0]]
+            socket.push({"envelope_id": "bad", "type": "events_api"})
+            socket.push({"envelope_id": "good", "type": "events_api"})
+            while not received:
+                await anyio.sleep(0.01)
+            tg.cancel_scope.deadline = anyio.current_time()
+
+    assert delays == [1.0]
+    assert received == ["good"]
+    assert socket.sent == [
+        json.dumps({"envelope_id": "bad"}),
+        json.dumps({"envelope_id": "good"}),
+    ]
+
+
+def test_recent_ids_evicts_least_recent() -> None:
+    recent = RecentIds(maxsize=2)
+    assert not recent.seen(["a"])
+    assert not recent.seen(["b"])
+    assert recent.seen(["a"])
+    assert not recent.seen(["c"])
+    assert "a" in recent
+    assert "b" not in recent
+    assert recent.duplicates == 1
+
+
+@pytest.mark.anyio
+async def test_runner_dedupes_across_connections() -> None:
+    sockets: dict[str, _FakeSocket] = {}
+    opened: list[str] = []
+    received: list[str] = []
+    runner = SocketModeRunner(
+        _Opener(),
+        connections=2,
+        connect=_connector(sockets, opened),
+    )
+
+    with anyio.fail_after(5):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(runner.run, lambda env: received.append(env["envelope_id"]))
+            await anyio.wait_all_tasks_blocked()
+            assert len(opened) == 2
+            first, second = (sockets[url] for url in opened)
+            event = {"type": "events_api", "payload": {"event_id": "Ev1"}}
+            first.push({"envelope_id": "e1", **event})
+            await anyio.wait_all_tasks_blocked()
+            # A retry arrives on the other connection with a new envelope id.
+            second.push({"envelope_id": "e2", "retry_attempt": 1, **event})
+            second.push({"envelope_id": "e1", **event})
+            await anyio.wait_all_tasks_blocked()
+            tg.cancel_scope.deadline = anyio.current_time()
+
+    assert received == ["e1"]
+    assert first.sent == [json.dumps({"envelope_id": "e1"})]
+    assert second.sent == [
+        json.dumps({"envelope_id": "e2"}),
+        json.dumps({"envelope_id": "e1"}),
+    ]
+    assert runner.recent_ids.duplicates == 2
+
+
+def test_socket_budget_splits_the_app_limit() -> None:
+    assert [socket_budget(n) for n in (0, 1, 2, 3, 5, 8)] == [5, 5, 2, 1, 1, 1]
+
+
+@pytest.mark.anyio
+async def test_runner_closes_and_reopens_slots_with_the_budget() -> None:
+    live: set[str] = set()
+    opener = _Opener()
+    budget = [3]
+
+    @asynccontextmanager
+    async def connect(url: str):
+        live.add(url)
+        try:
+            yield _FakeSocket(url)
+        finally:
+            live.discard(url)
+
+    runner = SocketModeRunner(
+        opener,
+        connections=3,
+        connect=connect,
+        budget=lambda: budget[0],
+        budget_poll_s=0.01,
+    )
+
+    with anyio.fail_after(5):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(runner.run, lambda env: None)
+            await anyio.wait_all_tasks_blocked()
+            assert len(live) == 3
+
+            # Another worker joined: the spare slots close, one stays open.
+            budget[0] = 1
+            await anyio.sleep(0.1)
+            assert len(live) == 1
+            budget[0] = 2
+            await anyio.sleep(0.1)
+            assert len(live) == 2
+            assert opener.calls == 4
+            tg.cancel_scope.cancel()
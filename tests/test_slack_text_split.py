@@ -0,0 +1,40 @@
+from takopi_slack_plugin.text_split import split_markdown
+
+
+def test_split_markdown_is_lossless_without_fences() -> None:
+    text = "first paragraph here\n\nsecond line one\nsecond line two " + "x" * 30
+    chunks = split_markdown(text, 24)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 24 for chunk in chunks)
+    assert chunks[0] == "first paragraph here\n\n"
+    assert chunks[1] == "second line one\n"
+
+
+def test_split_markdown_hard_cuts_without_boundaries() -> None:
+    assert split_markdown("hello", 2) == ["he", "ll", "o"]
+    assert split_markdown("hello", 0) == ["hello"]
+
+
+def test_split_markdown_reopens_code_fences() -> None:
+    code = "\n".join(f"line {index}" for index in range(12))
+    text = f"intro\n```python\n{code}\n```\ndone"
+    chunks = split_markdown(text, 40)
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    for chunk in chunks:
+        assert chunk.count("```") % 2 == 0
+    assert chunks[1].startswith("```python\n")
+    body = "".join(chunks).replace("\n```", "").replace("```python\n", "")
+    assert "line 0" in body and "line 11" in body and body.endswith("done")
+
+
+def test_split_markdown_closes_tilde_fences_with_tildes() -> None:
+    code = "\n".join(f"line {index}" for index in range(12))
+    text = f"intro\n~~~~sh\n{code}\n~~~~\ndone"
+    chunks = split_markdown(text, 40)
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert "```" not in "".join(chunks)
+    for chunk in chunks:
+        lines = chunk.split("\n")
+        assert sum(line.startswith("~~~~") for line in lines) % 2 == 0
+    assert chunks[1].startswith("~~~~sh\n")
+    assert chunks[0].endswith("\n~~~~")
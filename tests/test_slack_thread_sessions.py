@@ -1,9 +1,17 @@
-from pathlib import Path
+import json
+import os
 
+import anyio
 import pytest
 
 from takopi.api import ResumeToken, RunContext
-from takopi_slack_plugin.thread_sessions import SlackThreadSessionStore
+from takopi_slack_plugin import state_dump
+from takopi_slack_plugin.reminders import StaleWorktreeScheduler
+from takopi_slack_plugin.thread_sessions import (
+    SlackThreadSessionStore,
+    WorktreeSnapshot,
+    resolve_shards_dir,
+)
 
 
 @pytest.mark.anyio
@@ -91,3 +99,249 @@ async def test_thread_sessions_clear_and_state(tmp_path) -> None:
 
     await store.clear_thread(channel_id="C1", thread_id="T1")
     assert await store.get_context(channel_id="C1", thread_id="T1") is None
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_prune_keeps_worktrees(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    store = SlackThreadSessionStore(path)
+
+    await store.record_activity(
+        channel_id="C1",
+        thread_id="old",
+        user_id="U1",
+        worktree=None,
+        clear_worktree=False,
+        now=0.0,
+    )
+    await store.record_activity(
+        channel_id="C1",
+        thread_id="worktree",
+        user_id="U1",
+        worktree=WorktreeSnapshot(project="proj", branch="feat"),
+        clear_worktree=False,
+        now=0.0,
+    )
+    await store.record_activity(
+        channel_id="C1",
+        thread_id="fresh",
+        user_id="U1",
+        worktree=None,
+        clear_worktree=False,
+        now=90.0,
+    )
+    await store.set_resume(
+        channel_id="C1",
+        thread_id="untracked",
+        token=ResumeToken(engine="codex", value="abc"),
+    )
+
+    result = await store.prune_threads(max_idle_s=50.0, now=100.0)
+
+    assert result.removed == 1
+    assert result.remaining == 3
+    assert result.bytes_reclaimed > 0
+    assert await store.get_thread_snapshot(channel_id="C1", thread_id="old") is None
+    untracked = await store.get_thread_snapshot(
+        channel_id="C1", thread_id="untracked"
+    )
+    assert untracked is not None and untracked.last_activity_at == 100.0
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_shard_by_channel(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    store = SlackThreadSessionStore(path)
+
+    await store.set_context(
+        channel_id="C1", thread_id="T1", context=RunContext(project="one")
+    )
+    await store.set_context(
+        channel_id="C2", thread_id="T1", context=RunContext(project="two")
+    )
+
+    shards_dir = resolve_shards_dir(path)
+    assert sorted(item.name for item in shards_dir.iterdir()) == ["C1.json", "C2.json"]
+    assert not path.exists()
+
+    store2 = SlackThreadSessionStore(path)
+    snapshots = await store2.list_thread_snapshots()
+    assert sorted((item.channel_id, item.thread_id) for item in snapshots) == [
+        ("C1", "T1"),
+        ("C2", "T1"),
+    ]
+    assert await store2.get_context(channel_id="C2", thread_id="T1") == RunContext(
+        project="two"
+    )
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_migrates_legacy_file(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    path.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "threads": {
+                    "C1:T1": {"resumes": {"codex": "abc"}},
+                    "C2:T2": {"context": {"project": "proj"}},
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    store = SlackThreadSessionStore(path)
+
+    assert await store.get_resume(
+        channel_id="C1", thread_id="T1", engine="codex"
+    ) == ResumeToken(engine="codex", value="abc")
+    assert await store.get_context(channel_id="C2", thread_id="T2") == RunContext(
+        project="proj"
+    )
+    assert not path.exists()
+    assert path.with_name(path.name + ".migrated").exists()
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_cache_invalidates_external_changes(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    store = SlackThreadSessionStore(path)
+    await store.set_context(
+        channel_id="C1", thread_id="T1", context=RunContext(project="one")
+    )
+    assert await store.get_context(channel_id="C1", thread_id="T1") == RunContext(
+        project="one"
+    )
+
+    other = SlackThreadSessionStore(path)
+    await other.set_context(
+        channel_id="C1", thread_id="T1", context=RunContext(project="two")
+    )
+    shard = resolve_shards_dir(path) / "C1.json"
+    stat = shard.stat()
+    os.utime(shard, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    # Served from the cache until the watcher notices the shard changed.
+    assert await store.get_context(channel_id="C1", thread_id="T1") == RunContext(
+        project="one"
+    )
+    assert store.invalidate_external_changes() == 1
+    assert await store.get_context(channel_id="C1", thread_id="T1") == RunContext(
+        project="two"
+    )
+    assert store.invalidate_external_changes() == 0
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_feed_stale_scheduler(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    store = SlackThreadSessionStore(path)
+    scheduler = StaleWorktreeScheduler(stale_hours=1, clock=lambda: 0.0)
+    store.subscribe(scheduler.track)
+    worktree = WorktreeSnapshot(project="proj", branch="feat")
+
+    await store.record_activity(
+        channel_id="C1",
+        thread_id="T1",
+        user_id="U1",
+        worktree=worktree,
+        clear_worktree=False,
+        now=1000.0,
+    )
+    assert scheduler.next_deadline() == 1000.0 + 3600.0
+
+    # Another process reminds the thread; the watcher reloads the shard.
+    other = SlackThreadSessionStore(path)
+    await other.set_reminder_sent(channel_id="C1", thread_id="T1", now=1001.0)
+    shard = resolve_shards_dir(path) / "C1.json"
+    stat = shard.stat()
+    os.utime(shard, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    with anyio.move_on_after(0.2):
+        await store.watch_external_changes(interval_s=0.01)
+    assert len(scheduler) == 0
+
+    await store.record_activity(
+        channel_id="C1",
+        thread_id="T1",
+        user_id="U1",
+        worktree=None,
+        clear_worktree=False,
+        now=2000.0,
+    )
+    assert scheduler.next_deadline() == 2000.0 + 3600.0
+    await store.clear_worktree(channel_id="C1", thread_id="T1")
+    assert len(scheduler) == 0
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_cache_is_bounded(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    store = SlackThreadSessionStore(path, cache_max_entries=2)
+    for index in range(4):
+        await store.set_resume(
+            channel_id="C1",
+            thread_id=f"T{index}",
+            token=ResumeToken(engine="codex", value=str(index)),
+        )
+    assert len(store._cache) == 2
+
+    for index in range(4):
+        assert await store.get_resume(
+            channel_id="C1", thread_id=f"T{index}", engine="codex"
+        ) == ResumeToken(engine="codex", value=str(index))
+    assert len(store._cache) == 2
+    assert await store.get_resume(
+        channel_id="C1", thread_id="missing", engine="codex"
+    ) is None
+
+
+@pytest.mark.anyio
+async def test_thread_sessions_msgpack_converts_json_shards(tmp_path) -> None:
+    path = tmp_path / "slack_thread_sessions_state.json"
+    shards_dir = resolve_shards_dir(path)
+    shards_dir.mkdir()
+    (shards_dir / "C1.json").write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "channel_id": "C1",
+                "threads": {"T1": {"resumes": {"codex": "abc"}}},
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    store = SlackThreadSessionStore(path, state_format="msgpack")
+    assert await store.get_resume(
+        channel_id="C1", thread_id="T1", engine="codex"
+    ) == ResumeToken(engine="codex", value="abc")
+    assert sorted(item.name for item in shards_dir.iterdir()) == [
+        "C1.json.migrated",
+        "C1.msgpack",
+    ]
+    snapshots = await store.list_thread_snapshots()
+    assert [snapshot.thread_id for snapshot in snapshots] == ["T1"]
+
+    dumped = state_dump.dump_state([shards_dir])
+    assert dumped[str(shards_dir / "C1.msgpack")] == {
+        "channel_id": "C1",
+        "threads": {
+            "T1": {
+                "context": None,
+                "default_engine": None,
+                "last_activity_at": None,
+                "model_overrides": None,
+                "owner_user_id": None,
+                "reasoning_overrides": None,
+                "reminder": None,
+                "resumes": {"codex": "abc"},
+                "worktree": None,
+            }
+        },
+        "version": 2,
+    }
+
+    store2 = SlackThreadSessionStore(path, state_format="msgpack")
+    assert await store2.get_resume(
+        channel_id="C1", thread_id="T1", engine="codex"
+    ) == ResumeToken(engine="codex", value="abc")
@@ -3,7 +3,7 @@ from __future__ import annotations
 import pytest
 
 from takopi.transport import MessageRef, RenderedMessage, SendOptions
-from takopi_slack_plugin.bridge import SlackTransport
+from takopi_slack_plugin.bridge import OverflowFile, SlackPresenter, SlackTransport
 from takopi_slack_plugin.client import SlackApiError, SlackMessage
 
 
@@ -26,6 +26,7 @@ class _FakeSlackClient:
         self.post_calls: list[dict] = []
         self.update_calls: list[dict] = []
         self.delete_calls: list[dict] = []
+        self.upload_calls: list[dict] = []
         self.fail_thread_error: str | None = None
 
     async def post_message(
@@ -72,6 +73,25 @@ class _FakeSlackClient:
             thread_ts=None,
         )
 
+    async def upload_file(
+        self,
+        *,
+        channel_id: str,
+        filename: str,
+        content: bytes,
+        thread_ts: str | None = None,
+        initial_comment: str | None = None,
+    ) -> dict:
+        self.upload_calls.append(
+            {
+                "channel_id": channel_id,
+                "filename": filename,
+                "content": content,
+                "thread_ts": thread_ts,
+            }
+        )
+        return {"id": "F1"}
+
     async def delete_message(self, *, channel_id: str, ts: str) -> bool:
         self.delete_calls.append({"channel_id": channel_id, "ts": ts})
         return True
@@ -107,3 +127,93 @@ async def test_delete_uses_outbox() -> None:
     ok = await transport.delete(ref=MessageRef(channel_id="C1", message_id="1"))
     assert ok is True
     assert client.delete_calls == [{"channel_id": "C1", "ts": "1"}]
+
+
+@pytest.mark.anyio
+async def test_edit_suppresses_unchanged_content() -> None:
+    client = _FakeSlackClient()
+    transport = SlackTransport(client)
+    transport._outbox = _ImmediateOutbox()
+
+    ref = await transport.send(channel_id="C1", message=RenderedMessage(text="hi"))
+    assert ref is not None
+    await transport.edit(ref=ref, message=RenderedMessage(text="hi"))
+    assert client.update_calls == []
+    assert transport.suppressed_edits == 1
+
+    await transport.edit(ref=ref, message=RenderedMessage(text="hello"))
+    await transport.edit(ref=ref, message=RenderedMessage(text="hello"))
+    assert [call["text"] for call in client.update_calls] == ["hello"]
+    assert transport.suppressed_edits == 2
+
+    await transport.delete(ref=ref)
+    await transport.edit(ref=ref, message=RenderedMessage(text="hello"))
+    assert len(client.update_calls) == 2
+
+
+@pytest.mark.anyio
+async def test_edit_retries_after_failed_update() -> None:
+    client = _FakeSlackClient()
+    transport = SlackTransport(client)
+    transport._outbox = _ImmediateOutbox()
+    ref = MessageRef(channel_id="C1", message_id="5")
+
+    async def failing_update(**kwargs) -> SlackMessage:
+        raise SlackApiError("boom", error="ratelimited")
+
+    original = client.update_message
+    client.update_message = failing_update
+    with pytest.raises(SlackApiError):
+        await transport.edit(ref=ref, message=RenderedMessage(text="x"))
+    client.update_message = original
+
+    await transport.edit(ref=ref, message=RenderedMessage(text="x"))
+    assert [call["text"] for call in client.update_calls] == ["x"]
+    assert transport.suppressed_edits == 0
+
+
+@pytest.mark.anyio
+async def test_overflow_file_uploaded_on_send_and_edit() -> None:
+    client = _FakeSlackClient()
+    transport = SlackTransport(client)
+    transport._outbox = _ImmediateOutbox()
+    presenter = SlackPresenter(
+        message_overflow="file", max_chars=200, overflow_file_threshold=500
+    )
+
+    class _State:
+        engine = "codex"
+        action_count = 0
+        actions = []
+        context_line = None
+        resume_line = None
+
+    answer = "line\n" * 300
+    rendered = presenter.render_final(
+        _State(), elapsed_s=1, status="done", answer=answer
+    )
+    assert len(rendered.text) <= 200
+    assert "answer.md" in rendered.text
+    assert rendered.extra["overflow_file"] == OverflowFile(
+        filename="answer.md", content=answer.strip()
+    )
+    assert "followups" not in rendered.extra
+
+    await transport.send(
+        channel_id="C1",
+        message=rendered,
+        options=SendOptions(thread_id="1.1"),
+    )
+    await transport.edit(
+        ref=MessageRef(channel_id="C1", message_id="9", thread_id="1.1"),
+        message=rendered,
+    )
+    assert [call["thread_ts"] for call in client.upload_calls] == ["1.1", "1.1"]
+    assert client.upload_calls[0]["content"] == answer.strip().encode("utf-8")
+    assert len(client.post_calls) == 1
+
+    small = presenter.render_final(
+        _State(), elapsed_s=1, status="done", answer="x " * 150
+    )
+    assert "overflow_file" not in small.extra
+    assert small.extra.get("followups")